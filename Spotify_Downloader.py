@@ -17,14 +17,25 @@ For the program to work, the playlist URL pattern must follow the format of
 
 __version__ = "2.0.1"
 
+import base64
+import itertools
+import logging
 import os
+import queue
+import shutil
+import subprocess
 import sys
+import tempfile
 import threading
+import time
 import webbrowser
+from dataclasses import dataclass
 
-import requests
 from mutagen.easyid3 import EasyID3
-from mutagen.id3 import APIC, ID3
+from mutagen.id3 import APIC, ID3, ID3NoHeaderError
+from mutagen.flac import Picture
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.oggopus import OggOpus
 from PyQt5.QtCore import (
     QEasingCurve,
     QPropertyAnimation,
@@ -43,17 +54,28 @@ from PyQt5.QtWidgets import (
     QMessageBox,
 )
 from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadError
 
 from spotifydown_api import (
+    LOG_NAMESPACE,
+    RETRYABLE_ERRORS,
+    AccessTokenManager,
     ExtractionError,
+    NegativeCache,
     NetworkError,
     PlaylistClient,
     PlaylistInfo,
     RateLimitError,
+    RetryPolicy,
     SpotifyDownAPIError,
+    SQLiteResponseCache,
+    configure_logging,
+    default_cache_dir,
     detect_spotify_url_type,
     extract_playlist_id,
+    get_with_retry,
     sanitize_filename,
+    shared_session,
 )
 from Template import Ui_MainWindow
 
@@ -61,6 +83,8 @@ from Template import Ui_MainWindow
 
 import sys
 
+logger = logging.getLogger(f"{LOG_NAMESPACE}.downloader")
+
 def get_cli_url():
     return sys.argv[1] if len(sys.argv) > 1 else ""
 
@@ -101,6 +125,496 @@ def get_ffmpeg_path():
     return None
 
 
+# yt-dlp wraps every failure in DownloadError; only these look transient
+_TRANSIENT_DOWNLOAD_MARKERS = (
+    "HTTP Error 5",
+    "HTTP Error 429",
+    "timed out",
+    "Connection",
+    "Temporary failure",
+    "IncompleteRead",
+    "Remote end closed",
+)
+
+
+# ...and only these mean YouTube has nothing for the track. Bot checks, 403s,
+# geo blocks and extractor breakage may clear up, so they aren't remembered.
+_NO_AUDIO_MARKERS = (
+    "No YouTube results for",
+    "Video unavailable",
+    "This video is unavailable",
+    "This video has been removed",
+    "This video is no longer available",
+)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Retry classification for downloads: yt-dlp errors only when transient."""
+    if isinstance(error, DownloadError):
+        return any(marker in str(error) for marker in _TRANSIENT_DOWNLOAD_MARKERS)
+    return True
+
+
+# Album art is nice-to-have: a few quick tries, never more than 30s
+COVER_RETRY = RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0, deadline=30.0)
+
+# Concurrent yt-dlp downloads per playlist; SUNNIFY_DOWNLOAD_WORKERS overrides
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def default_download_workers() -> int:
+    """Download worker count from SUNNIFY_DOWNLOAD_WORKERS, else the default."""
+    return _env_int("SUNNIFY_DOWNLOAD_WORKERS", DEFAULT_DOWNLOAD_WORKERS)
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """How a fetched YouTube audio stream becomes the saved file."""
+
+    name: str
+    extension: str
+    ytdlp_format: str  # yt-dlp format selector for the fetch
+    muxer: str  # ffmpeg output format
+    encode_args: tuple[str, ...]  # ffmpeg codec arguments when re-encoding
+    # Source codecs (yt-dlp "acodec", sans profile suffix) kept as-is: remuxed,
+    # not re-encoded. The container says nothing reliable: webm can be Vorbis
+    native_codecs: tuple[str, ...] = ()
+
+    def is_native(self, codec: str | None) -> bool:
+        return bool(codec) and codec.split(".")[0].lower() in self.native_codecs
+
+
+# "m4a" and "opus" keep YouTube's AAC / Opus stream; "mp3" always re-encodes
+OUTPUT_PROFILES = {
+    "mp3": OutputProfile(
+        "mp3", "mp3", "bestaudio/best", "mp3", ("-codec:a", "libmp3lame", "-b:a", "192k")
+    ),
+    "m4a": OutputProfile(
+        "m4a",
+        "m4a",
+        "bestaudio[ext=m4a]/bestaudio/best",
+        "ipod",
+        ("-codec:a", "aac", "-b:a", "192k"),
+        ("mp4a",),
+    ),
+    "opus": OutputProfile(
+        "opus",
+        "opus",
+        "bestaudio[acodec=opus]/bestaudio/best",
+        "opus",
+        ("-codec:a", "libopus", "-b:a", "160k"),
+        ("opus",),
+    ),
+}
+DEFAULT_OUTPUT_FORMAT = "mp3"
+
+
+def default_output_format() -> str:
+    """Output format from SUNNIFY_OUTPUT_FORMAT, else the default."""
+    name = os.environ.get("SUNNIFY_OUTPUT_FORMAT", "").strip().lower()
+    return name if name in OUTPUT_PROFILES else DEFAULT_OUTPUT_FORMAT
+
+
+# Worker threads per download pipeline stage. Search and fetch are network
+# bound and default to the download worker count; each transcode worker drives
+# one ffmpeg process, so that stage is sized to the CPUs instead.
+# Listing the playlist is the scraper thread itself.
+PIPELINE_STAGES = ("search", "fetch", "transcode", "tag")
+DEFAULT_TAG_WORKERS = 1
+
+# ffmpeg threads per transcode (libmp3lame encodes on one thread anyway);
+# SUNNIFY_TRANSCODE_THREADS / SUNNIFY_TRANSCODE_WORKERS override
+DEFAULT_TRANSCODE_THREADS = 1
+# Transcodes run below normal priority so the UI and downloads stay responsive
+DEFAULT_TRANSCODE_NICENESS = 10
+
+# Tracks queued between two stages, per worker of the receiving stage
+PIPELINE_QUEUE_PER_WORKER = 2
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (honours CPU affinity where the OS has it)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def default_transcode_threads() -> int:
+    """ffmpeg threads per transcode from SUNNIFY_TRANSCODE_THREADS, else the default."""
+    return _env_int("SUNNIFY_TRANSCODE_THREADS", DEFAULT_TRANSCODE_THREADS)
+
+
+def default_transcode_workers(threads_per_job: int | None = None) -> int:
+    """Concurrent transcodes: SUNNIFY_TRANSCODE_WORKERS, else enough to fill every CPU."""
+    threads_per_job = threads_per_job or default_transcode_threads()
+    return _env_int("SUNNIFY_TRANSCODE_WORKERS", max(1, available_cpus() // threads_per_job))
+
+
+def default_stage_workers(
+    download_workers: int | None = None, transcode_threads: int | None = None
+) -> dict[str, int]:
+    """Worker count per pipeline stage."""
+    download_workers = download_workers or default_download_workers()
+    return {
+        "search": download_workers,
+        "fetch": download_workers,
+        "transcode": default_transcode_workers(transcode_threads),
+        "tag": DEFAULT_TAG_WORKERS,
+    }
+
+
+class StagedPipeline:
+    """Runs jobs through named stages, each on its own pool of worker threads.
+
+    Stages are connected by bounded queues, and no more than ``max_in_flight``
+    jobs exist between ``run`` reading them and handing them back, so a slow
+    stage holds up the ones feeding it instead of letting work pile up.
+    A stage function takes a job and updates it in place. If it raises, the
+    exception is stored on ``job.error`` and the job skips the remaining
+    stages; so does a job whose ``done`` attribute is set.
+
+    ``run`` is called from a single thread: it reads jobs from an iterable
+    (lazily) and calls ``on_result`` with each finished job in the order the
+    jobs were read, from that same thread.
+    """
+
+    _POLL = 0.1
+
+    def __init__(
+        self,
+        stages,
+        *,
+        queue_per_worker: int = PIPELINE_QUEUE_PER_WORKER,
+        max_in_flight: int | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        self._stages = [(name, func, max(1, int(workers))) for name, func, workers in stages]
+        self._queues = [
+            queue.Queue(maxsize=workers * queue_per_worker) for _, _, workers in self._stages
+        ]
+        self._results: queue.Queue = queue.Queue()
+        capacity = sum(
+            workers + q.maxsize for (_, _, workers), q in zip(self._stages, self._queues)
+        )
+        self.max_in_flight = max_in_flight or capacity
+        self._cancel_event = cancel_event or threading.Event()
+        self._stop = threading.Event()
+
+    def _stopped(self) -> bool:
+        # Cancelling stops the workers too, even if run() never gets to its
+        # finally (QThread.terminate() on a stuck download)
+        return self._stop.is_set() or self._cancel_event.is_set()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._stopped():
+            try:
+                q.put(item, timeout=self._POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker(self, index: int) -> None:
+        name, func, _ = self._stages[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self._queues) else self._results
+        while not self._stopped():
+            try:
+                seq, job = inbox.get(timeout=self._POLL)
+            except queue.Empty:
+                continue
+            if job.error is None and not job.done and not self._cancel_event.is_set():
+                try:
+                    func(job)
+                except Exception as exc:
+                    logger.debug("Stage %s failed: %s", name, exc)
+                    job.error = exc
+            if not self._put(outbox, (seq, job)):
+                return
+
+    def run(self, jobs, on_result) -> bool:
+        """Process ``jobs``; False if the cancel event stopped the run early."""
+        threads = [
+            threading.Thread(
+                target=self._worker, args=(index,), name=f"sunnify-{name}-{n}", daemon=True
+            )
+            for index, (name, _, workers) in enumerate(self._stages)
+            for n in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        ready = {}
+        next_seq = 0
+        in_flight = 0
+
+        def deliver(block: bool) -> None:
+            nonlocal next_seq, in_flight
+            while True:
+                try:
+                    seq, job = self._results.get(timeout=self._POLL if block else 0)
+                except queue.Empty:
+                    return
+                ready[seq] = job
+                while next_seq in ready:
+                    on_result(ready.pop(next_seq))
+                    next_seq += 1
+                    in_flight -= 1
+                    block = False
+
+        try:
+            jobs = iter(jobs)
+            for seq in itertools.count():
+                # Wait for room before reading the next job, not after
+                while in_flight >= self.max_in_flight and not self._cancel_event.is_set():
+                    deliver(block=True)
+                if self._cancel_event.is_set():
+                    return False
+                job = next(jobs, None)
+                if job is None:
+                    break
+                if not self._put(self._queues[0], (seq, job)):
+                    return False
+                in_flight += 1
+                deliver(block=False)
+
+            while in_flight and not self._cancel_event.is_set():
+                deliver(block=True)
+            return not self._cancel_event.is_set()
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+
+class _TrackJob:
+    """One playlist track moving through the download pipeline."""
+
+    __slots__ = (
+        "track",
+        "song_meta",
+        "video_url",
+        "source_base",
+        "source_path",
+        "source_codec",
+        "done",
+        "skipped",
+        "error",
+    )
+
+    def __init__(self, track, song_meta, source_base=None) -> None:
+        self.track = track
+        self.song_meta = song_meta
+        self.video_url = None
+        self.source_base = source_base  # Fetched audio goes to source_base.<ext>
+        self.source_path = None
+        self.source_codec = None
+        self.done = False  # Nothing left to fetch: the file exists or the track is skipped
+        self.skipped = False  # Known dead, not searched for again
+        self.error = None
+
+
+def ffmpeg_binary(ffmpeg_dir: str) -> str:
+    """Path of the ffmpeg executable inside a get_ffmpeg_path() directory."""
+    return os.path.join(ffmpeg_dir, "ffmpeg.exe" if sys.platform == "win32" else "ffmpeg")
+
+
+def _lowered_priority(command, niceness):
+    """command plus subprocess.run kwargs that start it below normal priority."""
+    if niceness <= 0:
+        return command, {}
+    if sys.platform == "win32":
+        return command, {"creationflags": subprocess.BELOW_NORMAL_PRIORITY_CLASS}
+    nice = shutil.which("nice")
+    if nice is None:
+        return command, {}
+    return [nice, "-n", str(niceness), *command], {}
+
+
+def transcode_audio(
+    source,
+    destination,
+    ffmpeg_dir,
+    profile=OUTPUT_PROFILES["mp3"],
+    *,
+    codec=None,
+    threads=DEFAULT_TRANSCODE_THREADS,
+    niceness=0,
+):
+    """Write source's audio to destination in profile's format.
+
+    If ``codec`` (the source stream's codec as yt-dlp reports it) is one the
+    profile keeps natively, the stream is copied into the new container;
+    anything else, including an unknown codec, is re-encoded with the
+    profile's codec. ffmpeg runs with
+    ``threads`` threads and, if ``niceness`` is positive, below normal
+    priority (``nice`` on POSIX, BELOW_NORMAL_PRIORITY_CLASS on Windows).
+    """
+    partial = destination + ".part"
+    codec_args = ("-codec:a", "copy") if profile.is_native(codec) else profile.encode_args
+    command = [
+        ffmpeg_binary(ffmpeg_dir),
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-threads",
+        str(threads),
+        "-i",
+        source,
+        "-vn",
+        *codec_args,
+        "-threads",
+        str(threads),
+        "-f",
+        profile.muxer,
+        partial,
+    ]
+    command, priority = _lowered_priority(command, niceness)
+    try:
+        subprocess.run(command, check=True, capture_output=True, **priority)
+    except subprocess.CalledProcessError as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        stderr = e.stderr.decode(errors="replace").strip() if e.stderr else ""
+        raise RuntimeError(f"ffmpeg failed on {source}: {stderr[:200]}") from e
+    os.replace(partial, destination)
+    return destination
+
+
+def _write_id3_tags(filename, tags, cover):
+    if tags is not None:
+        try:
+            audio = EasyID3(filename)
+        except ID3NoHeaderError:
+            audio = EasyID3()
+        audio["title"] = tags.get("title", "")
+        audio["artist"] = tags.get("artists", "")
+        audio["album"] = tags.get("album", "")
+        audio["date"] = tags.get("releaseDate", "")
+        audio.save(filename)
+
+    if cover:
+        id3 = ID3(filename)
+        id3["APIC"] = APIC(encoding=3, mime="image/jpeg", type=3, desc="Cover", data=cover)
+        id3.save()
+
+
+def _write_mp4_tags(filename, tags, cover):
+    audio = MP4(filename)
+    if audio.tags is None:
+        audio.add_tags()
+    if tags is not None:
+        audio.tags["\xa9nam"] = [tags.get("title", "")]
+        audio.tags["\xa9ART"] = [tags.get("artists", "")]
+        audio.tags["\xa9alb"] = [tags.get("album", "")]
+        audio.tags["\xa9day"] = [tags.get("releaseDate", "")]
+    if cover:
+        audio.tags["covr"] = [MP4Cover(cover, imageformat=MP4Cover.FORMAT_JPEG)]
+    audio.save()
+
+
+def _write_opus_tags(filename, tags, cover):
+    audio = OggOpus(filename)
+    if tags is not None:
+        audio["title"] = tags.get("title", "")
+        audio["artist"] = tags.get("artists", "")
+        audio["album"] = tags.get("album", "")
+        audio["date"] = tags.get("releaseDate", "")
+    if cover:
+        picture = Picture()
+        picture.type = 3
+        picture.mime = "image/jpeg"
+        picture.desc = "Cover"
+        picture.data = cover
+        audio["metadata_block_picture"] = [base64.b64encode(picture.write()).decode("ascii")]
+    audio.save()
+
+
+_TAG_WRITERS = {".mp3": _write_id3_tags, ".m4a": _write_mp4_tags, ".opus": _write_opus_tags}
+
+
+def write_audio_tags(filename, tags, cover=None):
+    """Write title/artist/album/date (and the cover image, if given) to an audio file.
+
+    Uses the container's own tag format: ID3 for MP3, MP4 atoms for M4A and
+    Vorbis comments for Opus. With tags=None only the cover is written.
+    """
+    writer = _TAG_WRITERS.get(os.path.splitext(filename)[1].lower())
+    if writer is None:
+        raise ValueError(f"Don't know how to tag {filename}")
+    writer(filename, tags, cover)
+
+
+class YtdlpEngine:
+    """Long-lived YoutubeDL instances, one per thread and option profile.
+
+    Building a YoutubeDL loads the extractor registry and probes ffmpeg, and a
+    fresh instance starts with a cold YouTube player/signature cache; reusing
+    one per worker pays that once per run instead of once per track. All
+    instances share ``cache_dir`` on disk, so deciphered player code carries
+    over to the next run. YoutubeDL is not thread-safe, hence one per thread.
+
+    ``created`` / ``setup_seconds`` count the instances built and the time
+    spent building them.
+    """
+
+    def __init__(self, cache_dir: str | None = None) -> None:
+        self.cache_dir = cache_dir
+        self.created = 0
+        self.setup_seconds = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._instances: list[YoutubeDL] = []
+
+    def get(self, profile: str, options: dict, outtmpl: str | None = None) -> YoutubeDL:
+        """This thread's instance for ``profile``, built from ``options`` on first use.
+
+        ``outtmpl`` replaces the output template for the next download, so one
+        instance serves every track.
+        """
+        instances = getattr(self._local, "instances", None)
+        if instances is None:
+            instances = self._local.instances = {}
+        ydl = instances.get(profile)
+        if ydl is None:
+            params = dict(options)
+            if self.cache_dir:
+                params.setdefault("cachedir", self.cache_dir)
+            started = time.perf_counter()
+            ydl = YoutubeDL(params)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._instances.append(ydl)
+                self.created += 1
+                self.setup_seconds += elapsed
+            logger.debug("yt-dlp %s instance ready in %.1f ms", profile, elapsed * 1000)
+            instances[profile] = ydl
+        if outtmpl is not None:
+            ydl.params["outtmpl"]["default"] = outtmpl
+        return ydl
+
+    def close(self) -> None:
+        """Close every instance; later calls to get() build new ones."""
+        with self._lock:
+            instances, self._instances = self._instances, []
+            self._local = threading.local()
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception as e:
+                logger.debug("Closing yt-dlp instance failed: %s", e)
+
+
 class MusicScraper(QThread):
     PlaylistCompleted = pyqtSignal(str)
     PlaylistID = pyqtSignal(str)
@@ -111,14 +625,56 @@ class MusicScraper(QThread):
     dlprogress_signal = pyqtSignal(int)
     Resetprogress_signal = pyqtSignal(int)
     error_signal = pyqtSignal(str)  # Signal for error messages to UI
+    tracks_listed = pyqtSignal(int, int)  # (listed, total) as playlist pages arrive
 
-    def __init__(self, cancel_event: threading.Event | None = None):
+    def __init__(
+        self,
+        cancel_event: threading.Event | None = None,
+        download_workers: int | None = None,
+        stage_workers: dict[str, int] | None = None,
+        write_tags: bool = False,
+        output_format: str | None = None,
+        transcode_threads: int | None = None,
+        transcode_niceness: int = DEFAULT_TRANSCODE_NICENESS,
+    ):
         super().__init__()
+        output_format = output_format or default_output_format()
+        if output_format not in OUTPUT_PROFILES:
+            raise ValueError(
+                f"Unknown output format {output_format!r}; expected one of "
+                f"{', '.join(OUTPUT_PROFILES)}"
+            )
+        self.output_profile = OUTPUT_PROFILES[output_format]
         self.counter = 0  # Initialize counter to zero
-        self.session = requests.Session()
+        self.download_workers = max(1, download_workers or default_download_workers())
+        # ffmpeg threads x transcode workers ~ available CPUs
+        self.transcode_threads = max(1, transcode_threads or default_transcode_threads())
+        self.transcode_niceness = transcode_niceness
+        self.stage_workers = {
+            **default_stage_workers(self.download_workers, self.transcode_threads),
+            **(stage_workers or {}),
+        }
+        # Tag files in the pipeline (the UI tags untagged files itself)
+        self.write_tags = write_tags
+        # Warm yt-dlp instances per worker, sharing one on-disk player cache
+        self.ytdlp = YtdlpEngine(os.path.join(default_cache_dir(), "yt-dlp"))
+        self._ffmpeg_dir = None
+        # One tuned, pooled session for Spotify, cover and audio requests
+        self.session = shared_session()
         self.spotifydown_api = None
+        self.negative_cache = None
         self._cancel_event = cancel_event or threading.Event()
         self._failed_tracks: list[str] = []  # Track failed downloads
+        # Shared by API and download calls; cancelling wakes any backoff sleep
+        self._retry = RetryPolicy(
+            max_attempts=3,
+            base_delay=2.0,
+            max_delay=20.0,
+            deadline=300.0,
+            retry_on=(*RETRYABLE_ERRORS, DownloadError),
+            classify=is_transient_error,
+            cancel_event=self._cancel_event,
+        )
 
     def is_cancelled(self) -> bool:
         """Check if cancellation has been requested."""
@@ -145,30 +701,69 @@ class MusicScraper(QThread):
 
     def ensure_spotifydown_api(self):
         if self.spotifydown_api is None:
-            self.spotifydown_api = PlaylistClient(session=self.session)
-
-            # debug info
-            print("PlaylistClient created:", self.spotifydown_api)
-            print("Attributes:", self.spotifydown_api.__dict__)
-            print("base_url:", getattr(self.spotifydown_api, "base_url", None))
+            self.negative_cache = self._open_negative_cache()
+            self.spotifydown_api = PlaylistClient(
+                session=self.session,
+                cache=self._open_response_cache(),
+                token_manager=self._open_token_manager(),
+                retry_policy=self._retry,
+                negative_cache=self.negative_cache,
+            )
 
         return self.spotifydown_api
 
 
 
 
+    def _open_response_cache(self):
+        """Open the on-disk embed/spclient cache; run uncached if it's unavailable."""
+        try:
+            return SQLiteResponseCache()
+        except Exception as e:
+            logger.warning("Response cache disabled: %s", e)
+            return None
+
+    def _open_negative_cache(self):
+        """Open the on-disk record of dead tracks; run without it if it's unavailable."""
+        try:
+            return NegativeCache()
+        except Exception as e:
+            logger.warning("Negative cache disabled: %s", e)
+            return None
+
+    def _skip_known_dead(self, track_id, track_title):
+        """True if a recent run found no audio for this track (reported by _finish_track)."""
+        entry = self.negative_cache.get(track_id, "no_audio") if self.negative_cache else None
+        if entry is None:
+            return False
+        logger.info("Skipping '%s': no audio found on a recent run (%s)", track_title, entry.reason)
+        return True
+
+    def _remember_no_audio(self, track_id, error):
+        """Record an empty search or unavailable video so the next run doesn't search again."""
+        if self.negative_cache is None:
+            return
+        if not isinstance(error, DownloadError) or not any(
+            marker in str(error) for marker in _NO_AUDIO_MARKERS
+        ):
+            return  # Network trouble, bot checks, missing FFmpeg, ... - worth retrying
+        self.negative_cache.add(track_id, "no_audio", str(error)[:200])
+
+    def _open_token_manager(self):
+        """Token manager persisted next to the response cache, shared across runs."""
+        return AccessTokenManager(
+            os.path.join(default_cache_dir(), "access_token.json"),
+            auto_refresh=True,
+            session=self.session,
+        )
+
     # def sanitize_text(self, text):
     #     """Sanitize text for filename usage."""
     #     return sanitize_filename(text, allow_spaces=True)
 
     def sanitize_text(self, text):
         """Sanitize text for filename usage."""
-        print("[sanitize_text] input :", text)
-
-        cleaned = sanitize_filename(text, allow_spaces=True)
-
-        print("[sanitize_text] output:", cleaned)
-        return cleaned
+        return sanitize_filename(text, allow_spaces=True)
 
 
 
@@ -180,14 +775,8 @@ class MusicScraper(QThread):
 
 
     def format_playlist_name(self, metadata: PlaylistInfo):
-        print("[format_playlist_name] raw name :", metadata.name)
-        print("[format_playlist_name] raw owner:", metadata.owner)
-
         owner = metadata.owner or "Spotify"
-        result = f"{metadata.name} - {owner}".strip(" -")
-
-        print("[format_playlist_name] result   :", result)
-        return result
+        return f"{metadata.name} - {owner}".strip(" -")
 
 
 
@@ -210,11 +799,8 @@ class MusicScraper(QThread):
 
 
     def prepare_playlist_folder(self, base_folder, playlist_name):
-        print("[prepare_playlist_folder] base_folder :", base_folder)
-        print("[prepare_playlist_folder] playlist_name:", playlist_name)
-
         if not os.path.exists(base_folder):
-            print("[prepare_playlist_folder] creating base folder")
+            logger.debug("Creating music folder %s", base_folder)
             os.makedirs(base_folder)
 
         safe_name = "".join(
@@ -224,10 +810,9 @@ class MusicScraper(QThread):
 
         if not safe_name:
             safe_name = "Sunnify Playlist"
-            print("[prepare_playlist_folder] empty name → using default")
 
         playlist_folder = os.path.join(base_folder, safe_name)
-        print("[prepare_playlist_folder] final folder:", playlist_folder)
+        logger.debug("Playlist folder for %r: %s", playlist_name, playlist_folder)
 
         os.makedirs(playlist_folder, exist_ok=True)
         return playlist_folder
@@ -273,65 +858,104 @@ class MusicScraper(QThread):
     #     return base + ".mp3"
 
 
-    def download_track_audio(self, search_query, destination):
-        print("[download_track_audio] search_query :", search_query)
-        print("[download_track_audio] destination  :", destination)
+    def _require_ffmpeg(self):
+        """Directory holding ffmpeg; RuntimeError with install hints if there is none.
 
-        # Check for FFmpeg first
-        ffmpeg_path = get_ffmpeg_path()
-        print("[download_track_audio] ffmpeg_path  :", ffmpeg_path)
+        Probed once per scraper; a miss is not remembered, so installing
+        ffmpeg takes effect on the next download.
+        """
+        if self._ffmpeg_dir is None:
+            self._ffmpeg_dir = get_ffmpeg_path()
 
-        if not ffmpeg_path:
+        if not self._ffmpeg_dir:
             raise RuntimeError(
                 "FFmpeg not found! Install via: brew install ffmpeg (macOS) "
                 "or apt install ffmpeg (Linux)"
             )
+        return self._ffmpeg_dir
+
+    def download_track_audio(self, search_query, destination):
+        # Check for FFmpeg first
+        ffmpeg_path = self._require_ffmpeg()
 
         base, _ = os.path.splitext(destination)
-        output_template = base + ".%(ext)s"
-        print("[download_track_audio] output tmpl  :", output_template)
 
+        # FFmpegExtractAudio copies the stream when it already has the profile's codec
+        profile = self.output_profile
         ydl_opts = {
-            "format": "bestaudio/best",
+            "format": profile.ytdlp_format,
             "noplaylist": True,
             "quiet": True,
-            "outtmpl": output_template,
             "ffmpeg_location": ffmpeg_path,
             "postprocessors": [
                 {
                     "key": "FFmpegExtractAudio",
-                    "preferredcodec": "mp3",
+                    "preferredcodec": profile.name,
                     "preferredquality": "192",
                 }
             ],
         }
 
-        print("[download_track_audio] ydl options set")
-
-        with YoutubeDL(ydl_opts) as ydl:
-            print("[download_track_audio] starting download...")
-            info = ydl.extract_info(search_query, download=True)
-
-            if info.get("entries"):
-                info = info["entries"][0]
-                print("[download_track_audio] playlist entry detected → first item")
-
-            expected_path = base + ".mp3"
-            print("[download_track_audio] expected path:", expected_path)
-
-            if os.path.exists(expected_path):
-                print("[download_track_audio] file found:", expected_path)
-                return expected_path
+        logger.debug("yt-dlp %r -> %s (ffmpeg: %s)", search_query, destination, ffmpeg_path)
+        return self._retry.call(self._run_ytdlp, ydl_opts, search_query, base)
 
-            fallback = ydl.prepare_filename(info)
-            print("[download_track_audio] fallback path:", fallback)
-
-            if os.path.exists(fallback):
-                print("[download_track_audio] file found:", fallback)
-                return fallback
+    def _run_ytdlp(self, ydl_opts, search_query, base):
+        """One yt-dlp search+download attempt; returns the audio file path."""
+        ydl = self.ytdlp.get(
+            f"download-{self.output_profile.name}", ydl_opts, outtmpl=base + ".%(ext)s"
+        )
+        info = ydl.extract_info(search_query, download=True)
+
+        if info.get("entries"):
+            info = info["entries"][0]
+
+        expected_path = f"{base}.{self.output_profile.extension}"
+        if os.path.exists(expected_path):
+            return expected_path
+
+        fallback = ydl.prepare_filename(info)
+        if os.path.exists(fallback):
+            return fallback
+
+        logger.debug("No audio file found for %r, assuming %s", search_query, expected_path)
+        return expected_path
+
+    def resolve_track_audio(self, search_query):
+        """URL of the first YouTube result for search_query (nothing downloaded)."""
+        return self._retry.call(self._run_ytdlp_search, search_query)
+
+    def _run_ytdlp_search(self, search_query):
+        ydl_opts = {"quiet": True, "noplaylist": True, "extract_flat": "in_playlist"}
+        info = self.ytdlp.get("search", ydl_opts).extract_info(search_query, download=False)
+
+        entries = info.get("entries") if "entries" in info else [info]
+        for entry in entries or ():
+            url = entry.get("webpage_url") or entry.get("url")
+            if url:
+                return url
+        raise DownloadError(f"No YouTube results for {search_query!r}")
+
+    def fetch_track_audio(self, video_url, base):
+        """Download video_url's best audio stream as base.<ext>, untranscoded.
+
+        Returns the file's path and its audio codec as yt-dlp reports it
+        (e.g. "opus", "mp4a.40.2"), or None if yt-dlp doesn't say.
+        """
+        profile = self.output_profile
+        ydl_opts = {"format": profile.ytdlp_format, "noplaylist": True, "quiet": True}
+        return self._retry.call(self._run_ytdlp_fetch, ydl_opts, video_url, base)
+
+    def _run_ytdlp_fetch(self, ydl_opts, video_url, base):
+        ydl = self.ytdlp.get(
+            f"fetch-{self.output_profile.name}", ydl_opts, outtmpl=base + ".%(ext)s"
+        )
+        info = ydl.extract_info(video_url, download=True)
+        path = ydl.prepare_filename(info)
 
-        print("[download_track_audio] fallback return:", base + ".mp3")
-        return base + ".mp3"
+        if not os.path.exists(path):
+            raise DownloadError(f"yt-dlp produced no file for {video_url}")
+        codec = info.get("acodec")
+        return path, None if codec == "none" else codec
 
 
 
@@ -353,18 +977,17 @@ class MusicScraper(QThread):
     #     return destination
 
     def download_http_file(self, url, destination):
-        print("[download_http_file] URL        :", url)
-        print("[download_http_file] Destination:", destination)
-
-        response = self.session.get(url, stream=True, timeout=60)
+        response = get_with_retry(
+            url, policy=self._retry, session=self.session, stream=True, timeout=60
+        )
         response.raise_for_status()
 
         total = int(response.headers.get("content-length", 0))
-        print("[download_http_file] Total bytes:", total)
+        logger.debug("Downloading %s (%d bytes) to %s", url, total, destination)
 
         downloaded = 0
+        last_progress = -1
         os.makedirs(os.path.dirname(destination), exist_ok=True)
-        print("[download_http_file] Directory ensured")
 
         with open(destination, "wb") as handle:
             for chunk in response.iter_content(chunk_size=8192):
@@ -374,10 +997,11 @@ class MusicScraper(QThread):
                 downloaded += len(chunk)
                 if total:
                     progress = int(downloaded / total * 100)
-                    print(f"[download_http_file] Progress: {progress}% ({downloaded}/{total})")
-                    self.dlprogress_signal.emit(progress)
+                    # One cross-thread signal per percent, not per 8 KB chunk
+                    if progress != last_progress:
+                        last_progress = progress
+                        self.dlprogress_signal.emit(progress)
 
-        print("[download_http_file] Download complete:", destination)
         return destination
 
 
@@ -463,107 +1087,197 @@ class MusicScraper(QThread):
 
 
     def scrape_playlist(self, spotify_playlist_link, music_folder):
-        print("[scrape_playlist] Spotify link:", spotify_playlist_link)
-        print("[scrape_playlist] Music folder :", music_folder)
-
         playlist_id = self.returnSPOT_ID(spotify_playlist_link)
-        print("[scrape_playlist] Playlist ID  :", playlist_id)
+        logger.info("Downloading playlist %s into %s", playlist_id, music_folder)
         self.PlaylistID.emit(playlist_id)
 
         try:
             spotify_api = self.ensure_spotifydown_api()
-            print("[scrape_playlist] Spotify API initialized")
         except SpotifyDownAPIError as exc:
-            print("[scrape_playlist] Spotify API error:", exc)
             raise RuntimeError(str(exc)) from exc
 
-        metadata = spotify_api.get_playlist_metadata(playlist_id)
+        snapshot = spotify_api.get_playlist_snapshot(playlist_id)
+        metadata = snapshot.info
         playlist_display_name = self.format_playlist_name(metadata)
-        print("[scrape_playlist] Playlist name:", playlist_display_name)
         self.song_Album.emit(playlist_display_name)
 
         playlist_folder_path = self.prepare_playlist_folder(music_folder, playlist_display_name)
-        print("[scrape_playlist] Playlist folder path:", playlist_folder_path)
 
-        for idx, track in enumerate(spotify_api.iter_playlist_tracks(playlist_id), start=1):
-            print(f"[scrape_playlist] Track {idx}:", track.title, "-", track.artists)
+        tracks = spotify_api.iter_snapshot_tracks(snapshot, progress=self.tracks_listed.emit)
+        if not self._download_tracks(tracks, playlist_folder_path, metadata.cover_url):
+            logger.info("Download cancelled by user")
+            self.PlaylistCompleted.emit("Download cancelled")
+            return
 
-            if self.is_cancelled():
-                print("[scrape_playlist] Download cancelled by user")
-                self.PlaylistCompleted.emit("Download cancelled")
-                return
+        stats = spotify_api.connection_stats
+        logger.info(
+            "HTTP session so far: %d requests on %d new connections (%.0f%% reused)",
+            stats.requests,
+            stats.new_connections,
+            stats.reuse_ratio * 100,
+        )
+        if self._failed_tracks:
+            msg = f"Done! {len(self._failed_tracks)} track(s) failed"
+            logger.info("Playlist %s: %s", playlist_id, msg)
+            self.PlaylistCompleted.emit(msg)
+        else:
+            logger.info("Playlist %s: download complete", playlist_id)
+            self.PlaylistCompleted.emit("Download Complete!")
 
-            self.Resetprogress_signal.emit(0)
-
-            track_title = track.title
-            artists = track.artists
-            sanitized_title = self.sanitize_text(track_title)
-            sanitized_artists = self.sanitize_text(artists)
-            filename = f"{sanitized_title} - {sanitized_artists}.mp3"
-            filepath = os.path.join(playlist_folder_path, filename)
-            print("[scrape_playlist] Filepath:", filepath)
-
-            album_name = track.album or ""
-            release_date = track.release_date or ""
-            cover_url = track.cover_url or metadata.cover_url
-
-            song_meta = {
-                "title": track_title,
-                "artists": artists,
-                "album": album_name,
-                "releaseDate": release_date,
-                "cover": cover_url or "",
-                "file": filepath,
-            }
-
-            print("[scrape_playlist] Emitting song_meta for track")
-            self.song_meta.emit(dict(song_meta))
-
-            if os.path.exists(filepath):
-                print("[scrape_playlist] Track already exists, skipping download")
-                self.add_song_meta.emit(song_meta)
-                self.increment_counter()
-                continue
 
-            search_query = f"ytsearch1:{track_title} {artists} audio"
-            print("[scrape_playlist] Search query:", search_query)
 
-            try:
-                final_path = self.download_track_audio(search_query, filepath)
-                print("[scrape_playlist] Download finished:", final_path)
-            except Exception as error_status:
-                error_msg = self._get_user_friendly_error(error_status, track_title)
-                self.error_signal.emit(error_msg)
-                print(f"[*] Error downloading '{track_title}': {error_status}")
-                self._failed_tracks.append(track_title)
-                continue
 
-            if not final_path or not os.path.exists(final_path):
-                self.error_signal.emit(f"'{track_title}' - download failed")
-                print(f"[*] Download did not produce an audio file for: {track_title}")
-                self._failed_tracks.append(track_title)
-                continue
 
-            song_meta["file"] = final_path
-            self.add_song_meta.emit(song_meta)
-            self.increment_counter()
-            self.dlprogress_signal.emit(100)
-            print(f"[scrape_playlist] Track processed: {track_title}")
 
-        if self._failed_tracks:
-            msg = f"Done! {len(self._failed_tracks)} track(s) failed"
-            print("[scrape_playlist]", msg)
-            self.PlaylistCompleted.emit(msg)
-        else:
-            print("[scrape_playlist] Download Complete!")
-            self.PlaylistCompleted.emit("Download Complete!")
 
 
+    def _download_tracks(self, tracks, playlist_folder_path, playlist_cover):
+        """Run tracks through the staged download pipeline; False if cancelled.
 
+        This thread lists the playlist and reports finished tracks strictly
+        in playlist order, so song_meta/add_song_meta, the counter and
+        _failed_tracks see the same sequence as a one-at-a-time download.
+        """
+        self._require_ffmpeg()
+        stage_funcs = {
+            "search": self._search_stage,
+            "fetch": self._fetch_stage,
+            "transcode": self._transcode_stage,
+            "tag": self._tag_stage,
+        }
+        pipeline = StagedPipeline(
+            [(name, stage_funcs[name], self.stage_workers[name]) for name in PIPELINE_STAGES],
+            cancel_event=self._cancel_event,
+        )
+        # Fetched streams wait for the transcode stage in a hidden per-run
+        # folder, so nothing half-done is left next to the finished files
+        source_dir = tempfile.mkdtemp(prefix=".sunnify-", dir=playlist_folder_path)
+        jobs = self._track_jobs(tracks, playlist_folder_path, playlist_cover, source_dir)
+        try:
+            return pipeline.run(jobs, self._finish_track)
+        finally:
+            shutil.rmtree(source_dir, ignore_errors=True)
+            # The worker threads are gone; so is any use for their instances
+            logger.debug(
+                "yt-dlp: %d instance(s) built in %.2fs, %d track(s) downloaded",
+                self.ytdlp.created,
+                self.ytdlp.setup_seconds,
+                self.counter,
+            )
+            self.ytdlp.close()
+
+    def _track_jobs(self, tracks, playlist_folder_path, playlist_cover, source_dir):
+        """Listing stage: one job per track, marking those with nothing to fetch."""
+        claimed = set()
+        for idx, track in enumerate(tracks, start=1):
+            logger.debug("Track %d: %s - %s", idx, track.title, track.artists)
+            job = _TrackJob(
+                track,
+                self._song_meta(track, playlist_folder_path, playlist_cover),
+                os.path.join(source_dir, str(idx)),
+            )
+            filepath = job.song_meta["file"]
+            if filepath in claimed:
+                # Same file name as an earlier track: reported once that one is done
+                job.done = True
+            elif os.path.exists(filepath):
+                logger.debug("Already downloaded, skipping: %s", filepath)
+                job.done = True
+            elif self._skip_known_dead(track.id, track.title):
+                job.done = job.skipped = True
+            claimed.add(filepath)
+            yield job
+
+    def _song_meta(self, track, playlist_folder_path, playlist_cover):
+        sanitized_title = self.sanitize_text(track.title)
+        sanitized_artists = self.sanitize_text(track.artists)
+        extension = self.output_profile.extension
+        filename = f"{sanitized_title} - {sanitized_artists}.{extension}"
+        return {
+            "title": track.title,
+            "artists": track.artists,
+            "album": track.album or "",
+            "releaseDate": track.release_date or "",
+            "cover": track.cover_url or playlist_cover or "",
+            "file": os.path.join(playlist_folder_path, filename),
+        }
 
+    def _search_stage(self, job):
+        track = job.track
+        job.video_url = self.resolve_track_audio(f"ytsearch1:{track.title} {track.artists} audio")
 
+    def _fetch_stage(self, job):
+        job.source_path, job.source_codec = self.fetch_track_audio(job.video_url, job.source_base)
 
+    def _transcode_stage(self, job):
+        try:
+            transcode_audio(
+                job.source_path,
+                job.song_meta["file"],
+                self._require_ffmpeg(),
+                self.output_profile,
+                codec=job.source_codec,
+                threads=self.transcode_threads,
+                niceness=self.transcode_niceness,
+            )
+        finally:
+            if os.path.exists(job.source_path):
+                os.remove(job.source_path)
 
+    def _tag_stage(self, job):
+        if not self.write_tags:
+            return
+        filename = job.song_meta["file"]
+        try:
+            write_audio_tags(filename, job.song_meta, self._fetch_cover(job.song_meta["cover"]))
+        except Exception as e:
+            # Tags are nice-to-have; the track itself downloaded fine
+            logger.warning("Error writing meta tags to %s: %s", filename, e)
+            return
+        job.song_meta["tagged"] = True
+
+    def _fetch_cover(self, url):
+        if not url:
+            return None
+        try:
+            response = get_with_retry(url, policy=COVER_RETRY, session=self.session, timeout=30)
+        except Exception as e:
+            logger.warning("Cover download failed for %s: %s", url, e)
+            return None
+        if response.status_code != 200:
+            logger.warning("Cover download failed (HTTP %s): %s", response.status_code, url)
+            return None
+        return response.content
+
+    def _finish_track(self, job):
+        """Report one track's outcome; called in playlist order."""
+        track = job.track
+        song_meta = job.song_meta
+        self.Resetprogress_signal.emit(0)
+        self.song_meta.emit(dict(song_meta))
+        if job.skipped:
+            self.error_signal.emit(f"'{track.title}' - not found on a recent run, skipped")
+            self._failed_tracks.append(track.title)
+            return
+
+        if job.error is not None:
+            self.error_signal.emit(self._get_user_friendly_error(job.error, track.title))
+            logger.warning("Error downloading '%s': %s", track.title, job.error)
+            self._failed_tracks.append(track.title)
+            self._remember_no_audio(track.id, job.error)
+            return
+
+        if not os.path.exists(song_meta["file"]):
+            if self.is_cancelled():
+                return
+            self.error_signal.emit(f"'{track.title}' - download failed")
+            logger.warning("Download did not produce an audio file for: %s", track.title)
+            self._failed_tracks.append(track.title)
+            return
+
+        self.add_song_meta.emit(song_meta)
+        self.increment_counter()
+        self.dlprogress_signal.emit(100)
 
     # def returnSPOT_ID(self, link):
     #     """Extract playlist ID from Spotify URL."""
@@ -572,10 +1286,7 @@ class MusicScraper(QThread):
 
 
     def returnSPOT_ID(self, link):
-        print("[returnSPOT_ID] Spotify link:", link)
-        playlist_id = extract_playlist_id(link)
-        print("[returnSPOT_ID] Extracted playlist ID:", playlist_id)
-        return playlist_id
+        return extract_playlist_id(link)
 
 
 
@@ -654,29 +1365,21 @@ class MusicScraper(QThread):
 
 
     def scrape_track(self, spotify_track_link, music_folder):
-        print("[scrape_track] Spotify track link:", spotify_track_link)
-        print("[scrape_track] Music folder      :", music_folder)
-
         url_type, track_id = detect_spotify_url_type(spotify_track_link)
-        print("[scrape_track] Detected URL type :", url_type)
-        print("[scrape_track] Track ID          :", track_id)
-
         if url_type != "track":
             raise ValueError("Expected a track URL")
 
+        logger.info("Downloading track %s into %s", track_id, music_folder)
         try:
             spotify_api = self.ensure_spotifydown_api()
-            print("[scrape_track] Spotify API initialized")
         except SpotifyDownAPIError as exc:
-            print("[scrape_track] Spotify API error:", exc)
             raise RuntimeError(str(exc)) from exc
 
         track = spotify_api.get_track(track_id)
-        print(f"[scrape_track] Track title: {track.title} | Artists: {track.artists}")
         self.song_Album.emit("Single Track Download")
 
         if not os.path.exists(music_folder):
-            print("[scrape_track] Creating music folder")
+            logger.debug("Creating music folder %s", music_folder)
             os.makedirs(music_folder)
 
         self.Resetprogress_signal.emit(0)
@@ -685,9 +1388,9 @@ class MusicScraper(QThread):
         artists = track.artists
         sanitized_title = self.sanitize_text(track_title)
         sanitized_artists = self.sanitize_text(artists)
-        filename = f"{sanitized_title} - {sanitized_artists}.mp3"
+        extension = self.output_profile.extension
+        filename = f"{sanitized_title} - {sanitized_artists}.{extension}"
         filepath = os.path.join(music_folder, filename)
-        print("[scrape_track] Filepath:", filepath)
 
         album_name = track.album or ""
         release_date = track.release_date or ""
@@ -702,11 +1405,10 @@ class MusicScraper(QThread):
             "file": filepath,
         }
 
-        print("[scrape_track] Emitting song_meta")
         self.song_meta.emit(dict(song_meta))
 
         if os.path.exists(filepath):
-            print("[scrape_track] Track already exists, skipping download")
+            logger.debug("Already downloaded, skipping: %s", filepath)
             self.add_song_meta.emit(song_meta)
             self.increment_counter()
             self.PlaylistCompleted.emit("Track already exists!")
@@ -714,27 +1416,32 @@ class MusicScraper(QThread):
 
         # Download via YouTube search
         search_query = f"ytsearch1:{track_title} {artists} audio"
-        print("[scrape_track] Search query:", search_query)
 
+        # A single track is always attempted, even if a playlist run gave up on it
         try:
             final_path = self.download_track_audio(search_query, filepath)
-            print("[scrape_track] Download finished:", final_path)
         except Exception as error_status:
             error_msg = self._get_user_friendly_error(error_status, track_title)
-            print(f"[*] Error downloading '{track_title}': {error_status}")
+            logger.warning("Error downloading '%s': %s", track_title, error_status)
+            self._remember_no_audio(track_id, error_status)
             self.PlaylistCompleted.emit(error_msg)
             return
+        finally:
+            self.ytdlp.close()
 
         if not final_path or not os.path.exists(final_path):
-            print(f"[*] Download did not produce an audio file for: {track_title}")
+            logger.warning("Download did not produce an audio file for: %s", track_title)
             self.PlaylistCompleted.emit("Download failed - no audio file produced")
             return
 
+        if self.negative_cache is not None:
+            self.negative_cache.discard(track_id, "no_audio")
+
         song_meta["file"] = final_path
         self.add_song_meta.emit(song_meta)
         self.increment_counter()
         self.dlprogress_signal.emit(100)
-        print("[scrape_track] Download Complete!")
+        logger.info("Track %s: download complete", track_id)
         self.PlaylistCompleted.emit("Download Complete!")
 
 
@@ -747,7 +1454,6 @@ class MusicScraper(QThread):
 
     def increment_counter(self):
         self.counter += 1
-        print(f"[increment_counter] Counter updated: {self.counter}")
         self.count_updated.emit(self.counter)  # Emit the signal with the updated count
 
 
@@ -788,45 +1494,43 @@ class ScraperThread(QThread):
     progress_update = pyqtSignal(str)
 
     def __init__(
-        self, spotify_link, music_folder=None, cancel_event: threading.Event | None = None
+        self,
+        spotify_link,
+        music_folder=None,
+        cancel_event: threading.Event | None = None,
+        download_workers: int | None = None,
+        write_tags: bool = False,
+        output_format: str | None = None,
     ):
         super().__init__()
-        print("[ScraperThread] Initializing...")
         self.spotify_link = spotify_link
-        print(f"[ScraperThread] Spotify link: {spotify_link}")
-
         self.music_folder = music_folder or os.path.join(os.getcwd(), "music")
-        print(f"[ScraperThread] Music folder: {self.music_folder}")
-
         self._cancel_event = cancel_event or threading.Event()
-        self.scraper = MusicScraper(cancel_event=self._cancel_event)
-        print("[ScraperThread] Initialized successfully")
+        self.scraper = MusicScraper(
+            cancel_event=self._cancel_event,
+            download_workers=download_workers,
+            write_tags=write_tags,
+            output_format=output_format,
+        )
 
     def request_cancel(self):
         """Request cancellation of the download."""
-        print("[ScraperThread] Cancel requested")
+        logger.info("Scraper cancel requested")
         self._cancel_event.set()
 
     def run(self):
-        print("[ScraperThread] Thread started")
         self.progress_update.emit("Scraping started...")
 
         try:
-            print("[ScraperThread] Detecting Spotify URL type...")
             url_type, _ = detect_spotify_url_type(self.spotify_link)
-            print(f"[ScraperThread] URL type detected: {url_type}")
-
             if url_type == "track":
-                print("[ScraperThread] Starting track scrape")
                 self.scraper.scrape_track(self.spotify_link, self.music_folder)
             else:
-                print("[ScraperThread] Starting playlist scrape")
                 self.scraper.scrape_playlist(self.spotify_link, self.music_folder)
                 self.progress_update.emit("Scraping completed.")
-                print("[ScraperThread] Scraping completed")
 
         except Exception as e:
-            print(f"[ScraperThread] Error: {e}")
+            logger.warning("Scraping %s failed: %s", self.spotify_link, e)
             self.progress_update.emit(f"{e}")
 
 
@@ -861,18 +1565,15 @@ class DownloadCover(QThread):
     def __init__(self, url):
         super().__init__()
         self.url = url
-        print(f"[DownloadCover] Initialized with URL: {url}")
 
     def run(self):
-        print("[DownloadCover] Download started")
-        response = requests.get(self.url, stream=True)
-        print(f"[DownloadCover] HTTP Status: {response.status_code}")
-
+        response = get_with_retry(
+            self.url, policy=COVER_RETRY, session=shared_session(), stream=True, timeout=30
+        )
         if response.status_code == 200:
-            print("[DownloadCover] Cover downloaded successfully")
             self.albumCover.emit(response.content)
         else:
-            print("[DownloadCover] Failed to download cover")
+            logger.warning("Cover download failed (HTTP %s): %s", response.status_code, self.url)
 
 
 
@@ -930,61 +1631,38 @@ class WritingMetaTagsThread(QThread):
         self.tags = tags
         self.filename = filename
         self._cover_thread = None  # Keep reference to prevent GC
-        print("[MetaTags] Thread initialized")
-        print("[MetaTags] Target file:", filename)
 
     def run(self):
         try:
-            print("[MetaTags] Writing ID3 tags...")
-            audio = EasyID3(self.filename)
-
-            audio["title"] = self.tags.get("title", "")
-            audio["artist"] = self.tags.get("artists", "")
-            audio["album"] = self.tags.get("album", "")
-            audio["date"] = self.tags.get("releaseDate", "")
-            audio.save()
-
-            print("[MetaTags] Text tags saved")
+            logger.debug("Writing tags to %s", self.filename)
+            write_audio_tags(self.filename, self.tags)
 
             # Only download cover if URL exists
             cover_url = self.tags.get("cover", "")
             if cover_url:
-                print("[MetaTags] Cover URL found, downloading...")
                 self._cover_thread = DownloadCover(cover_url)
                 self._cover_thread.albumCover.connect(self.setPIC)
                 self._cover_thread.start()
-            else:
-                print("[MetaTags] No cover URL found")
 
         except Exception as e:
-            print(f"[MetaTags] Error writing meta tags: {e}")
+            logger.warning("Error writing meta tags to %s: %s", self.filename, e)
 
     def setPIC(self, data):
         if data is None:
-            print("[MetaTags] Cover data is empty")
+            logger.warning("No cover data for %s", self.filename)
             self.tags_success.emit("Cover Not Added..!")
             import sys
             sys.exit(1)
         else:
             try:
-                print("[MetaTags] Adding cover image...")
-                audio = ID3(self.filename)
-                audio["APIC"] = APIC(
-                    encoding=3,
-                    mime="image/jpeg",
-                    type=3,
-                    desc="Cover",
-                    data=data,
-                )
-                audio.save()
-                print("[MetaTags] Cover added successfully")
+                write_audio_tags(self.filename, None, data)
                 self.tags_success.emit("Tags added successfully")
 
                 # import sys
                 sys.exit(0)  # exit with success code
 
             except Exception as e:
-                print(f"[MetaTags] Error adding cover: {e}")
+                logger.warning("Error adding cover to %s: %s", self.filename, e)
                 self.tags_success.emit(f"Error adding cover: {e}")
                 import sys
                 sys.exit(1)
@@ -1030,33 +1708,26 @@ class DownloadThumbnail(QThread):
         self.url = url
         self.main_UI = main_UI
         self.thumbnail_ready.connect(self._update_ui)
-        print("[Thumbnail] Thread initialized")
-        print("[Thumbnail] URL:", url)
 
     def run(self):
         if not self.url:
-            print("[Thumbnail] No URL provided, skipping")
             return
 
         try:
-            print("[Thumbnail] Download started")
-            response = requests.get(self.url, stream=True, timeout=10)
-            print(f"[Thumbnail] HTTP Status: {response.status_code}")
-
+            response = get_with_retry(
+                self.url, policy=COVER_RETRY, session=shared_session(), stream=True, timeout=10
+            )
             if response.status_code == 200:
-                print("[Thumbnail] Thumbnail downloaded")
                 self.thumbnail_ready.emit(response.content)
         except Exception as e:
-            print(f"[Thumbnail] Error: {e}")  # Previously silent
+            logger.warning("Thumbnail download failed for %s: %s", self.url, e)
 
     def _update_ui(self, data):
         """Update UI from main thread via signal."""
-        print("[Thumbnail] Updating UI")
         pic = QImage()
         pic.loadFromData(data)
         self.main_UI.CoverImg.setPixmap(QPixmap(pic))
         self.main_UI.CoverImg.show()
-        print("[Thumbnail] UI updated")
 
 
 
@@ -1100,7 +1771,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     def __init__(self):
         """MainWindow constructor"""
         super().__init__()
-        print("[MainWindow] Initializing...")
         self.setupUi(self)
 
         # if len(sys.argv) > 1:
@@ -1114,7 +1784,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         # Default download path
         self.download_path = self._get_default_download_path()
-        print("[MainWindow] Default download path:", self.download_path)
+        logger.debug("Default download path: %s", self.download_path)
 
         self._download_path_set = False
         self._active_threads = []
@@ -1124,7 +1794,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.SONGINFORMATION.setGraphicsEffect(
             QGraphicsDropShadowEffect(blurRadius=25, xOffset=2, yOffset=2)
         )
-        print("[MainWindow] UI effects applied")
 
         self.PlaylistLink.returnPressed.connect(self.on_returnButton)
         self.DownloadBtn.clicked.connect(self.on_returnButton)
@@ -1142,15 +1811,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
 
         
-        print("[MainWindow] Download triggers connected")
 
         self.showPreviewCheck.stateChanged.connect(self.show_preview)
-        print("[MainWindow] Preview checkbox connected")
 
         self.Closed.clicked.connect(self.exitprogram)
         self.Select_Home.clicked.connect(self.Linkedin)
         self.SettingsBtn.clicked.connect(self.open_settings)
-        print("[MainWindow] Control buttons connected")
 
 
     # def _get_default_download_path(self):
@@ -1177,16 +1843,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def _get_default_download_path(self):
         """Get a sensible default download path that's writable."""
-        print("[Path] Resolving default download path")
-
         # Try user's Music folder first
         home = os.path.expanduser("~")
         music_folder = os.path.join(home, "Music", "Sunnify")
-        print("[Path] Base path:", music_folder)
 
         # On Windows, Music might be in a different location
         if sys.platform == "win32":
-            print("[Path] Windows platform detected")
             try:
                 import winreg
 
@@ -1198,13 +1860,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                     winreg.QueryValueEx(key, "My Music")[0], "Sunnify"
                 )
                 winreg.CloseKey(key)
-                print("[Path] Windows Music path resolved:", music_folder)
+                logger.debug("Windows Music path resolved: %s", music_folder)
 
             except Exception as e:
-                print("[Path] Failed to read registry, using fallback:", e)
+                logger.warning("Failed to read registry, using fallback: %s", e)
                 music_folder = os.path.join(home, "Music", "Sunnify")
 
-        print("[Path] Final download path:", music_folder)
         return music_folder
 
 
@@ -1224,11 +1885,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def _ensure_download_path(self):
         """Ensure download path exists and is writable. Returns True if valid."""
-        print("[Path] Checking download path:", self.download_path)
+        logger.debug("Checking download path: %s", self.download_path)
 
         try:
             os.makedirs(self.download_path, exist_ok=True)
-            print("[Path] Directory exists or created")
 
             # Test write access
             test_file = os.path.join(self.download_path, ".sunnify_test")
@@ -1236,12 +1896,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 f.write("test")
 
             os.remove(test_file)
-            print("[Path] Write permission confirmed")
 
             return True
 
         except OSError as e:
-            print("[Path] Path validation failed:", e)
+            logger.warning("Download path %s is not writable: %s", self.download_path, e)
             return False
 
 
@@ -1268,8 +1927,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def _prompt_download_location(self):
         """Prompt user to select download location. Returns True if selected."""
-        print("[Path] Prompting user to select download folder")
-
         folder = QFileDialog.getExistingDirectory(
             self,
             "Select Download Folder",
@@ -1278,16 +1935,15 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         )
 
         if folder:
-            print("[Path] User selected folder:", folder)
 
             # Create Sunnify subfolder so downloads don't splatter everywhere
             self.download_path = os.path.join(folder, "Sunnify")
             self._download_path_set = True
-            print("[Path] Download path set to:", self.download_path)
+            logger.debug("Download path set to: %s", self.download_path)
 
             return True
 
-        print("[Path] User cancelled folder selection")
+        logger.info("User cancelled folder selection")
         return False
 
 
@@ -1312,8 +1968,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def open_settings(self):
         """Open settings dialog to choose download location."""
-        print("[Settings] Opening download location dialog")
-
         folder = QFileDialog.getExistingDirectory(
             self,
             "Select Download Folder",
@@ -1322,19 +1976,15 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         )
 
         if folder:
-            print("[Settings] User selected folder:", folder)
-
             self.download_path = os.path.join(folder, "Sunnify")
             self._download_path_set = True
-            print("[Settings] Download path updated to:", self.download_path)
+            logger.debug("Download path updated to: %s", self.download_path)
 
             QMessageBox.information(
                 self,
                 "Settings Updated",
                 f"Download location set to:\n{self.download_path}",
             )
-        else:
-            print("[Settings] No folder selected")
 
 
 
@@ -1497,42 +2147,35 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     @pyqtSlot()
     def on_returnButton(self):
-        print("[Main] Download button pressed")
-
         # Stop download if already running
         if self._is_downloading:
-            print("[Main] Download in progress → stopping")
+            logger.debug("Download in progress, stopping it")
             self._stop_download()
             return
 
         # Get URL from text input
         spotify_url = self.PlaylistLink.text().strip()
-        print("[Main] Spotify URL:", spotify_url)
 
         if not spotify_url:
-            print("[Main] No URL entered")
             self.statusMsg.setText("Please enter a Spotify URL")
             return
 
         # Set default download folder if not set
         default_path = "/home/where/Downloads/SONG/MYSONG"
         if not self._download_path_set:
-            print("[Main] Setting default download folder")
             if not os.path.exists(default_path):
-                print(f"[Main] Folder does not exist → creating: {default_path}")
+                logger.debug("Creating default download folder %s", default_path)
                 try:
                     os.makedirs(default_path)
                 except Exception as e:
-                    print("[Main] Failed to create default folder:", e)
+                    logger.warning("Failed to create default folder %s: %s", default_path, e)
                     self.statusMsg.setText("Failed to create default download folder")
                     return
             self.download_path = default_path
             self._download_path_set = True
 
         # Validate folder
-        print("[Main] Validating download path")
         if not self._ensure_download_path():
-            print("[Main] Download path not writable")
             self.statusMsg.setText("Cannot write to download folder")
             QMessageBox.warning(
                 self,
@@ -1540,24 +2183,25 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 f"Cannot write to:\n{self.download_path}\n\nPlease select a different folder.",
             )
             if not self._prompt_download_location():
-                print("[Main] User cancelled re-selection")
+                logger.info("User cancelled re-selection")
                 return
 
         try:
             # Detect URL type
-            print("[Main] Detecting Spotify URL type")
             url_type, _ = detect_spotify_url_type(spotify_url)
-            print("[Main] URL type:", url_type)
             self.statusMsg.setText(f"Detected: {url_type}")
 
             # Prepare threading for download
             self._cancel_event = threading.Event()
             self._is_downloading = True
             self.DownloadBtn.setText("Stop")
-            print("[Main] Download started")
+            logger.info("Starting %s download: %s -> %s", url_type, spotify_url, self.download_path)
 
             self.scraper_thread = ScraperThread(
-                spotify_url, self.download_path, cancel_event=self._cancel_event
+                spotify_url,
+                self.download_path,
+                cancel_event=self._cancel_event,
+                write_tags=self.AddMetaDataCheck.isChecked(),
             )
 
             # Connect signals
@@ -1575,13 +2219,13 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 lambda x: self.statusMsg.setText(x)
             )
             self.scraper_thread.scraper.count_updated.connect(self.update_counter)
+            self.scraper_thread.scraper.tracks_listed.connect(self.update_tracks_listed)
 
             # Start thread
-            print("[Main] Starting scraper thread")
             self.scraper_thread.start()
 
         except ValueError as e:
-            print("[Main] Error:", e)
+            logger.warning("Rejected URL %r: %s", spotify_url, e)
             self.statusMsg.setText(str(e))
             self._is_downloading = False
             self.DownloadBtn.setText("Download")
@@ -1619,31 +2263,27 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def _stop_download(self):
         """Stop the current download gracefully using cooperative cancellation."""
-        print("[Main] Stop download requested")
         self.statusMsg.setText("Stopping download...")
 
         # Signal cancellation via event (thread checks this periodically)
-        print("[Main] Setting cancel event")
         self._cancel_event.set()
 
         # Wait for thread to finish gracefully
         if hasattr(self, "scraper_thread") and self.scraper_thread.isRunning():
-            print("[Main] Requesting scraper thread cancel")
             self.scraper_thread.request_cancel()
 
             # Give thread time to finish current operation and exit cleanly
             if not self.scraper_thread.wait(3000):  # Wait up to 3 seconds
-                print("[Main] Thread not responding, terminating")
+                logger.warning("Scraper thread not responding, terminating")
                 # Only terminate as last resort if thread doesn't respond
                 self.scraper_thread.terminate()
                 self.scraper_thread.wait(1000)
             else:
-                print("[Main] Scraper thread stopped cleanly")
+                logger.info("Scraper thread stopped cleanly")
 
         self._is_downloading = False
         self.DownloadBtn.setText("Download")
         self.statusMsg.setText("Download stopped")
-        print("[Main] Download stopped")
 
 
 
@@ -1662,17 +2302,13 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def thread_finished(self):
         """Reset UI state when download thread finishes."""
-        print("[Main] Scraper thread finished")
-
         self._is_downloading = False
         self.DownloadBtn.setText("Download")
 
         if hasattr(self, "scraper_thread"):
-            print("[Main] Cleaning up scraper thread")
             self.scraper_thread.deleteLater()  # Clean up the thread properly
 
     def update_progress(self, message):
-        print("[Main] Progress update:", message)
         self.statusMsg.setText(message)
 
 
@@ -1710,16 +2346,14 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     @pyqtSlot(dict)
     def update_song_META(self, song_meta):
-        """Update UI with current track info (called BEFORE download starts)."""
-        print("[UI] update_song_META called")
-        print("[UI] Song meta:", song_meta)
+        """Update UI with track info.
 
+        Called before a single-track download starts, but for playlists only
+        once each track has finished the download pipeline.
+        """
         if self.showPreviewCheck.isChecked():
-            print("[UI] Preview enabled")
-
             cover_url = song_meta.get("cover", "")
             if cover_url:
-                print("[UI] Cover URL found, downloading thumbnail")
                 thumb_thread = DownloadThumbnail(cover_url, self)
                 self._active_threads.append(thumb_thread)
                 thumb_thread.finished.connect(lambda: self._cleanup_thread(thumb_thread))
@@ -1729,31 +2363,23 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.AlbumText.setText(song_meta.get("album", ""))
             self.SongName.setText(song_meta.get("title", ""))
             self.YearText.setText(song_meta.get("releaseDate", ""))
-        else:
-            print("[UI] Preview disabled")
 
         self.MainSongName.setText(
             song_meta.get("title", "") + " - " + song_meta.get("artists", "")
         )
-        print("[UI] Main song title updated")
 
         # NOTE: Meta tags are written in add_song_META (after file exists), not here
 
     @pyqtSlot(dict)
     def add_song_META(self, song_meta):
-        print("[UI] add_song_META called")
-
-        if self.AddMetaDataCheck.isChecked():
-            print("[UI] Metadata writing enabled")
-
+        # Playlist tracks are tagged by the download pipeline
+        if self.AddMetaDataCheck.isChecked() and not song_meta.get("tagged"):
             meta_thread = WritingMetaTagsThread(song_meta, song_meta["file"])
             meta_thread.tags_success.connect(lambda x: self.statusMsg.setText(f"{x}"))
 
             self._active_threads.append(meta_thread)
             meta_thread.finished.connect(lambda: self._cleanup_thread(meta_thread))
             meta_thread.start()
-        else:
-            print("[UI] Metadata writing disabled")
 
 
 
@@ -1784,34 +2410,32 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def _cleanup_thread(self, thread):
         """Remove finished thread from active list."""
-        print("[Thread] Cleaning up thread:", thread)
-
         if thread in self._active_threads:
             self._active_threads.remove(thread)
-            print("[Thread] Thread removed from active list")
 
     @pyqtSlot(str)
     def update_AlbumName(self, AlbumName):
-        print("[UI] Album name updated:", AlbumName)
         self.AlbumName.setText("Playlist Name : " + AlbumName)
 
     @pyqtSlot(int)
     def update_counter(self, count):
-        print("[UI] Download count:", count)
         self.CounterLabel.setText("Songs downloaded " + str(count))
 
     @pyqtSlot(int)
     def update_song_progress(self, progress):
-        print("[UI] Song progress:", progress)
         self.SongDownloadprogressBar.setValue(progress)
         self.SongDownloadprogress.setValue(progress)
 
     @pyqtSlot(int)
     def Reset_song_progress(self, progress):
-        print("[UI] Song progress reset")
         self.SongDownloadprogressBar.setValue(0)
         self.SongDownloadprogress.setValue(0)
 
+    @pyqtSlot(int, int)
+    def update_tracks_listed(self, listed, total):
+        if listed < total:
+            self.statusMsg.setText(f"Listing playlist: {listed} of {total} tracks")
+
 
 
 
@@ -1870,7 +2494,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     # DRAGGLESS INTERFACE
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            print("[UI] Mouse press - drag start")
             self.m_drag = True
             self.m_DragPosition = event.globalPos() - self.pos()
             event.accept()
@@ -1879,19 +2502,16 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     def mouseMoveEvent(self, QMouseEvent):
         try:
             if Qt.LeftButton and self.m_drag:
-                print("[UI] Mouse move - dragging window")
                 self.move(QMouseEvent.globalPos() - self.m_DragPosition)
                 QMouseEvent.accept()
         except AttributeError:
-            print("[UI] Mouse move - drag state missing")
+            pass
 
     def mouseReleaseEvent(self, QMouseEvent):
-        print("[UI] Mouse release - drag stop")
         self.m_drag = False
         self.setCursor(QCursor(Qt.ArrowCursor))
 
     def CloseSongInformation(self):
-        print("[UI] Closing song information panel")
         self.animation = QPropertyAnimation(self.SONGINFORMATION, b"size")
         self.animation.setDuration(250)
         self.animation.setEndValue(QSize(0, 440))
@@ -1899,7 +2519,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.animation.start()
 
     def OpenSongInformation(self):
-        print("[UI] Opening song information panel")
         self.animation = QPropertyAnimation(self.SONGINFORMATION, b"size")
         self.animation.setDuration(1000)
         self.animation.setEndValue(QSize(350, 440))
@@ -1907,23 +2526,22 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.animation.start()
 
     def show_preview(self, state):
-        print("[UI] Preview toggle state:", state)
         if state == 2:  # Checked
             self.preview_window = self.OpenSongInformation()
         else:
             self.CloseSongInformation()
 
     def exitprogram(self):
-        print("[App] Exiting application")
+        logger.debug("Exiting application")
         sys.exit()
 
     def Linkedin(self):
-        print("[UI] Opening LinkedIn profile")
         webbrowser.open("https://www.linkedin.com/in/sunny-patel-30b460204/")
 
 
 # Main
 if __name__ == "__main__":
+    configure_logging()
     app = QApplication(sys.argv)
     Screen = MainWindow()
     Screen.setFixedHeight(500)
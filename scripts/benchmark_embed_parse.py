@@ -0,0 +1,100 @@
+"""Micro-benchmark for embed page __NEXT_DATA__ extraction.
+
+Compares the old path (decode the whole page, regex, json.loads everything)
+with the byte-level extractor used by SpotifyEmbedAPI, on the conftest sample
+page and on a synthetic 100-track page padded like a real embed response.
+
+Usage:
+    python scripts/benchmark_embed_parse.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotifydown_api import (  # noqa: E402
+    SpotifyEmbedAPI,
+    _next_data_text,
+    _parse_next_data,
+)
+from tests.conftest import SAMPLE_EMBED_HTML  # noqa: E402
+
+
+def legacy_parse(body: bytes) -> dict:
+    html = body.decode("utf-8")
+    match = SpotifyEmbedAPI._NEXT_DATA_PATTERN.search(html)
+    return json.loads(match.group(1))
+
+
+def byte_parse(body: bytes) -> dict:
+    return _parse_next_data(_next_data_text(body))
+
+
+def synthetic_page(n_tracks: int = 100) -> bytes:
+    """An embed page roughly the size of a real 100-track playlist embed."""
+    data = json.loads(SpotifyEmbedAPI._NEXT_DATA_PATTERN.search(SAMPLE_EMBED_HTML).group(1))
+    state = data["props"]["pageProps"]["state"]
+    template = state["data"]["entity"]["trackList"][0]
+    state["data"]["entity"]["trackList"] = [
+        {**template, "uri": f"spotify:track:{i:022d}", "title": f"Song {i}"}
+        for i in range(n_tracks)
+    ]
+    # Real pages carry build manifests, translations and config we never read
+    data["props"]["pageProps"]["config"] = {
+        f"key{i}": {"value": "x" * 64, "flags": list(range(16))} for i in range(2000)
+    }
+    data["buildId"] = "b" * 40
+    scaffold = "<div>" + "<span class='c'>filler</span>" * 5000 + "</div>"
+    return (
+        "<!DOCTYPE html><html><head><title>Spotify Embed</title></head><body>"
+        f"{scaffold}"
+        f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+        "</body></html>"
+    ).encode()
+
+
+def _entity(data: dict) -> dict:
+    return data["props"]["pageProps"]["state"]["data"]["entity"]
+
+
+def measure(func: Callable[[bytes], dict], body: bytes, number: int) -> tuple[float, int]:
+    """Return (mean seconds per call, peak traced bytes of one call)."""
+    seconds = timeit.timeit(lambda: func(body), number=number) / number
+    tracemalloc.start()
+    result = func(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="timeit iterations")
+    args = parser.parse_args()
+
+    pages = {
+        "conftest sample": SAMPLE_EMBED_HTML.encode(),
+        "synthetic 100 tracks": synthetic_page(),
+    }
+    for name, body in pages.items():
+        assert _entity(byte_parse(body)) == _entity(legacy_parse(body))
+        print(f"\n{name} ({len(body) / 1024:.1f} KiB)")
+        for label, func in (("legacy", legacy_parse), ("byte-level", byte_parse)):
+            seconds, peak = measure(func, body, args.number)
+            print(f"  {label:<11} {seconds * 1e6:10.1f} us/call  peak {peak / 1024:9.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+"""Benchmark stdlib json against the optional fast JSON backend (orjson).
+
+Covers the three hot paths: parsing an embed page's __NEXT_DATA__, parsing a
+spclient playlist response, and serializing the backend's track list
+response, for 100-track and 5,000-track playlists.
+
+Usage:
+    python scripts/benchmark_json.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotifydown_api import orjson  # noqa: E402
+
+SIZES = (100, 5000)
+
+
+def embed_payload(n_tracks: int) -> bytes:
+    track_list = [
+        {
+            "uri": f"spotify:track:{i:022d}",
+            "uid": f"{i:016x}",
+            "title": f"Song {i} (feat. Artista Ñoño)",
+            "subtitle": "Artist One, Artist Two",
+            "isExplicit": i % 7 == 0,
+            "duration": 180000 + i,
+            "audioPreview": {"url": f"https://p.scdn.co/mp3-preview/{i:040x}"},
+            "album": {"name": f"Album {i // 12}"},
+        }
+        for i in range(n_tracks)
+    ]
+    data = {
+        "props": {
+            "pageProps": {
+                "state": {
+                    "data": {
+                        "entity": {
+                            "name": "Benchmark Playlist",
+                            "subtitle": "Benchmark User",
+                            "trackList": track_list,
+                        }
+                    },
+                    "settings": {"session": {"accessToken": "x" * 120}},
+                }
+            }
+        }
+    }
+    return json.dumps(data).encode()
+
+
+def spclient_payload(n_tracks: int) -> bytes:
+    items = [
+        {
+            "uri": f"spotify:track:{i:022d}",
+            "attributes": {"timestamp": str(1700000000000 + i), "formatAttributes": []},
+        }
+        for i in range(n_tracks)
+    ]
+    return json.dumps({"length": n_tracks, "contents": {"items": items}}).encode()
+
+
+def backend_response(n_tracks: int) -> dict[str, Any]:
+    tracks = [
+        {
+            "id": f"{i:022d}",
+            "title": f"Song {i} (feat. Artista Ñoño)",
+            "artists": "Artist One, Artist Two",
+            "album": f"Album {i // 12}",
+            "cover": f"https://i.scdn.co/image/{i:040x}",
+            "releaseDate": "2024-01-01",
+            "downloadLink": "",
+        }
+        for i in range(n_tracks)
+    ]
+    return {"event": "complete", "data": {"playlistName": "Benchmark", "tracks": tracks}}
+
+
+def stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def per_call_ms(func: Callable[[Any], Any], payload: Any, number: int) -> float:
+    timings = timeit.repeat(lambda: func(payload), number=number, repeat=3)
+    return min(timings) / number * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20, help="timeit iterations")
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed; only the stdlib backend is available.")
+        return 1
+
+    print(f"{'case':<28}{'tracks':>8}{'json ms':>12}{'orjson ms':>12}{'speedup':>10}")
+    for n in SIZES:
+        cases = {
+            "parse embed __NEXT_DATA__": (embed_payload(n), json.loads, orjson.loads),
+            "parse spclient response": (spclient_payload(n), json.loads, orjson.loads),
+            "serialize track list": (backend_response(n), stdlib_dumps, orjson.dumps),
+        }
+        for name, (payload, slow, fast) in cases.items():
+            slow_ms = per_call_ms(slow, payload, args.number)
+            fast_ms = per_call_ms(fast, payload, args.number)
+            print(f"{name:<28}{n:>8}{slow_ms:>12.3f}{fast_ms:>12.3f}{slow_ms / fast_ms:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
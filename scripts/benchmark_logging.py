@@ -0,0 +1,92 @@
+"""Per-track overhead of diagnostic output on the track parsing path.
+
+Times SpotifyEmbedAPI._parse_track plus sanitize_filename (the per-track work
+a playlist download does before any network I/O) with stdout sent to
+/dev/null and to a temporary file, at the default (silent) log level and with
+DEBUG logging routed to the same sink.
+
+Usage:
+    python scripts/benchmark_logging.py [--tracks N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, TextIO
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotifydown_api import SpotifyEmbedAPI, sanitize_filename  # noqa: E402
+
+try:
+    from spotifydown_api import configure_logging
+except ImportError:  # Trees from before the logging subsystem
+    configure_logging = None
+
+
+def track_items(n_tracks: int) -> list[dict]:
+    return json.loads(
+        json.dumps(
+            [
+                {
+                    "uri": f"spotify:track:{i:022d}",
+                    "title": f"Song {i} (feat. Artista Ñoño)",
+                    "subtitle": f"Artist {i % 150}",
+                    "duration": 180000 + i,
+                    "audioPreview": {"url": f"https://p.scdn.co/mp3-preview/{i:040x}"},
+                    "album": {"name": f"Album {i % 400}"},
+                }
+                for i in range(n_tracks)
+            ]
+        )
+    )
+
+
+def per_track(items: list[dict]) -> None:
+    api = SpotifyEmbedAPI()
+    for item in items:
+        track = api._parse_track(item, item["uri"].rsplit(":", 1)[-1])
+        sanitize_filename(f"{track.title} - {track.artists}")
+
+
+def timed_us(func: Callable[[list[dict]], None], items: list[dict], sink: TextIO) -> float:
+    with contextlib.redirect_stdout(sink):
+        start = time.perf_counter()
+        func(items)
+        elapsed = time.perf_counter() - start
+    return elapsed / len(items) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=5000, help="tracks per run")
+    args = parser.parse_args()
+
+    items = track_items(args.tracks)
+
+    with open(os.devnull, "w") as devnull, tempfile.TemporaryFile("w+") as tmp:
+        timed_us(per_track, items[:100], devnull)  # warm up
+        sinks = {"/dev/null": devnull, "file": tmp}
+        print(f"{args.tracks} tracks")
+        print(f"{'stdout':<12}{'log level':<12}{'us/track':>10}")
+        for label, sink in sinks.items():
+            print(f"{label:<12}{'default':<12}{timed_us(per_track, items, sink):>10.1f}")
+        if configure_logging is not None:
+            for label, sink in sinks.items():
+                configure_logging("DEBUG", stream=sink)
+                print(f"{label:<12}{'DEBUG':<12}{timed_us(per_track, items, sink):>10.1f}")
+            configure_logging("WARNING", stream=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+"""Parser micro-benchmarks on synthetic playlists, reported as JSON.
+
+Times, per playlist size (tests/conftest.py generators, 100/1k/10k tracks):
+
+- fetch_embed_data:  SpotifyEmbedAPI._fetch_embed_data on an in-memory page
+                     (retry, single-flight and __NEXT_DATA__ extraction)
+- extract_entity:    SpotifyEmbedAPI._extract_entity on the parsed page
+- parse_track:       SpotifyEmbedAPI._parse_track over the whole trackList
+- spclient_uris:     decoding a spclient payload and listing its item URIs
+- sanitize_filename: "title - artists" file names for every track
+- backend_serialize: the backend's streamed playlist response body
+                     (playlist_response_chunks); skipped when Flask is not installed
+
+Each stage reports the best of --repeat runs in seconds and microseconds per
+track. With --baseline, stages more than --threshold slower than in an earlier
+report are listed and the exit status is 1.
+
+Usage:
+    python scripts/benchmark_parsers.py [--sizes 100 1000 10000] [--repeat N]
+        [--output report.json] [--baseline old.json] [--threshold 0.2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotifydown_api import (  # noqa: E402
+    JSON_BACKEND,
+    RateLimiter,
+    SpotifyEmbedAPI,
+    TrackTable,
+    _spclient_item_uris,
+    json_dumps,
+    json_loads,
+    sanitize_filename,
+)
+from tests.conftest import (  # noqa: E402
+    BENCHMARK_SIZES,
+    synthetic_embed_html,
+    synthetic_spclient_response,
+)
+
+BACKEND_DIR = ROOT / "web-app" / "sunnify-backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+try:
+    from app import playlist_response_chunks
+except ImportError:  # Backend dependencies (Flask) not installed
+    playlist_response_chunks = None
+
+
+class _PageResponse:
+    status_code = 200
+    headers: dict[str, str] = {}
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+
+class _StaticSession:
+    """Serves one page for every GET, so only parsing is measured."""
+
+    def __init__(self, content: bytes) -> None:
+        self._response = _PageResponse(content)
+
+    def get(self, url: str, **kwargs) -> _PageResponse:
+        return self._response
+
+
+def best_seconds(func: Callable[[], object], repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def stages(n_tracks: int) -> dict[str, Callable[[], object]]:
+    page = synthetic_embed_html(n_tracks).encode()
+    api = SpotifyEmbedAPI(session=_StaticSession(page), rate_limiter=RateLimiter(rate=1e9))
+    url = "https://open.spotify.com/embed/playlist/bench"
+    data = api._fetch_embed_data(url)
+    items = api._extract_entity(data)["trackList"]
+    tracks = [api._parse_track(item, item["uri"].rsplit(":", 1)[-1]) for item in items]
+    spclient = json_dumps(synthetic_spclient_response(n_tracks))
+    table = TrackTable(tracks)
+
+    def parse_tracks() -> None:
+        for item in items:
+            api._parse_track(item, item["uri"].rsplit(":", 1)[-1])
+
+    def file_names() -> None:
+        for track in tracks:
+            sanitize_filename(f"{track.title} - {track.artists}")
+
+    benchmarks = {
+        "fetch_embed_data": lambda: api._fetch_embed_data(url),
+        "extract_entity": lambda: api._extract_entity(data),
+        "parse_track": parse_tracks,
+        "spclient_uris": lambda: _spclient_item_uris(json_loads(spclient)),
+        "sanitize_filename": file_names,
+    }
+    if playlist_response_chunks is not None:
+        benchmarks["backend_serialize"] = lambda: b"".join(playlist_response_chunks("Bench", table))
+    return benchmarks
+
+
+def run(sizes: list[int], repeat: int) -> dict:
+    results: dict[str, dict] = {}
+    for n_tracks in sizes:
+        results[str(n_tracks)] = {}
+        for name, func in stages(n_tracks).items():
+            seconds = best_seconds(func, repeat)
+            results[str(n_tracks)][name] = {
+                "seconds": seconds,
+                "us_per_track": seconds / n_tracks * 1e6,
+            }
+            print(f"{n_tracks:>6} {name:<18} {seconds * 1e6:12.1f} us", file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "json_backend": JSON_BACKEND,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def regressions(report: dict, baseline: dict, threshold: float) -> list[str]:
+    found = []
+    for size, timings in report["results"].items():
+        for name, timing in timings.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if before and timing["seconds"] > before["seconds"] * (1 + threshold):
+                ratio = timing["seconds"] / before["seconds"]
+                found.append(f"{size} tracks {name}: {ratio:.2f}x baseline")
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES))
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per stage")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        found = regressions(report, baseline, args.threshold)
+        for line in found:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+"""Memory benchmark for bulk track results.
+
+Parses a synthetic embed trackList and measures the memory still held once
+the parsed page is dropped, for:
+
+- legacy:      a regular (dict-backed) dataclass keeping raw=dict(track)
+- TrackInfo:   the slotted TrackInfo as built by SpotifyEmbedAPI (no raw)
+- TrackTable:  the same tracks packed into a TrackTable
+
+Usage:
+    python scripts/benchmark_track_memory.py [--tracks N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotifydown_api import SpotifyEmbedAPI, TrackTable  # noqa: E402
+
+
+@dataclass
+class LegacyTrackInfo:
+    id: str
+    title: str
+    artists: str
+    album: str | None
+    release_date: str | None
+    cover_url: str | None
+    duration_ms: int | None
+    preview_url: str | None
+    raw: dict[str, object]
+
+
+def track_list_json(n_tracks: int) -> str:
+    """A trackList shaped like the embed page's, with repeating artists/albums."""
+    return json.dumps(
+        [
+            {
+                "uri": f"spotify:track:{i:022d}",
+                "uid": f"{i:016x}",
+                "title": f"Song {i}",
+                "subtitle": f"Artist {i % 150}",
+                "isExplicit": i % 7 == 0,
+                "isPlayable": True,
+                "duration": 180000 + i,
+                "entityType": "track",
+                "audioPreview": {
+                    "url": f"https://p.scdn.co/mp3-preview/{i:040x}",
+                    "format": "MP3_96",
+                },
+                "album": {"name": f"Album {i % 400}"},
+            }
+            for i in range(n_tracks)
+        ]
+    )
+
+
+def build_legacy(items: list[dict]) -> Any:
+    api = SpotifyEmbedAPI(keep_raw=True)
+    tracks = []
+    for item in items:
+        t = api._parse_track(item, item["uri"].split(":")[-1])
+        tracks.append(
+            LegacyTrackInfo(
+                t.id,
+                t.title,
+                t.artists,
+                t.album,
+                t.release_date,
+                t.cover_url,
+                t.duration_ms,
+                t.preview_url,
+                dict(t.raw),
+            )
+        )
+    return tracks
+
+
+def build_tracks(items: list[dict]) -> Any:
+    api = SpotifyEmbedAPI()
+    return [api._parse_track(item, item["uri"].split(":")[-1]) for item in items]
+
+
+def build_table(items: list[dict]) -> Any:
+    api = SpotifyEmbedAPI()
+    return TrackTable(api._parse_track(item, item["uri"].split(":")[-1]) for item in items)
+
+
+def retained_bytes(build: Callable[[list[dict]], Any], payload: str) -> tuple[int, int]:
+    """Return (bytes still held after the page is dropped, peak bytes)."""
+    gc.collect()
+    tracemalloc.start()
+    items = json.loads(payload)
+    result = build(items)
+    del items
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=10_000, help="tracks to build")
+    args = parser.parse_args()
+
+    payload = track_list_json(args.tracks)
+    builders = {"legacy": build_legacy, "TrackInfo": build_tracks, "TrackTable": build_table}
+    results = {}
+    # The API prints per track; keep that out of the measurement
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, build in builders.items():
+            results[name] = retained_bytes(build, payload)
+
+    baseline = results["legacy"][0]
+    print(f"{args.tracks} tracks")
+    print(f"{'representation':<14}{'retained MiB':>14}{'peak MiB':>12}{'vs legacy':>12}")
+    for name, (current, peak) in results.items():
+        mib = 1024 * 1024
+        ratio = current / baseline
+        print(f"{name:<14}{current / mib:>14.2f}{peak / mib:>12.2f}{ratio:>11.0%}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
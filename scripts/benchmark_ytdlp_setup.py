@@ -0,0 +1,87 @@
+"""Per-track yt-dlp setup cost: a new YoutubeDL per track vs a warm YtdlpEngine.
+
+Times, without network access, the work a playlist download repeats for each
+track before yt-dlp sends its first request:
+
+- per-track: get_ffmpeg_path() plus a new YoutubeDL for the search and fetch
+             stages, each initializing the YouTube extractor (the old path)
+- warm:      YtdlpEngine.get() for both stages on one thread, ffmpeg probed
+             once (the pipeline's path)
+
+The warm figure excludes the one-off cost of building the instances, which is
+printed separately.
+
+Usage:
+    python scripts/benchmark_ytdlp_setup.py [--tracks N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from yt_dlp import YoutubeDL  # noqa: E402
+
+from Spotify_Downloader import YtdlpEngine, get_ffmpeg_path  # noqa: E402
+
+PROFILES = {
+    "search": {"quiet": True, "noplaylist": True, "extract_flat": "in_playlist"},
+    "fetch": {"format": "bestaudio/best", "noplaylist": True, "quiet": True},
+}
+
+
+def per_track_setup(n_tracks: int, cache_dir: str) -> float:
+    start = time.perf_counter()
+    for i in range(n_tracks):
+        get_ffmpeg_path()
+        for options in PROFILES.values():
+            params = {**options, "cachedir": cache_dir, "outtmpl": f"track{i}.%(ext)s"}
+            with YoutubeDL(params) as ydl:
+                ydl.get_info_extractor("Youtube")
+    return time.perf_counter() - start
+
+
+def warm_setup(n_tracks: int, cache_dir: str) -> tuple[float, float]:
+    engine = YtdlpEngine(cache_dir)
+    start = time.perf_counter()
+    get_ffmpeg_path()
+    for profile, options in PROFILES.items():
+        engine.get(profile, options).get_info_extractor("Youtube")
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(n_tracks):
+        for profile, options in PROFILES.items():
+            engine.get(profile, options, outtmpl=f"track{i}.%(ext)s").get_info_extractor("Youtube")
+    elapsed = time.perf_counter() - start
+    engine.close()
+    return first, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=50, help="tracks per run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        per_track_setup(1, cache_dir)  # warm up imports and lazy extractors
+        cold = per_track_setup(args.tracks, cache_dir)
+        first, warm = warm_setup(args.tracks, cache_dir)
+
+    print(f"{args.tracks} tracks")
+    print(f"{'setup':<12}{'ms/track':>10}")
+    print(f"{'per-track':<12}{cold / args.tracks * 1e3:>10.2f}")
+    print(f"{'warm':<12}{warm / args.tracks * 1e3:>10.3f}")
+    print(f"one-off warm-up: {first * 1e3:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual benchmark
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""Fetch metadata for a file of Spotify track IDs in one batch.
+
+Reads track IDs, open.spotify.com track links or spotify:track: URIs (blank
+lines and # comments skipped), fetches them with PlaylistClient.get_tracks
+and writes one JSON object per line.
+Failed IDs are reported with an "error" field; the exit status is 1 if any
+failed.
+
+Usage:
+    python scripts/bulk_track_metadata.py [track_ids.txt] [--workers N] [--cache]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotifydown_api import (  # noqa: E402
+    PlaylistClient,
+    SQLiteResponseCache,
+    normalize_spotify_refs,
+)
+
+
+def read_ids(path: Path) -> list[str]:
+    with path.open(encoding="utf-8") as lines:
+        batch = normalize_spotify_refs(lines, default_kind="track")
+    for token in batch.invalid:
+        print(f"skipping invalid reference: {token}", file=sys.stderr)
+    return batch.track_ids
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ids_file", nargs="?", default=str(ROOT / "track_ids.txt"))
+    parser.add_argument("--workers", type=int, default=None, help="concurrent fetches")
+    parser.add_argument(
+        "--cache", action="store_true", help="use the on-disk response cache across runs"
+    )
+    args = parser.parse_args()
+
+    ids = read_ids(Path(args.ids_file))
+    client = PlaylistClient(cache=SQLiteResponseCache() if args.cache else None)
+
+    started = time.perf_counter()
+    results = client.get_tracks(ids, max_workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    for result in results:
+        if result.ok:
+            track = result.track
+            row = {
+                "id": track.id,
+                "title": track.title,
+                "artists": track.artists,
+                "album": track.album,
+                "releaseDate": track.release_date,
+                "cover": track.cover_url,
+                "durationMs": track.duration_ms,
+            }
+        else:
+            failed += 1
+            row = {"id": result.track_id, "error": str(result.error)}
+        print(json.dumps(row, ensure_ascii=False))
+
+    print(f"{len(ids)} ids, {failed} failed, {elapsed:.1f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual utility
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+"""Normalize and deduplicate Spotify links, URIs and IDs from files or stdin.
+
+Accepts open.spotify.com URLs (intl-xx, embed and query-string variants),
+spotify: URIs and, with --default-kind, bare IDs; several per line,
+separated by whitespace or commas. Prints one canonical reference per line
+in first-seen order; rejected tokens go to stderr.
+
+Usage:
+    python scripts/normalize_spotify_refs.py [FILE ...] [--format uri|url|id]
+        [--kind track|playlist] [--default-kind track|playlist]
+
+    # Feed a messy list straight into the bulk metadata script
+    python scripts/normalize_spotify_refs.py links.txt --kind track --format id \
+        > ids.txt && python scripts/bulk_track_metadata.py ids.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotifydown_api import normalize_spotify_refs  # noqa: E402
+
+
+def iter_lines(files: list[str]) -> Iterator[str]:
+    if not files:
+        yield from sys.stdin
+    for name in files:
+        with open(name, encoding="utf-8") as f:
+            yield from f
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="input files (default: stdin)")
+    parser.add_argument("--format", choices=("uri", "url", "id"), default="uri")
+    parser.add_argument("--kind", choices=("track", "playlist"), help="keep only this kind")
+    parser.add_argument(
+        "--default-kind", choices=("track", "playlist"), help="kind of bare 22-character IDs"
+    )
+    args = parser.parse_args()
+
+    batch = normalize_spotify_refs(iter_lines(args.files), default_kind=args.default_kind)
+
+    for ref in batch.refs:
+        if args.kind and ref.kind != args.kind:
+            continue
+        print(getattr(ref, args.format))
+    for token in batch.invalid:
+        print(f"invalid: {token}", file=sys.stderr)
+    print(
+        f"{len(batch.refs)} unique, {batch.duplicates} duplicates, {len(batch.invalid)} invalid",
+        file=sys.stderr,
+    )
+    return 1 if batch.invalid else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual utility
+    raise SystemExit(main())
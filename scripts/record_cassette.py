@@ -0,0 +1,71 @@
+"""Record Spotify playlists/tracks into a cassette, or replay one offline.
+
+Fetches each playlist (snapshot plus full track hydration) or track given as
+a link, URI or ID and records every embed, spclient and oEmbed exchange to a
+gzipped JSON-lines cassette. With --replay the same references are fetched
+from the cassette instead, without network access, and timed.
+
+Usage:
+    python scripts/record_cassette.py REF [REF ...] -o cassette.jsonl.gz
+    python scripts/record_cassette.py REF [REF ...] -o cassette.jsonl.gz --replay
+        [--latency SECONDS] [--latency-scale FACTOR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotifydown_api import Cassette, PlaylistClient, normalize_spotify_refs  # noqa: E402
+
+
+def fetch(client: PlaylistClient, refs) -> int:
+    tracks = 0
+    for ref in refs:
+        if ref.kind == "playlist":
+            snapshot = client.get_playlist_snapshot(ref.id)
+            tracks += sum(1 for _ in client.iter_snapshot_tracks(snapshot))
+        elif ref.kind == "track":
+            client.get_track(ref.id)
+            tracks += 1
+    return tracks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("refs", nargs="+", help="playlist/track links, URIs or IDs")
+    parser.add_argument("-o", "--output", required=True, help="cassette file")
+    parser.add_argument("--replay", action="store_true", help="replay instead of recording")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument(
+        "--latency-scale", type=float, default=0.0, help="multiple of the recorded latency"
+    )
+    args = parser.parse_args()
+
+    batch = normalize_spotify_refs(args.refs, default_kind="playlist")
+    for token in batch.invalid:
+        print(f"skipping invalid reference: {token}", file=sys.stderr)
+
+    mode = "replay" if args.replay else "record"
+    cassette = Cassette(args.output, mode, latency=args.latency, latency_scale=args.latency_scale)
+    started = time.perf_counter()
+    with cassette:
+        tracks = fetch(PlaylistClient(cassette=cassette), batch.refs)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{mode}: {len(batch.refs)} refs, {tracks} tracks, {len(cassette)} exchanges, "
+        f"{elapsed:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual utility
+    raise SystemExit(main())
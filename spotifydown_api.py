@@ -10,18 +10,156 @@ from Spotify's embed pages.
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import contextvars
 import functools
+import gzip
 import json
+import logging
+import os
+import random
 import re
+import sqlite3
+import sys
+import threading
 import time
-from collections.abc import Iterator, Sequence
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter, OrderedDict, deque
+from collections.abc import AsyncIterator, Hashable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, TypeVar
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from types import MappingProxyType
+from typing import Callable, NamedTuple, TypeVar
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:  # Optional: only the asyncio client needs it
+    import httpx
+except ImportError:  # pragma: no cover - depends on environment
+    httpx = None  # type: ignore[assignment]
+
+try:  # Optional: faster JSON parsing/serialization
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None  # type: ignore[assignment]
 
 T = TypeVar("T")
 
+# "orjson" when the optional fast backend is importable, else "json".
+# SUNNIFY_JSON_BACKEND=json forces the stdlib (handy for benchmarks/debugging).
+JSON_BACKEND = (
+    "orjson" if orjson is not None and os.environ.get("SUNNIFY_JSON_BACKEND") != "json" else "json"
+)
+
+
+def json_loads(data: bytes | str):
+    """Parse JSON with the fastest available backend.
+
+    Raises json.JSONDecodeError (orjson's error subclasses it) on bad input.
+    """
+    if JSON_BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes with the fastest available backend."""
+    if JSON_BACKEND == "orjson":
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# =========================
+# Logging
+# =========================
+# Every Sunnify module logs under this namespace ("sunnify.api",
+# "sunnify.downloader", "sunnify.backend"). Nothing is emitted until the
+# application calls configure_logging() or attaches its own handlers.
+LOG_NAMESPACE = "sunnify"
+_DEFAULT_LOG_FORMAT = "%(asctime)s %(levelname)-7s [%(name)s] %(message)s"
+
+logging.getLogger(LOG_NAMESPACE).addHandler(logging.NullHandler())
+logger = logging.getLogger(f"{LOG_NAMESPACE}.api")
+
+
+def _parse_log_levels(spec: str) -> dict[str, str]:
+    """Parse "api=DEBUG,downloader=INFO" into {"sunnify.api": "DEBUG", ...}."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if not sep or not name.strip() or not level.strip():
+            continue
+        name = name.strip()
+        if name != LOG_NAMESPACE and not name.startswith(f"{LOG_NAMESPACE}."):
+            name = f"{LOG_NAMESPACE}.{name}"
+        levels[name] = level.strip().upper()
+    return levels
+
+
+def configure_logging(
+    level: int | str | None = None,
+    *,
+    levels: Mapping[str, int | str] | None = None,
+    stream=None,
+    fmt: str = _DEFAULT_LOG_FORMAT,
+) -> logging.Logger:
+    """Send Sunnify's log records to ``stream`` (stderr by default).
+
+    ``level`` applies to the whole namespace and defaults to the
+    SUNNIFY_LOG_LEVEL environment variable, else WARNING. ``levels`` sets
+    per-module overrides keyed by full or short logger name ("api",
+    "downloader", "backend"); SUNNIFY_LOG_LEVELS="api=DEBUG,downloader=INFO"
+    does the same from the environment. Calling it again replaces the handler
+    installed by the previous call.
+    """
+    root = logging.getLogger(LOG_NAMESPACE)
+    if level is None:
+        level = os.environ.get("SUNNIFY_LOG_LEVEL", "WARNING")
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    overrides: dict[str, int | str] = _parse_log_levels(os.environ.get("SUNNIFY_LOG_LEVELS", ""))
+    for name, value in (levels or {}).items():
+        name = name if name.startswith(LOG_NAMESPACE) else f"{LOG_NAMESPACE}.{name}"
+        overrides[name] = value.upper() if isinstance(value, str) else value
+    for name, value in overrides.items():
+        logging.getLogger(name).setLevel(value)
+
+    for handler in list(root.handlers):
+        if getattr(handler, "_sunnify", False):
+            root.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(fmt))
+    handler._sunnify = True  # type: ignore[attr-defined]
+    root.addHandler(handler)
+    return root
+
+
+# Concurrent track-embed fetches used to hydrate tracks beyond the embed limit
+DEFAULT_HYDRATION_WORKERS = 8
+
+# Tracks remembered per client by get_tracks (in-memory LRU)
+DEFAULT_TRACK_CACHE_SIZE = 4096
+
+# Connections kept open per host by sessions from build_session (requests defaults to 10)
+DEFAULT_POOL_MAXSIZE = 16
+
+# Playlist items requested per spclient page when listing large playlists
+DEFAULT_SPCLIENT_PAGE_SIZE = 500
+
+# progress(listed, total): playlist items enumerated so far out of the total
+ProgressCallback = Callable[[int, int], None]
+
 _DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -38,107 +176,217 @@ class NetworkError(SpotifyDownAPIError):
 
 
 class ExtractionError(SpotifyDownAPIError):
-    """Failed to extract data from response - usually not retryable."""
+    """Failed to extract data from response - usually not retryable.
+
+    ``status_code`` holds the HTTP status when the page itself was refused.
+    """
+
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class RateLimitError(SpotifyDownAPIError):
-    """Rate limited by Spotify - should back off before retrying."""
+    """Rate limited by Spotify - should back off before retrying.
 
+    ``retry_after`` holds the server's Retry-After delay in seconds, if any.
+    """
 
-# def retry_on_network_error(
-#     max_attempts: int = 3,
-#     backoff_factor: float = 1.0,
-#     exceptions: tuple = (NetworkError, requests.Timeout, requests.ConnectionError),
-# ) -> Callable[[Callable[..., T]], Callable[..., T]]:
-#     """Decorator to retry a function on network errors with exponential backoff.
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
 
-#     Args:
-#         max_attempts: Maximum number of attempts before giving up
-#         backoff_factor: Multiplier for wait time between attempts (wait = backoff_factor * 2^attempt)
-#         exceptions: Tuple of exception types to catch and retry
-#     """
 
-#     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-#         @functools.wraps(func)
-#         def wrapper(*args, **kwargs) -> T:
-#             last_exception = None
-#             for attempt in range(max_attempts):
-#                 try:
-#                     return func(*args, **kwargs)
-#                 except exceptions as e:
-#                     last_exception = e
-#                     if attempt < max_attempts - 1:
-#                         wait_time = backoff_factor * (2**attempt)
-#                         time.sleep(wait_time)
-#             raise last_exception  # type: ignore
+# Transport failures worth another attempt. RateLimitError only reaches a
+# RetryPolicy once rate_limited_get has given up on a long Retry-After (or the
+# rate limiter on a wait past the deadline), and is retried only if that wait
+# fits the remaining deadline.
+RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (
+    NetworkError,
+    RateLimitError,
+    requests.Timeout,
+    requests.ConnectionError,
+)
 
-#         return wrapper
 
-#     return decorator
+class RetryStats:
+    """Thread-safe counters shared by every call made through one RetryPolicy."""
 
+    _FIELDS = ("calls", "attempts", "retries", "failures", "deadline_exceeded")
 
-def retry_on_network_error(
-    max_attempts: int = 3,
-    backoff_factor: float = 1.0,
-    exceptions: tuple = (NetworkError, requests.Timeout, requests.ConnectionError),
-) -> Callable[[Callable[..., T]], Callable[..., T]]:
-    """
-    Decorator to retry a function on network errors with exponential backoff.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+        self.backoff_seconds = 0.0
+        self.elapsed_seconds = 0.0
 
-    Short notes:
-    - Retries only for given network-related exceptions
-    - Uses exponential backoff: wait = backoff_factor * (2 ** attempt)
-    - Raises last exception after all attempts fail
-    """
+    def _add(self, **deltas: float) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
 
-    print("[Retry_API] Initialized decorator")
-    print("[Retry_API] max_attempts :", max_attempts)
-    print("[Retry_API] backoff_factor :", backoff_factor)
-    print("[Retry_API] exceptions :", exceptions)
-    print("-" * 50)
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            data: dict[str, float] = {name: getattr(self, name) for name in self._FIELDS}
+            data["backoff_seconds"] = self.backoff_seconds
+            data["elapsed_seconds"] = self.elapsed_seconds
+            return data
 
-    def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        print(f"[Retry_API] Decorating function : {func.__name__}")
 
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs) -> T:
-            print("\n[Retry_API] Function call started")
-            print("[Retry_API] Function name :", func.__name__)
-            print("[Retry_API] Raw args :", args)
-            print("[Retry_API] Raw kwargs :", kwargs)
+# Deadline (a time.monotonic() value) and cancel event of the RetryPolicy call
+# in progress, so waits inside an attempt (429 backoff in rate_limited_get)
+# stay within the call's budget. Nested calls keep the earlier deadline.
+_retry_budget: contextvars.ContextVar[tuple[float | None, threading.Event | None]] = (
+    contextvars.ContextVar("sunnify_retry_budget", default=(None, None))
+)
 
-            last_exception = None
 
-            for attempt in range(max_attempts):
-                print("\n[Retry_API] Attempt :", attempt + 1, "/", max_attempts)
+class RetryPolicy:
+    """Retry a callable on transient errors with jittered exponential backoff.
 
+    - ``max_attempts`` caps tries per call; ``deadline`` (seconds) caps the
+      whole call including backoff, so a retry that can't finish in time
+      isn't started.
+    - Backoff is "full jitter": uniform(0, min(max_delay, base_delay * 2**n)),
+      which keeps concurrent workers from retrying in lockstep. A
+      RateLimitError's retry_after is honored instead when present.
+    - An error is retried when it is an instance of ``retry_on`` and
+      ``classify`` (if given) returns True for it.
+    - Silent: nothing is printed; see ``stats`` for counters.
+
+    Use as a decorator (``@policy``), via ``policy.call(func, ...)``, or
+    ``await policy.call_async(coro_func, ...)``. Passing ``cancel_event``
+    makes backoff sleeps wake up (and give up) when the event is set. The
+    deadline and cancel event also bound 429 waits inside an attempt.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        deadline: float | None = None,
+        retry_on: tuple[type[BaseException], ...] = RETRYABLE_ERRORS,
+        classify: Callable[[BaseException], bool] | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_on = retry_on
+        self.classify = classify
+        self.cancel_event = cancel_event
+        self.stats = RetryStats()
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        if not isinstance(exc, self.retry_on):
+            return False
+        return self.classify is None or bool(self.classify(exc))
+
+    def backoff(self, retry: int, exc: BaseException | None = None) -> float:
+        """Delay before retry number ``retry`` (0-based)."""
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            return float(retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**retry)))
+
+    def _next_delay(self, attempt: int, exc: BaseException, started: float) -> float | None:
+        """Backoff before the next attempt, or None to give up and re-raise."""
+        if attempt >= self.max_attempts or not self.is_retryable(exc):
+            return None
+        delay = self.backoff(attempt - 1, exc)
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            self.stats._add(deadline_exceeded=1)
+            logger.debug("Retry deadline reached after attempt %d: %s", attempt, exc)
+            return None
+        logger.debug("Attempt %d failed (%s); retrying in %.2fs", attempt, exc, delay)
+        return delay
+
+    def _enter_budget(self, started: float) -> contextvars.Token:
+        deadline = started + self.deadline if self.deadline is not None else None
+        outer_deadline, outer_cancel = _retry_budget.get()
+        if outer_deadline is not None and (deadline is None or outer_deadline < deadline):
+            deadline = outer_deadline
+        return _retry_budget.set((deadline, self.cancel_event or outer_cancel))
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        started = time.monotonic()
+        attempt = 0
+        self.stats._add(calls=1)
+        budget = self._enter_budget(started)
+        try:
+            while True:
+                attempt += 1
+                self.stats._add(attempts=1)
+                try:
+                    return func(*args, **kwargs)
+                except Exception as exc:
+                    delay = self._next_delay(attempt, exc, started)
+                    if delay is None:
+                        self.stats._add(failures=1)
+                        raise
+                    self.stats._add(retries=1, backoff_seconds=delay)
+                    if self.cancel_event is not None:
+                        if self.cancel_event.wait(delay):
+                            self.stats._add(failures=1)
+                            raise
+                    elif delay > 0:
+                        time.sleep(delay)
+        finally:
+            _retry_budget.reset(budget)
+            self.stats._add(elapsed_seconds=time.monotonic() - started)
+
+    async def call_async(self, func: Callable[..., T], *args, **kwargs) -> T:
+        started = time.monotonic()
+        attempt = 0
+        self.stats._add(calls=1)
+        budget = self._enter_budget(started)
+        try:
+            while True:
+                attempt += 1
+                self.stats._add(attempts=1)
                 try:
-                    print("[Retry_API] Calling target function...")
-                    result = func(*args, **kwargs)
-                    print("[Retry_API] Function executed successfully")
-                    print("[Retry_API] Result :", result)
-                    return result
-
-                except exceptions as e:
-                    last_exception = e
-                    print("[Retry_API] Caught exception :", type(e).__name__)
-                    print("[Retry_API] Exception message :", e)
-
-                    if attempt < max_attempts - 1:
-                        wait_time = backoff_factor * (2 ** attempt)
-                        print("[Retry_API] Will retry after", wait_time, "seconds")
-                        time.sleep(wait_time)
-                    else:
-                        print("[Retry_API] Max attempts reached. No more retries.")
-
-            print("[Retry_API] Raising last exception")
-            raise last_exception  # type: ignore
+                    return await func(*args, **kwargs)  # type: ignore[misc]
+                except Exception as exc:
+                    delay = self._next_delay(attempt, exc, started)
+                    if delay is None:
+                        self.stats._add(failures=1)
+                        raise
+                    self.stats._add(retries=1, backoff_seconds=delay)
+                    await asyncio.sleep(delay)
+        finally:
+            _retry_budget.reset(budget)
+            self.stats._add(elapsed_seconds=time.monotonic() - started)
+
+    def __call__(self, func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            return self.call(func, *args, **kwargs)
 
         return wrapper
 
-    return decorator
 
+def retry_on_network_error(
+    max_attempts: int = 3,
+    backoff_factor: float = 1.0,
+    exceptions: tuple = (NetworkError, requests.Timeout, requests.ConnectionError),
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator to retry a function on network errors (kept for compatibility).
 
+    Thin wrapper over RetryPolicy: jittered backoff scaled by backoff_factor.
+    """
+    return RetryPolicy(max_attempts=max_attempts, base_delay=backoff_factor, retry_on=exceptions)
+
+
+def default_retry_policy() -> RetryPolicy:
+    """Policy used by the API clients when none is passed: 3 tries within 60s."""
+    return RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=10.0, deadline=60.0)
 
 
 # @dataclass
@@ -180,19 +428,31 @@ class PlaylistInfo:
     track_count: int | None = None
 
     def __post_init__(self):
-        print("\n[Spotify_API][PlaylistInfo] Object created")
-        print("[Spotify_API] name        :", self.name)
-        print("[Spotify_API] owner       :", self.owner)
-        print("[Spotify_API] description :", self.description)
-        print("[Spotify_API] cover_url   :", self.cover_url)
-        print("[Spotify_API] track_count :", self.track_count)
+        logger.debug("PlaylistInfo: %r by %r (%s tracks)", self.name, self.owner, self.track_count)
 
 
 # =========================
 # [Spotify_API] TrackInfo
 # =========================
+# Shared, read-only stand-in for ``TrackInfo.raw`` when the payload isn't kept
+NO_RAW: Mapping[str, object] = MappingProxyType({})
+
+
 @dataclass
 class TrackInfo:
+    # Slotted by hand (dataclass(slots=True) needs 3.10): no per-track __dict__
+    __slots__ = (
+        "id",
+        "title",
+        "artists",
+        "album",
+        "release_date",
+        "cover_url",
+        "duration_ms",
+        "preview_url",
+        "raw",
+    )
+
     id: str
     title: str
     artists: str
@@ -201,19 +461,8 @@ class TrackInfo:
     cover_url: str | None
     duration_ms: int | None
     preview_url: str | None
-    raw: dict[str, object]
-
-    def __post_init__(self):
-        print("\n[Spotify_API][TrackInfo] Object created")
-        print("[Spotify_API] id           :", self.id)
-        print("[Spotify_API] title        :", self.title)
-        print("[Spotify_API] artists      :", self.artists)
-        print("[Spotify_API] album        :", self.album)
-        print("[Spotify_API] release_date :", self.release_date)
-        print("[Spotify_API] cover_url    :", self.cover_url)
-        print("[Spotify_API] duration_ms  :", self.duration_ms)
-        print("[Spotify_API] preview_url  :", self.preview_url)
-        print("[Spotify_API] raw keys     :", list(self.raw.keys()))
+    # The source payload, only populated by clients created with keep_raw=True
+    raw: Mapping[str, object]
 
     @property
     def spotify_id(self) -> str:
@@ -222,10 +471,286 @@ class TrackInfo:
         - Compatibility alias
         - Returns same value as `id`
         """
-        print("[Spotify_API] Accessed spotify_id property →", self.id)
         return self.id
 
 
+class TrackTable:
+    """Compact columnar container for large track lists.
+
+    Holds the TrackInfo fields in parallel columns instead of one object per
+    track: artists, album, release date and cover URL (which repeat across a
+    playlist) are stored once in a string pool and referenced by index from
+    ``array('I')`` columns, and durations live in an ``array('q')``. Indexing
+    or iterating materializes TrackInfo objects on demand (without ``raw``);
+    iter_rows() yields plain tuples without building objects at all.
+    """
+
+    _POOLED = ("artists", "album", "release_date", "cover_url")
+
+    def __init__(self, tracks: Iterable[TrackInfo] = ()) -> None:
+        self._ids: list[str] = []
+        self._titles: list[str] = []
+        self._preview_urls: list[str | None] = []
+        self._durations = array("q")
+        self._pooled = {name: array("I") for name in self._POOLED}
+        # Index 0 is reserved for None
+        self._pool: list[str | None] = [None]
+        self._pool_index: dict[str, int] = {}
+        self.extend(tracks)
+
+    def _intern(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        index = self._pool_index.get(value)
+        if index is None:
+            index = self._pool_index[value] = len(self._pool)
+            self._pool.append(value)
+        return index
+
+    def append(self, track: TrackInfo) -> None:
+        self._ids.append(track.id)
+        self._titles.append(track.title)
+        self._preview_urls.append(track.preview_url)
+        self._durations.append(track.duration_ms if track.duration_ms is not None else -1)
+        for name in self._POOLED:
+            self._pooled[name].append(self._intern(getattr(track, name)))
+
+    def extend(self, tracks: Iterable[TrackInfo]) -> None:
+        for track in tracks:
+            self.append(track)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _row(self, i: int) -> tuple:
+        pool = self._pool
+        pooled = self._pooled
+        duration = self._durations[i]
+        return (
+            self._ids[i],
+            self._titles[i],
+            pool[pooled["artists"][i]],
+            pool[pooled["album"][i]],
+            pool[pooled["release_date"][i]],
+            pool[pooled["cover_url"][i]],
+            duration if duration >= 0 else None,
+            self._preview_urls[i],
+        )
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """Yield (id, title, artists, album, release_date, cover_url, duration_ms,
+        preview_url) tuples in insertion order."""
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __getitem__(self, i: int) -> TrackInfo:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("TrackTable index out of range")
+        return TrackInfo(*self._row(i), raw=NO_RAW)
+
+    def __iter__(self) -> Iterator[TrackInfo]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+
+@dataclass
+class PlaylistSnapshot:
+    """Playlist metadata, embed track list and spclient payload from a single pass.
+
+    Built from exactly one embed page fetch and at most one spclient fetch, so
+    callers that need both the metadata and the tracks don't pay for the same
+    page twice.
+    """
+
+    playlist_id: str
+    info: PlaylistInfo
+    tracks: list[TrackInfo]
+    spclient: dict | None = None
+    # False when ``spclient`` holds only the first page of a longer listing
+    spclient_complete: bool = True
+
+    @property
+    def total_tracks(self) -> int:
+        """Best known track count (spclient length, else embed count)."""
+        if self.info.track_count is not None:
+            return self.info.track_count
+        return len(self.tracks)
+
+    @property
+    def state(self) -> PlaylistState | None:
+        """Diff baseline for this snapshot, or None without a complete spclient payload.
+
+        The embed track list alone may be truncated, and so is the first
+        spclient page of a large playlist, so neither can serve as one.
+        """
+        if not self.spclient or not self.spclient_complete:
+            return None
+        return PlaylistState.from_spclient(self.playlist_id, self.spclient)
+
+
+def _spclient_item_uris(spc_data: Mapping) -> tuple[str, ...]:
+    """Item URIs (tracks, episodes, local files) of a spclient payload, in order."""
+    items = (spc_data.get("contents") or {}).get("items") or []
+    return tuple(item["uri"] for item in items if isinstance(item, dict) and item.get("uri"))
+
+
+@dataclass(frozen=True)
+class PlaylistState:
+    """What a playlist looked like at one revision: the baseline for diff_playlist.
+
+    Plain data so callers can persist it between runs (to_dict/from_dict).
+    """
+
+    playlist_id: str
+    revision: str | None
+    track_uris: tuple[str, ...]
+
+    @classmethod
+    def from_spclient(cls, playlist_id: str, spc_data: Mapping) -> PlaylistState:
+        return cls(playlist_id, spc_data.get("revision"), _spclient_item_uris(spc_data))
+
+    def to_dict(self) -> dict:
+        return {
+            "playlistId": self.playlist_id,
+            "revision": self.revision,
+            "trackUris": list(self.track_uris),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> PlaylistState:
+        return cls(data["playlistId"], data.get("revision"), tuple(data.get("trackUris", ())))
+
+
+@dataclass
+class PlaylistDiff:
+    """Changes since a PlaylistState; store ``state`` for the next diff."""
+
+    playlist_id: str
+    state: PlaylistState
+    # Hydrated metadata for added tracks (episodes/local files are only in added_uris)
+    added: list[TrackInfo]
+    added_uris: list[str]
+    removed_uris: list[str]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added_uris or self.removed_uris)
+
+
+@dataclass
+class TrackResult:
+    """One entry of a get_tracks batch: the track, or why it couldn't be fetched."""
+
+    track_id: str
+    track: TrackInfo | None = None
+    error: SpotifyDownAPIError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.track is not None
+
+
+class _LRUCache:
+    """Small thread-safe LRU mapping used for per-client in-memory caches."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(0, int(maxsize))
+        self._data: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value) -> None:
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for it and get the same result (or exception). Nothing is
+    remembered once the call finishes, so this is not a cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[..., T], *args, **kwargs) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            logger.debug("Joining in-flight fetch %s", key)
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def _unseen_track_ids(uris: Iterable[str], seen: Iterable[TrackInfo]) -> Iterator[str]:
+    """Track IDs from ``uris`` (tracks only) not among the ``seen`` tracks."""
+    seen_ids = {track.id for track in seen}
+    for uri in uris:
+        if uri.startswith("spotify:track:"):
+            track_id = uri.split(":")[-1]
+            if track_id not in seen_ids:
+                yield track_id
+
+
+def _diff_uris(old: Sequence[str], new: Sequence[str]) -> tuple[list[str], list[str]]:
+    """(added, removed) URIs between two item lists, counting duplicates.
+
+    Moves within the playlist are not changes. When a URI occurs more often
+    in one list, its last occurrences are the extra ones.
+    """
+    return _surplus(new, old), _surplus(old, new)
+
+
+def _surplus(items: Sequence[str], other: Sequence[str]) -> list[str]:
+    """Items not matched one-for-one in ``other``, in their original order."""
+    extra = Counter(items)
+    extra.subtract(other)
+    found = []
+    for item in reversed(items):
+        if extra[item] > 0:
+            extra[item] -= 1
+            found.append(item)
+    found.reverse()
+    return found
+
+
 
 
 
@@ -312,6 +837,1178 @@ class TrackInfo:
 
 #         return data
 
+# =========================
+# Response cache
+# =========================
+
+# Seconds a cached response is served without revalidation, per endpoint.
+# Track embeds barely change; playlist pages and spclient payloads do, and
+# playlist embeds also carry the (hour-long) anonymous token.
+DEFAULT_CACHE_TTLS: dict[str, float] = {
+    "embed_track": 7 * 24 * 3600,
+    "embed_playlist": 15 * 60,
+    "spclient": 5 * 60,
+    "oembed": 24 * 3600,
+}
+
+
+def default_cache_dir() -> str:
+    """Per-user cache directory for Sunnify (created on demand)."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "sunnify")
+
+
+@dataclass
+class CachedResponse:
+    """A cached response body plus the validators needed to revalidate it."""
+
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+class ResponseCache(ABC):
+    """Interface for pluggable embed/spclient response caches.
+
+    Subclasses store raw response bodies keyed by request URL. TTLs are
+    looked up per endpoint name (see DEFAULT_CACHE_TTLS).
+    """
+
+    def __init__(self, *, ttls: dict[str, float] | None = None) -> None:
+        self._ttls = {**DEFAULT_CACHE_TTLS, **(ttls or {})}
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self._ttls.get(endpoint, 0)
+
+    @abstractmethod
+    def get(self, key: str) -> CachedResponse | None:
+        """Return the entry for key (fresh or stale), or None."""
+
+    @abstractmethod
+    def set(
+        self,
+        key: str,
+        endpoint: str,
+        body: bytes,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store a 200 response body."""
+
+    @abstractmethod
+    def refresh(self, key: str, endpoint: str) -> None:
+        """Extend an entry's expiry after a 304 Not Modified."""
+
+
+class SQLiteResponseCache(ResponseCache):
+    """SQLite-backed response cache with zlib-compressed bodies.
+
+    Safe to share between threads, and between processes via SQLite's own
+    locking (WAL mode). When the stored bodies exceed ``max_bytes`` the least
+    recently used entries are evicted; the total is summed inside each write
+    transaction, so it counts every process's entries.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            endpoint TEXT NOT NULL,
+            body BLOB NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            expires_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+        CREATE INDEX IF NOT EXISTS responses_size ON responses (size);
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        *,
+        ttls: dict[str, float] | None = None,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        super().__init__(ttls=ttls)
+        if path is None:
+            path = os.path.join(default_cache_dir(), "responses.sqlite3")
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self._SCHEMA)
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+        try:
+            body = zlib.decompress(row[0])
+        except zlib.error:
+            return None
+        return CachedResponse(body=body, etag=row[1], last_modified=row[2], expires_at=row[3])
+
+    def set(
+        self,
+        key: str,
+        endpoint: str,
+        body: bytes,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        blob = zlib.compress(body, 6)
+        now = time.time()
+        expires_at = now + self.ttl_for(endpoint)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, endpoint, body, etag, last_modified, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, blob, etag, last_modified, expires_at, now, len(blob)),
+            )
+            # The insert holds SQLite's write lock, so no other process can
+            # change the total between this sum and the eviction
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if row[0] > self.max_bytes:
+                self._evict(row[0])
+
+    def refresh(self, key: str, endpoint: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?",
+                (time.time() + self.ttl_for(endpoint), time.time(), key),
+            )
+
+    def _evict(self, total_bytes: int) -> None:
+        """Drop least recently used entries until 90% of max_bytes. Lock held."""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ).fetchall()
+        doomed = []
+        for key, size in rows:
+            if total_bytes <= target:
+                break
+            doomed.append((key,))
+            total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _CachedHTTPResponse:
+    """Stand-in for requests.Response when a body is served from cache."""
+
+    status_code = 200
+
+    def __init__(self, body: bytes) -> None:
+        self.content = body
+        self.headers: dict[str, str] = {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json_loads(self.content)
+
+
+# Seconds a known failure is remembered, per failure class. Removed and
+# region-blocked tracks rarely come back; a YouTube search that found
+# nothing may succeed once someone uploads the track.
+DEFAULT_NEGATIVE_TTLS: dict[str, float] = {
+    "unavailable": 7 * 24 * 3600,
+    "region_blocked": 3 * 24 * 3600,
+    "no_audio": 24 * 3600,
+}
+
+
+@dataclass
+class NegativeEntry:
+    """A remembered failure for one track and failure class."""
+
+    track_id: str
+    kind: str
+    reason: str
+    failures: int
+    expires_at: float
+
+
+def negative_kind(error: BaseException) -> str | None:
+    """Failure class worth remembering for a track fetch error, or None if transient."""
+    status_code = getattr(error, "status_code", None)
+    if not isinstance(error, ExtractionError) or status_code is None:
+        return None
+    # A 403 is as likely an anti-bot or access-denied block that lifts soon
+    if status_code == 451:
+        return "region_blocked"
+    if status_code in (404, 410):
+        return "unavailable"
+    return None
+
+
+class NegativeCache:
+    """Persistent record of tracks known to fail, keyed by track ID and failure class.
+
+    Entries expire after the class's TTL (see DEFAULT_NEGATIVE_TTLS), so dead
+    items are retried eventually rather than never. Backed by SQLite, like
+    SQLiteResponseCache, and safe to share between threads and processes.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS failures (
+            track_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            failures INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (track_id, kind)
+        );
+    """
+
+    def __init__(self, path: str | None = None, *, ttls: dict[str, float] | None = None) -> None:
+        if path is None:
+            path = os.path.join(default_cache_dir(), "negative.sqlite3")
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._ttls = {**DEFAULT_NEGATIVE_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self._SCHEMA)
+
+    def get(self, track_id: str, *kinds: str) -> NegativeEntry | None:
+        """An unexpired entry for track_id of one of ``kinds`` (any class if none), or None."""
+        query = "SELECT track_id, kind, reason, failures, expires_at FROM failures "
+        query += "WHERE track_id = ? AND expires_at > ?"
+        params: tuple = (track_id, time.time())
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += kinds
+        with self._lock:
+            row = self._conn.execute(query + " LIMIT 1", params).fetchone()
+        return NegativeEntry(*row) if row else None
+
+    def add(self, track_id: str, kind: str, reason: str = "") -> None:
+        """Remember a failure; repeating one restarts its expiry."""
+        expires_at = time.time() + self._ttls.get(kind, 0)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO failures (track_id, kind, reason, failures, expires_at) "
+                "VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT (track_id, kind) DO UPDATE SET "
+                "reason = excluded.reason, failures = failures + 1, "
+                "expires_at = excluded.expires_at",
+                (track_id, kind, reason, expires_at),
+            )
+
+    def discard(self, track_id: str, kind: str | None = None) -> None:
+        """Forget a track's failures (of ``kind``, or all of them)."""
+        with self._lock, self._conn:
+            if kind is None:
+                self._conn.execute("DELETE FROM failures WHERE track_id = ?", (track_id,))
+            else:
+                self._conn.execute(
+                    "DELETE FROM failures WHERE track_id = ? AND kind = ?", (track_id, kind)
+                )
+
+    def purge_expired(self) -> int:
+        """Drop expired entries; returns how many were removed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM failures WHERE expires_at <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM failures")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# =========================
+# Anonymous access tokens
+# =========================
+
+# A token this close to expiry is treated as expired by spclient callers.
+TOKEN_EXPIRY_MARGIN = 60
+# Background refresh fires this many seconds before the token expires.
+TOKEN_REFRESH_LEAD = 300
+
+
+class AccessTokenManager:
+    """Thread-safe holder for the anonymous token scraped from embed pages.
+
+    Every SpotifyEmbedAPI shares one manager by default (see
+    shared_token_manager), so a new client reuses a token another client
+    already scraped instead of downloading an embed page for it. With ``path``
+    set the token, its expiry and the page it came from are persisted as JSON,
+    which lets separate processes share it. With ``auto_refresh`` a daemon
+    timer refetches that page shortly before the token expires.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        *,
+        auto_refresh: bool = False,
+        refresh_lead: float = TOKEN_REFRESH_LEAD,
+        session: requests.Session | None = None,
+    ) -> None:
+        self.path = path
+        self._auto_refresh = auto_refresh
+        self._refresh_lead = refresh_lead
+        self._session = session
+        self._lock = threading.Lock()
+        self._token: str | None = None
+        self._expires_at: float = 0
+        self._refresh_url: str | None = None
+        self._file_mtime: float | None = None
+        self._timer: threading.Timer | None = None
+        if path is not None:
+            with self._lock:
+                self._load_locked()
+                self._schedule_locked()
+
+    @property
+    def expires_at(self) -> float:
+        with self._lock:
+            return self._expires_at
+
+    def get(self) -> str | None:
+        """Return a token valid for at least TOKEN_EXPIRY_MARGIN seconds, or None."""
+        with self._lock:
+            if not self._valid_locked():
+                # Another process may have refreshed the shared file
+                self._load_locked()
+            return self._token if self._valid_locked() else None
+
+    def update(self, token: str, expires_at: float, refresh_url: str | None = None) -> None:
+        """Record a token scraped from an embed page.
+
+        Tokens older than the one already held (e.g. from a cached page) are
+        ignored.
+        """
+        with self._lock:
+            if token != self._token and expires_at < self._expires_at:
+                return
+            self._token = token
+            self._expires_at = expires_at
+            if refresh_url:
+                self._refresh_url = refresh_url
+            self._save_locked()
+            self._schedule_locked()
+
+    def clear(self) -> None:
+        """Forget the in-memory token and cancel any pending refresh."""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0
+            self._refresh_url = None
+            self._file_mtime = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def close(self) -> None:
+        """Cancel the background refresh timer."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _valid_locked(self) -> bool:
+        return bool(self._token) and time.time() < self._expires_at - TOKEN_EXPIRY_MARGIN
+
+    def _load_locked(self) -> None:
+        if self.path is None:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self._file_mtime:
+                return
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        self._file_mtime = mtime
+        expires_at = float(data.get("expiresAt") or 0)
+        if data.get("accessToken") and expires_at > self._expires_at:
+            self._token = data["accessToken"]
+            self._expires_at = expires_at
+            self._refresh_url = data.get("refreshUrl") or self._refresh_url
+
+    def _save_locked(self) -> None:
+        if self.path is None:
+            return
+        payload = {
+            "accessToken": self._token,
+            "expiresAt": self._expires_at,
+            "refreshUrl": self._refresh_url,
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh)
+            # Atomic on POSIX and Windows, so readers never see half a file
+            os.replace(tmp_path, self.path)
+            self._file_mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            logger.warning("Could not persist access token to %s: %s", self.path, e)
+
+    def _schedule_locked(self, delay: float | None = None) -> None:
+        if not self._auto_refresh or not self._refresh_url:
+            return
+        if delay is None:
+            delay = self._expires_at - self._refresh_lead - time.time()
+            if delay <= 0:
+                # Too late for a proactive refresh; the next caller refetches lazily
+                return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._load_locked()
+            url = self._refresh_url
+            if self._expires_at - time.time() > self._refresh_lead:
+                # Someone else already refreshed it
+                self._schedule_locked()
+                return
+        if not url:
+            return
+        api = SpotifyEmbedAPI(session=self._session, hydration_workers=1, token_manager=self)
+        try:
+            api._fetch_embed_data(url, read_cache=False)
+        except SpotifyDownAPIError as e:
+            logger.warning("Background token refresh failed: %s", e)
+            with self._lock:
+                if self._valid_locked():
+                    self._schedule_locked(delay=TOKEN_EXPIRY_MARGIN)
+
+
+_shared_token_manager: AccessTokenManager | None = None
+_shared_token_manager_lock = threading.Lock()
+
+
+def shared_token_manager() -> AccessTokenManager:
+    """Process-wide in-memory token manager used when none is passed explicitly."""
+    global _shared_token_manager
+    with _shared_token_manager_lock:
+        if _shared_token_manager is None:
+            _shared_token_manager = AccessTokenManager()
+        return _shared_token_manager
+
+
+# =========================
+# Rate limiting
+# =========================
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class _Bucket:
+    __slots__ = ("rate", "tokens", "updated", "blocked_until", "strikes")
+
+    def __init__(self, rate: float, tokens: float, now: float) -> None:
+        self.rate = rate
+        self.tokens = tokens
+        self.updated = now
+        self.blocked_until = 0.0
+        self.strikes = 0
+
+
+class RateLimiter:
+    """Per-host token buckets with additive-increase/multiplicative-decrease.
+
+    Every request reserves a token for its host and sleeps until that token is
+    due, so N concurrent workers share one request rate instead of each
+    hammering the host. A 429 halves the host's rate and blocks it for the
+    Retry-After delay (or an exponential penalty without one); each success
+    creeps the rate back towards ``rate``. One limiter is shared by all
+    clients by default (see shared_rate_limiter).
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 20.0,
+        burst: float | None = None,
+        min_rate: float = 0.5,
+        decrease: float = 0.5,
+        increase: float = 1.0,
+    ) -> None:
+        self.max_rate = rate
+        self.burst = burst if burst is not None else rate
+        self.min_rate = min_rate
+        self._decrease = decrease
+        self._increase = increase
+        self._lock = threading.Lock()
+        self._buckets: dict[str, _Bucket] = {}
+
+    def _bucket(self, host: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(self.max_rate, self.burst, now)
+        return bucket
+
+    def rate(self, host: str) -> float:
+        """Current requests/second allowed for host."""
+        with self._lock:
+            return self._bucket(host, time.monotonic()).rate
+
+    def reserve(self, host: str) -> float:
+        """Take a token for host; return how long to sleep before using it."""
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            elapsed = now - bucket.updated
+            bucket.tokens = min(self.burst, bucket.tokens + elapsed * bucket.rate)
+            bucket.updated = now
+            # Tokens may go negative: later callers queue behind earlier ones
+            bucket.tokens -= 1
+            wait = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            return max(wait, bucket.blocked_until - now)
+
+    def _check_wait(
+        self,
+        host: str,
+        wait: float,
+        deadline: float | None,
+        cancel_event: threading.Event | None,
+    ) -> None:
+        """Hand host's token back and raise RateLimitError if wait must not be slept."""
+        if cancel_event is not None and cancel_event.is_set():
+            reason = "cancelled"
+        elif deadline is not None and time.monotonic() + wait > deadline:
+            reason = "would overrun the deadline"
+        else:
+            return
+        with self._lock:
+            self._bucket(host, time.monotonic()).tokens += 1
+        raise RateLimitError(f"Rate limited on {host}: {wait:.1f}s wait {reason}", wait)
+
+    def acquire(
+        self,
+        host: str,
+        *,
+        deadline: float | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> float:
+        """Block until a request to host may be sent; return the time slept.
+
+        Raises RateLimitError instead of waiting past ``deadline`` (a
+        time.monotonic() value) or once ``cancel_event`` is set. Both default
+        to those of the RetryPolicy call this runs under, if any.
+        """
+        wait = self.reserve(host)
+        if wait > 0:
+            budget_deadline, budget_cancel = _retry_budget.get()
+            deadline = deadline if deadline is not None else budget_deadline
+            cancel_event = cancel_event or budget_cancel
+            self._check_wait(host, wait, deadline, cancel_event)
+            if cancel_event is None:
+                time.sleep(wait)
+            elif cancel_event.wait(wait):
+                self._check_wait(host, wait, None, cancel_event)
+        return wait
+
+    async def acquire_async(self, host: str) -> float:
+        """Async twin of acquire, bounded by the current RetryPolicy call's budget."""
+        wait = self.reserve(host)
+        if wait > 0:
+            deadline, cancel_event = _retry_budget.get()
+            self._check_wait(host, wait, deadline, cancel_event)
+            if cancel_event is None:
+                await asyncio.sleep(wait)
+                return wait
+            # threading.Event can't be awaited: poll it between short sleeps
+            ends = time.monotonic() + wait
+            while (remaining := ends - time.monotonic()) > 0:
+                await asyncio.sleep(min(remaining, 0.25))
+                self._check_wait(host, wait, None, cancel_event)
+        return wait
+
+    def blocked_for(self, host: str) -> float:
+        """Seconds until host's Retry-After/penalty window ends."""
+        with self._lock:
+            now = time.monotonic()
+            return max(0.0, self._bucket(host, now).blocked_until - now)
+
+    def record(
+        self,
+        host: str,
+        status_code: int,
+        retry_after: float | None = None,
+        *,
+        max_penalty: float = 60.0,
+    ) -> None:
+        """Adapt host's rate to a response status.
+
+        A 429 blocks host for at most ``max_penalty`` seconds, however long its
+        Retry-After: callers give up on longer waits rather than sleep them.
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            if status_code == 429:
+                bucket.strikes += 1
+                bucket.rate = max(self.min_rate, bucket.rate * self._decrease)
+                penalty = retry_after if retry_after is not None else 2.0**bucket.strikes
+                penalty = min(max_penalty, penalty)
+                bucket.blocked_until = max(bucket.blocked_until, now + penalty)
+                bucket.tokens = min(bucket.tokens, 0.0)
+            elif status_code < 400:
+                bucket.strikes = 0
+                if bucket.rate < self.max_rate:
+                    # Roughly +increase req/s per second of successful traffic
+                    bucket.rate = min(self.max_rate, bucket.rate + self._increase / bucket.rate)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+_shared_rate_limiter: RateLimiter | None = None
+_shared_rate_limiter_lock = threading.Lock()
+
+
+def shared_rate_limiter() -> RateLimiter:
+    """Process-wide rate limiter used when none is passed explicitly."""
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter()
+        return _shared_rate_limiter
+
+
+def rate_limited_get(
+    url: str,
+    *,
+    session: requests.Session | None = None,
+    limiter: RateLimiter | None = None,
+    max_retries: int = 3,
+    max_wait: float = 60.0,
+    deadline: float | None = None,
+    cancel_event: threading.Event | None = None,
+    **kwargs,
+) -> requests.Response:
+    """GET url paced by the host's rate limiter, retrying 429s after Retry-After.
+
+    Gives up and returns the 429 response after ``max_retries`` retries, or
+    straight away when the server asks for a wait longer than ``max_wait`` or
+    one that would end after ``deadline`` (a time.monotonic() value). Setting
+    ``cancel_event`` cuts a wait short, also returning the 429. Both default
+    to those of the RetryPolicy call this runs under, if any. A rate limiter
+    wait before the request that would overrun either raises RateLimitError.
+    """
+    budget_deadline, budget_cancel = _retry_budget.get()
+    deadline = deadline if deadline is not None else budget_deadline
+    cancel_event = cancel_event or budget_cancel
+    limiter = limiter or shared_rate_limiter()
+    get = session.get if session is not None else requests.get
+    host = urlsplit(url).hostname or ""
+    retries = 0
+    while True:
+        limiter.acquire(host, deadline=deadline, cancel_event=cancel_event)
+        response = get(url, **kwargs)
+        status_code = response.status_code
+        retry_after = None
+        if status_code == 429:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        limiter.record(host, status_code, retry_after, max_penalty=max_wait)
+        wait = max(limiter.blocked_for(host), retry_after or 0.0)
+        if status_code != 429 or retries >= max_retries or wait > max_wait:
+            return response
+        if deadline is not None and time.monotonic() + wait > deadline:
+            logger.debug("429 from %s: a %.1fs wait would overrun the deadline", host, wait)
+            return response
+        logger.info("429 from %s, retrying after %.1fs", host, wait)
+        if cancel_event is not None and cancel_event.wait(wait):
+            return response
+        retries += 1
+
+
+def get_with_retry(
+    url: str,
+    *,
+    policy: RetryPolicy | None = None,
+    session: requests.Session | None = None,
+    limiter: RateLimiter | None = None,
+    **kwargs,
+) -> requests.Response:
+    """rate_limited_get under a RetryPolicy; 5xx responses count as network errors."""
+
+    def attempt() -> requests.Response:
+        response = rate_limited_get(url, session=session, limiter=limiter, **kwargs)
+        if response.status_code >= 500:
+            raise NetworkError(f"{url} returned HTTP {response.status_code}")
+        return response
+
+    return (policy or default_retry_policy()).call(attempt)
+
+
+# =========================
+# HTTP sessions
+# =========================
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection pooling for sessions made by build_session.
+
+    ``pool_maxsize`` connections are kept alive per host, for up to
+    ``pool_connections`` hosts. With ``pool_block`` it is also a hard
+    per-host limit: extra requests wait for a free connection instead of
+    opening one that is thrown away afterwards. ``keep_alive=False`` asks
+    servers to close every connection after its response.
+    """
+
+    pool_connections: int = 10
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+    pool_block: bool = False
+    keep_alive: bool = True
+
+
+@dataclass(frozen=True)
+class ConnectionStats:
+    """Requests sent through a session and the connections opened for them."""
+
+    requests: int = 0
+    new_connections: int = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return max(0, self.requests - self.new_connections)
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused_connections / self.requests if self.requests else 0.0
+
+    def __add__(self, other: ConnectionStats) -> ConnectionStats:
+        return ConnectionStats(
+            self.requests + other.requests, self.new_connections + other.new_connections
+        )
+
+
+class _ConnectionCounter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self) -> ConnectionStats:
+        with self._lock:
+            return ConnectionStats(self.requests, self.new_connections)
+
+
+class _CountingConnectionMixin:
+    """urllib3 connection that reports every socket it opens, reconnects included."""
+
+    counter: _ConnectionCounter
+
+    def connect(self) -> None:
+        self.counter.record_connection()
+        super().connect()
+
+
+def _counting_pool(pool_cls: type, conn_cls: type, counter: _ConnectionCounter) -> type:
+    conn = type(
+        f"Counting{conn_cls.__name__}", (_CountingConnectionMixin, conn_cls), {"counter": counter}
+    )
+    return type(f"Counting{pool_cls.__name__}", (pool_cls,), {"ConnectionCls": conn})
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests and newly opened connections."""
+
+    def __init__(self, config: PoolConfig) -> None:
+        self.counter = _ConnectionCounter()
+        super().__init__(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            pool_block=config.pool_block,
+        )
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, HTTPConnection, self.counter),
+            "https": _counting_pool(HTTPSConnectionPool, HTTPSConnection, self.counter),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self.counter.record_request()
+        return super().send(request, *args, **kwargs)
+
+
+def build_session(config: PoolConfig | None = None) -> requests.Session:
+    """A requests.Session with tuned connection pools and reuse statistics."""
+    config = config or PoolConfig()
+    session = requests.Session()
+    adapter = _CountingHTTPAdapter(config)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not config.keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def connection_stats(session: requests.Session) -> ConnectionStats:
+    """Connection reuse for a session made by build_session (zeros for others)."""
+    stats = ConnectionStats()
+    adapters = {id(a): a for a in session.adapters.values() if isinstance(a, _CountingHTTPAdapter)}
+    for adapter in adapters.values():
+        stats += adapter.counter.snapshot()
+    return stats
+
+
+_shared_session: requests.Session | None = None
+_shared_session_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+    """Process-wide session for embed, spclient, oEmbed and cover requests."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = build_session()
+        return _shared_session
+
+
+# =========================
+# Record / replay
+# =========================
+
+CASSETTE_MODES = ("record", "replay")
+
+# Response headers kept in a cassette; the rest only add size
+_CASSETTE_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After", "Cache-Control")
+
+
+class CassetteMissError(SpotifyDownAPIError):
+    """A replayed request has no recorded response. Not retried."""
+
+
+class _ReplayTokenManager(AccessTokenManager):
+    """Token manager for replayed sessions: recorded tokens never expire."""
+
+    def _valid_locked(self) -> bool:
+        return bool(self._token)
+
+
+class _CassetteAdapter(_CountingHTTPAdapter):
+    """Adapter that records exchanges into, or answers them from, a Cassette."""
+
+    def __init__(self, cassette: Cassette, config: PoolConfig) -> None:
+        super().__init__(config)
+        self.cassette = cassette
+
+    def send(self, request, *args, **kwargs):
+        if self.cassette.mode == "replay":
+            self.counter.record_request()
+            return self.cassette._play(request)
+        started = time.perf_counter()
+        response = super().send(request, *args, **kwargs)
+        if not kwargs.get("stream"):
+            self.cassette._record(request, response, time.perf_counter() - started)
+        return response
+
+
+class Cassette:
+    """Recorded HTTP exchanges for offline, deterministic runs.
+
+    - ``mode="record"``: requests made through ``session()`` go to the
+      network and every exchange (method, URL, status, a few headers, body,
+      elapsed time) is kept; ``save()`` writes them to ``path`` as gzipped
+      JSON lines. Request headers such as Authorization are never stored.
+    - ``mode="replay"``: ``path`` is loaded and requests are answered from it
+      without touching the network. Repeated requests for one URL replay its
+      recordings in order and then keep returning the last one; unrecorded
+      requests raise CassetteMissError.
+
+    Replayed responses wait ``latency`` seconds plus ``latency_scale`` times
+    the recorded elapsed time (``latency_scale=1.0`` reproduces the original
+    timing). Pass the cassette to SpotifyEmbedAPI / PlaylistClient as
+    ``cassette=``: in replay mode the client also gets an unthrottled rate
+    limiter and a token manager that ignores the recorded token's expiry.
+    Use as a context manager to save a recording on exit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "replay",
+        *,
+        latency: float = 0.0,
+        latency_scale: float = 0.0,
+        pool: PoolConfig | None = None,
+    ) -> None:
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._exchanges: list[dict] = []
+        self._replay: dict[str, list[dict]] = {}
+        self._played: dict[str, int] = {}
+        self.misses = 0
+        self.token_manager: AccessTokenManager | None = None
+        self.rate_limiter: RateLimiter | None = None
+        if mode == "replay":
+            self._load()
+            self.token_manager = _ReplayTokenManager()
+            self.rate_limiter = RateLimiter(rate=1e9)
+
+    @staticmethod
+    def _key(method: str | None, url: str | None) -> str:
+        return f"{method or 'GET'} {url}"
+
+    def __len__(self) -> int:
+        return len(self._exchanges)
+
+    def __enter__(self) -> Cassette:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.mode == "record":
+            self.save()
+
+    def session(self) -> requests.Session:
+        """A session whose requests are recorded into / replayed from this cassette."""
+        config = self._pool or PoolConfig()
+        session = requests.Session()
+        adapter = _CassetteAdapter(self, config)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not config.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def _record(self, request, response: requests.Response, elapsed: float) -> None:
+        body = response.content or b""
+        exchange = {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "headers": {h: response.headers[h] for h in _CASSETTE_HEADERS if h in response.headers},
+            "elapsed": round(elapsed, 4),
+        }
+        try:
+            exchange["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            exchange["body_b64"] = base64.b64encode(body).decode("ascii")
+        with self._lock:
+            self._exchanges.append(exchange)
+
+    def _play(self, request) -> requests.Response:
+        key = self._key(request.method, request.url)
+        with self._lock:
+            recordings = self._replay.get(key)
+            if not recordings:
+                self.misses += 1
+                raise CassetteMissError(f"No recorded response for {key}")
+            index = self._played.get(key, 0)
+            self._played[key] = index + 1
+            exchange = recordings[min(index, len(recordings) - 1)]
+
+        delay = self.latency + self.latency_scale * exchange.get("elapsed", 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = exchange["status"]
+        response.headers = CaseInsensitiveDict(exchange.get("headers") or {})
+        response.encoding = get_encoding_from_headers(response.headers)
+        if "body_b64" in exchange:
+            response._content = base64.b64decode(exchange["body_b64"])
+        else:
+            response._content = exchange.get("body", "").encode("utf-8")
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rb") as fh:
+            for line in fh:
+                if line.strip():
+                    exchange = json_loads(line)
+                    self._exchanges.append(exchange)
+                    key = self._key(exchange.get("method"), exchange.get("url"))
+                    self._replay.setdefault(key, []).append(exchange)
+
+    def save(self) -> int:
+        """Write the recorded exchanges to ``path``; return how many were written."""
+        with self._lock:
+            exchanges = list(self._exchanges)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wb") as fh:
+            for exchange in exchanges:
+                fh.write(json_dumps(exchange) + b"\n")
+        os.replace(tmp_path, self.path)
+        logger.info("Saved %d exchanges to %s", len(exchanges), self.path)
+        return len(exchanges)
+
+
+# =========================
+# __NEXT_DATA__ extraction
+# =========================
+
+_NEXT_DATA_OPEN = b'<script id="__NEXT_DATA__"'
+_SCRIPT_CLOSE = b"</script>"
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _next_data_text(page: bytes | str) -> str | None:
+    """Return the __NEXT_DATA__ JSON text from an embed page.
+
+    For bytes, only the script body is decoded - the rest of the page never
+    becomes a str.
+    """
+    if isinstance(page, str):
+        match = SpotifyEmbedAPI._NEXT_DATA_PATTERN.search(page)
+        return match.group(1) if match else None
+    start = page.find(_NEXT_DATA_OPEN)
+    if start < 0:
+        return None
+    start = page.find(b">", start) + 1
+    end = page.find(_SCRIPT_CLOSE, start)
+    if start == 0 or end < 0:
+        return None
+    try:
+        return page[start:end].decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise ExtractionError(f"Invalid UTF-8 in __NEXT_DATA__: {exc}") from exc
+
+
+# Keys on the path from the document root to each subtree _parse_next_data reads
+_ENTITY_PATH = ("props", "pageProps", "state", "data")
+_SESSION_PATH = ("props", "pageProps", "state", "settings")
+
+
+def _decode_subtree(text: str, key: str, parents: tuple[str, ...]) -> object | None:
+    """raw_decode the value of ``"key":`` in text, or None.
+
+    Only trusted when the key occurs exactly once and every key in
+    ``parents`` occurs before it, in order; a same-named key elsewhere in the
+    document makes the position ambiguous, so None is returned instead.
+    """
+    needle = f'"{key}":'
+    idx = text.find(needle)
+    if idx < 0 or text.find(needle, idx + len(needle)) >= 0:
+        return None
+    pos = 0
+    for parent in parents:
+        pos = text.find(f'"{parent}":', pos, idx)
+        if pos < 0:
+            return None
+        pos += len(parent) + 3
+    idx += len(needle)
+    while idx < len(text) and text[idx] in " \t\r\n":
+        idx += 1
+    try:
+        value, _ = _JSON_DECODER.raw_decode(text, idx)
+    except ValueError:
+        return None
+    return value
+
+
+def _parse_next_data(text: str) -> dict:
+    """Parse only the entity and session subtrees of __NEXT_DATA__.
+
+    The returned dict keeps the full document's shape
+    (props.pageProps.state.data.entity / settings.session) so callers don't
+    care which path produced it. The entity's trackList comes along with it.
+    Anything that doesn't look right, including an "entity" or "session" key
+    appearing more than once, falls back to parsing the whole document.
+    """
+    entity = _decode_subtree(text, "entity", _ENTITY_PATH)
+    session = _decode_subtree(text, "session", _SESSION_PATH)
+    plausible = isinstance(entity, dict) and any(
+        k in entity for k in ("uri", "name", "title", "trackList")
+    )
+    if plausible and ('"session":' not in text or isinstance(session, dict)):
+        state: dict = {"data": {"entity": entity}}
+        if session is not None:
+            state["settings"] = {"session": session}
+        return {"props": {"pageProps": {"state": state}}}
+
+    try:
+        return json_loads(text)
+    except json.JSONDecodeError as exc:
+        raise ExtractionError(f"Invalid JSON in __NEXT_DATA__: {exc}") from exc
+
+
+
 class SpotifyEmbedAPI:
     """Fetch playlist data from Spotify's embed page.
 
@@ -325,14 +2022,46 @@ class SpotifyEmbedAPI:
     _EMBED_TRACK_URL = "https://open.spotify.com/embed/track/{track_id}"
     _OEMBED_URL = "https://open.spotify.com/oembed"
     _SPCLIENT_URL = "https://spclient.wg.spotify.com/playlist/v2/playlist/{playlist_id}"
+    # Revision and length only, no items: enough to tell whether a playlist changed
+    _SPCLIENT_HEAD_PARAMS = {"decorate": "revision,length", "length": "0"}
     _NEXT_DATA_PATTERN = re.compile(r'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>')
 
-    def __init__(self, *, session: requests.Session | None = None) -> None:
-        print("[Spotify_API] Initializing SpotifyEmbedAPI")
-        self._session = session or requests.Session()
-        self._cached_token: str | None = None
-        self._token_expiry: float = 0
-        print("[Spotify_API] Session ready")
+    def __init__(
+        self,
+        *,
+        session: requests.Session | None = None,
+        hydration_workers: int = DEFAULT_HYDRATION_WORKERS,
+        cache: ResponseCache | None = None,
+        token_manager: AccessTokenManager | None = None,
+        keep_raw: bool = False,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        track_cache_size: int = DEFAULT_TRACK_CACHE_SIZE,
+        spclient_page_size: int = DEFAULT_SPCLIENT_PAGE_SIZE,
+        pool: PoolConfig | None = None,
+        negative_cache: NegativeCache | None = None,
+        cassette: Cassette | None = None,
+    ) -> None:
+        if cassette is not None:
+            session = session or cassette.session()
+            token_manager = token_manager or cassette.token_manager
+            rate_limiter = rate_limiter or cassette.rate_limiter
+        self._hydration_workers = max(1, int(hydration_workers))
+        self._track_cache = _LRUCache(track_cache_size)
+        self._negative = negative_cache
+        self._spclient_page_size = max(1, int(spclient_page_size))
+        self._keep_raw = keep_raw
+        self._cache = cache
+        if session is None:
+            if pool is None and self._hydration_workers > DEFAULT_POOL_MAXSIZE:
+                # Size the pool to the hydration pool so workers don't churn connections
+                pool = PoolConfig(pool_maxsize=self._hydration_workers)
+            session = build_session(pool) if pool is not None else shared_session()
+        self._session = session
+        self._tokens = token_manager or shared_token_manager()
+        self._limiter = rate_limiter or shared_rate_limiter()
+        self._retry = retry_policy or default_retry_policy()
+        self._inflight = _SingleFlight()
 
     def _headers(self) -> dict[str, str]:
         headers = {
@@ -340,63 +2069,162 @@ class SpotifyEmbedAPI:
             "accept-language": "en-US,en;q=0.9",
             "user-agent": _DEFAULT_USER_AGENT,
         }
-        print("[Spotify_API] Request headers :", headers)
         return headers
 
-    @retry_on_network_error(max_attempts=3, backoff_factor=1.0)
-    def _fetch_embed_data(self, url: str) -> dict:
-        """Fetch and parse __NEXT_DATA__ from embed page."""
-        print("\n[Spotify_API] Fetching embed URL :", url)
+    def _get(
+        self,
+        url: str,
+        *,
+        endpoint: str,
+        headers: dict[str, str],
+        timeout: float,
+        params: dict[str, str] | None = None,
+        read_cache: bool = True,
+    ):
+        """GET through the response cache, revalidating stale entries.
+
+        Fresh entries are served without touching the network. Stale ones are
+        revalidated with If-None-Match / If-Modified-Since when the server gave
+        us validators; a 304 extends the entry and serves the cached body.
+        """
+        cache = self._cache
+        if cache is None:
+            return self._limited_get(url, headers=headers, params=params, timeout=timeout)
+
+        key = requests.Request("GET", url, params=params).prepare().url or url
+        cached = cache.get(key) if read_cache else None
+        if cached is not None and cached.is_fresh():
+            return _CachedHTTPResponse(cached.body)
+
+        if cached is not None:
+            headers = dict(headers)
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        response = self._limited_get(url, headers=headers, params=params, timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            cache.refresh(key, endpoint)
+            return _CachedHTTPResponse(cached.body)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                endpoint,
+                response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return response
+
+    def _limited_get(self, url: str, **kwargs):
+        """Session GET paced by the shared per-host rate limiter."""
+        return rate_limited_get(url, session=self._session, limiter=self._limiter, **kwargs)
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        """Retry counters for this client's network calls."""
+        return self._retry.stats
+
+    @property
+    def connection_stats(self) -> ConnectionStats:
+        """Requests and new connections on this client's session (shared by default)."""
+        return connection_stats(self._session)
+
+    @property
+    def coalesced_fetches(self) -> int:
+        """Embed/spclient fetches served by joining an identical in-flight fetch."""
+        return self._inflight.coalesced
+
+    def _get_with_retry(self, url: str, **kwargs):
+        """_get under the retry policy; connection errors and 5xx responses retry."""
+
+        def attempt():
+            try:
+                response = self._get(url, **kwargs)
+            except (requests.Timeout, requests.ConnectionError) as exc:
+                raise NetworkError(f"Network error fetching {url}: {exc}") from exc
+            if response.status_code >= 500:
+                raise NetworkError(f"{url} returned HTTP {response.status_code}")
+            return response
+
+        return self._retry.call(attempt)
+
+    def _fetch_embed_data(self, url: str, *, read_cache: bool = True) -> dict:
+        """Fetch and parse __NEXT_DATA__ from embed page, retrying transient errors.
+
+        Concurrent calls for the same page share one fetch and parse, so the
+        returned dict may be shared between threads: treat it as read-only.
+        """
+        return self._inflight.do(
+            ("embed", url, read_cache),
+            self._retry.call,
+            self._fetch_embed_page,
+            url,
+            read_cache=read_cache,
+        )
+
+    def _fetch_embed_page(self, url: str, *, read_cache: bool = True) -> dict:
+        """Single attempt of _fetch_embed_data."""
+        logger.debug("Fetching embed page %s", url)
+        endpoint = "embed_track" if "/embed/track/" in url else "embed_playlist"
 
         try:
-            response = self._session.get(url, headers=self._headers(), timeout=30)
-            print("[Spotify_API] HTTP status :", response.status_code)
+            response = self._get(
+                url,
+                endpoint=endpoint,
+                headers=self._headers(),
+                timeout=30,
+                read_cache=read_cache,
+            )
+            logger.debug("Embed page %s: HTTP %s", url, response.status_code)
         except (requests.Timeout, requests.ConnectionError) as exc:
-            print("[Spotify_API] Network exception :", exc)
             raise NetworkError(f"Network error fetching embed page: {exc}") from exc
         except requests.RequestException as exc:
-            print("[Spotify_API] Request exception :", exc)
             raise SpotifyDownAPIError(f"Failed to fetch embed page: {exc}") from exc
 
-        if response.status_code == 429:
-            print("[Spotify_API] Rate limited (429)")
-            raise RateLimitError("Rate limited by Spotify - please wait before retrying")
-        if response.status_code in (401, 403):
-            print("[Spotify_API] Access denied :", response.status_code)
+        self._check_embed_status(response.status_code, response.headers)
+        return self._parse_embed_page(response.content, url)
+
+    def _check_embed_status(self, status_code: int, headers: Mapping | None = None) -> None:
+        """Map an embed page HTTP status to the matching API error."""
+        if status_code == 429:
+            retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+            raise RateLimitError(
+                "Rate limited by Spotify - please wait before retrying", retry_after=retry_after
+            )
+        if status_code in (401, 403):
             raise ExtractionError(
-                f"Access denied (HTTP {response.status_code}) - playlist may be private"
+                f"Access denied (HTTP {status_code}) - playlist may be private", status_code
             )
-        if response.status_code != 200:
-            print("[Spotify_API] Unexpected HTTP status")
-            raise NetworkError(f"Embed page returned HTTP {response.status_code}")
-
-        print("[Spotify_API] Searching for __NEXT_DATA__")
-        match = self._NEXT_DATA_PATTERN.search(response.text)
-        if not match:
-            print("[Spotify_API] __NEXT_DATA__ not found")
+        if 400 <= status_code < 500:
+            # Not found/gone - retrying won't help
+            raise ExtractionError(f"Embed page returned HTTP {status_code}", status_code)
+        if status_code != 200:
+            raise NetworkError(f"Embed page returned HTTP {status_code}")
+
+    def _parse_embed_page(self, page: bytes | str, url: str | None = None) -> dict:
+        """Extract __NEXT_DATA__ from an embed page and hand its token to the manager.
+
+        Pass the raw response bytes: only the script body is decoded and only
+        the entity/session subtrees are parsed (see _parse_next_data).
+        """
+        text = _next_data_text(page)
+        if text is None:
             raise ExtractionError("Could not find __NEXT_DATA__ in embed page")
 
-        print("[Spotify_API] __NEXT_DATA__ found, parsing JSON")
-        try:
-            data = json.loads(match.group(1))
-            print("[Spotify_API] JSON parsed successfully")
-        except json.JSONDecodeError as exc:
-            print("[Spotify_API] JSON decode error :", exc)
-            raise ExtractionError(f"Invalid JSON in __NEXT_DATA__: {exc}") from exc
+        data = _parse_next_data(text)
 
         # Cache the access token if present
         try:
             session_data = data["props"]["pageProps"]["state"]["settings"]["session"]
-            self._cached_token = session_data.get("accessToken")
+            token = session_data.get("accessToken")
             expiry_ms = session_data.get("accessTokenExpirationTimestampMs", 0)
-            self._token_expiry = expiry_ms / 1000 if expiry_ms else 0
-
-            print("[Spotify_API] Cached token :", bool(self._cached_token))
-            print("[Spotify_API] Token expiry (s) :", self._token_expiry)
+            if token:
+                self._tokens.update(token, expiry_ms / 1000 if expiry_ms else 0, url)
         except (KeyError, TypeError):
-            print("[Spotify_API] No session token found")
+            logger.debug("No session token in embed page %s", url)
 
-        print("[Spotify_API] Embed data ready")
         return data
 
 
@@ -422,31 +2250,23 @@ class SpotifyEmbedAPI:
 
     def _extract_entity(self, data: dict) -> dict:
         """Extract the entity data from __NEXT_DATA__."""
-        print("[Spotify_api] Starting _extract_entity with data keys:", list(data.keys()))
         try:
-            entity = data["props"]["pageProps"]["state"]["data"]["entity"]
-            print("[Spotify_api] Extracted entity:", entity)
-            return entity
+            return data["props"]["pageProps"]["state"]["data"]["entity"]
         except (KeyError, TypeError) as exc:
-            print("[Spotify_api] Extraction failed:", exc)
             raise ExtractionError(f"Unexpected embed page structure: {exc}") from exc
 
 
     def _get_access_token(self, playlist_id: str) -> str | None:
         """Get a valid access token, refreshing if needed."""
-        print(f"[Spotify_api] Requested access token for playlist_id: {playlist_id}")
-        current_time = time.time()
-        print("[Spotify_api] Current time:", current_time)
-        if self._cached_token and current_time < self._token_expiry - 60:
-            print("[Spotify_api] Using cached token:", self._cached_token)
-            return self._cached_token
-
-        # Fetch embed page to get fresh token
+        token = self._tokens.get()
+        if token:
+            return token
+
+        # Fetch embed page to get fresh token (a cached page may hold an old one)
         url = self._EMBED_PLAYLIST_URL.format(playlist_id=playlist_id)
-        print("[Spotify_api] Fetching embed data from URL:", url)
-        self._fetch_embed_data(url)
-        print("[Spotify_api] New cached token after fetch:", self._cached_token)
-        return self._cached_token
+        logger.debug("Refreshing access token from %s", url)
+        self._fetch_embed_data(url, read_cache=False)
+        return self._tokens.get()
 
 
 
@@ -495,64 +2315,128 @@ class SpotifyEmbedAPI:
 
 
 
-    def get_playlist_metadata(self, playlist_id: str) -> PlaylistInfo:
-        """Get playlist metadata from the embed page."""
-        print(f"[Spotify_api] Fetching playlist metadata for ID: {playlist_id}")
+    def _fetch_spclient_playlist(
+        self,
+        playlist_id: str,
+        *,
+        params: dict[str, str] | None = None,
+        read_cache: bool = True,
+    ) -> dict | None:
+        """Fetch the spclient playlist payload using the cached anonymous token.
+
+        Returns None when no token is available or the request fails; callers
+        fall back to what the embed page gave them. Concurrent identical calls
+        share one request and the (read-only) payload.
+        """
+        key = ("spclient", playlist_id, tuple(sorted((params or {}).items())), read_cache)
+        return self._inflight.do(key, self._load_spclient_playlist, playlist_id, params, read_cache)
+
+    def _load_spclient_playlist(
+        self, playlist_id: str, params: dict[str, str] | None, read_cache: bool
+    ) -> dict | None:
+        token = self._tokens.get()
+        if not token and self._cache is not None:
+            # The embed page may have come from cache with an expired token
+            try:
+                token = self._get_access_token(playlist_id)
+            except SpotifyDownAPIError as e:
+                logger.warning("Token refresh failed: %s", e)
+        if not token:
+            logger.debug("No access token for spclient request on %s", playlist_id)
+            return None
 
-        url = self._EMBED_PLAYLIST_URL.format(playlist_id=playlist_id)
-        print("[Spotify_api] Embed URL:", url)
+        try:
+            spclient_url = self._SPCLIENT_URL.format(playlist_id=playlist_id)
+            headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+            resp = self._get_with_retry(
+                spclient_url,
+                endpoint="spclient",
+                headers=headers,
+                params=params,
+                timeout=30,
+                read_cache=read_cache,
+            )
+            if resp.status_code != 200:
+                logger.info("spclient returned HTTP %s for %s", resp.status_code, playlist_id)
+                return None
+            return json_loads(resp.content)
+        except Exception as e:
+            logger.warning("spclient fetch failed for %s: %s", playlist_id, e)
+            return None
 
-        data = self._fetch_embed_data(url)
-        print("[Spotify_api] Raw embed data keys:", list(data.keys()) if isinstance(data, dict) else data)
+    def _spclient_page_params(self, offset: int) -> dict[str, str]:
+        return {"from": str(offset), "length": str(self._spclient_page_size)}
 
+    def get_playlist_snapshot(self, playlist_id: str) -> PlaylistSnapshot:
+        """Fetch playlist metadata and tracks with one embed and one spclient request.
+
+        Only the first spclient page is fetched; iter_snapshot_tracks pages
+        through the rest as it goes.
+        """
+        logger.debug("Fetching playlist snapshot for %s", playlist_id)
+        url = self._EMBED_PLAYLIST_URL.format(playlist_id=playlist_id)
+        data = self._fetch_embed_data(url)
         entity = self._extract_entity(data)
-        print("[Spotify_api] Entity extracted:", entity)
+        spc_data = self._fetch_spclient_playlist(playlist_id, params=self._spclient_page_params(0))
+        complete = not spc_data or not self._has_more_pages(spc_data)
+        return self._build_snapshot(playlist_id, entity, spc_data, spclient_complete=complete)
 
+    def _build_snapshot(
+        self,
+        playlist_id: str,
+        entity: dict,
+        spc_data: dict | None,
+        *,
+        spclient_complete: bool = True,
+    ) -> PlaylistSnapshot:
+        """Assemble a PlaylistSnapshot from an embed entity and spclient payload."""
         # Name and subtitle
         name = entity.get("name") or entity.get("title") or "Unknown Playlist"
         subtitle = entity.get("subtitle")
-        print("[Spotify_api] Playlist name:", name)
-        print("[Spotify_api] Playlist subtitle/owner:", subtitle)
 
         # Cover URL
         cover_url = None
         cover_art = entity.get("coverArt", {})
         sources = cover_art.get("sources", [])
         if sources:
-            cover_url = sources[-1].get("url") if sources else None
-        print("[Spotify_api] Cover URL:", cover_url)
+            cover_url = sources[-1].get("url")
+
+        # Tracks from embed page (up to ~100)
+        tracks: list[TrackInfo] = []
+        for track in entity.get("trackList", []):
+            if not isinstance(track, dict):
+                continue
 
-        # Track count from embed
-        track_list = entity.get("trackList", [])
-        track_count = len(track_list)
-        print("[Spotify_api] Track count from embed:", track_count)
+            uri = track.get("uri", "")
+            track_id = uri.split(":")[-1] if uri.startswith("spotify:track:") else ""
+            if not track_id:
+                continue
 
-        # Try true count from spclient
-        try:
-            token = self._cached_token
-            print("[Spotify_api] Using cached token for spclient request:", token)
-            if token:
-                spclient_url = self._SPCLIENT_URL.format(playlist_id=playlist_id)
-                headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
-                print("[Spotify_api] SPClient URL:", spclient_url)
-                resp = self._session.get(spclient_url, headers=headers, timeout=10)
-                print("[Spotify_api] SPClient response status:", resp.status_code)
-                if resp.status_code == 200:
-                    spc_data = resp.json()
-                    track_count = spc_data.get("length", track_count)
-                    print("[Spotify_api] Track count from SPClient:", track_count)
-        except Exception as e:
-            print("[Spotify_api] SPClient fetch failed, falling back to embed count:", e)
+            tracks.append(self._parse_track(track, track_id))
 
-        playlist_info = PlaylistInfo(
+        # True count (and the full URI list) from spclient
+        track_count = len(entity.get("trackList", []))
+        if spc_data:
+            track_count = spc_data.get("length", track_count)
+
+        info = PlaylistInfo(
             name=str(name),
             owner=str(subtitle) if subtitle else None,
             description=entity.get("description"),
             cover_url=cover_url,
             track_count=track_count,
         )
-        print("[Spotify_api] Final PlaylistInfo object:", playlist_info)
-        return playlist_info
+        return PlaylistSnapshot(
+            playlist_id=playlist_id,
+            info=info,
+            tracks=tracks,
+            spclient=spc_data,
+            spclient_complete=spclient_complete,
+        )
+
+    def get_playlist_metadata(self, playlist_id: str) -> PlaylistInfo:
+        """Get playlist metadata from the embed page."""
+        return self.get_playlist_snapshot(playlist_id).info
 
 
     # def iter_playlist_tracks(self, playlist_id: str) -> Iterator[TrackInfo]:
@@ -642,100 +2526,149 @@ class SpotifyEmbedAPI:
 
     def iter_playlist_tracks(self, playlist_id: str) -> Iterator[TrackInfo]:
         """Iterate over playlist tracks with fallback for large playlists."""
-        print(f"[Spotify_api] Iterating tracks for playlist ID: {playlist_id}")
-
-        url = self._EMBED_PLAYLIST_URL.format(playlist_id=playlist_id)
-        print("[Spotify_api] Embed URL:", url)
-
-        data = self._fetch_embed_data(url)
-        print("[Spotify_api] Raw embed data keys:", list(data.keys()) if isinstance(data, dict) else data)
-
-        entity = self._extract_entity(data)
-        print("[Spotify_api] Entity extracted:", entity)
-
-        track_list = entity.get("trackList", [])
-        print(f"[Spotify_api] Number of tracks from embed: {len(track_list)}")
-
-        embed_track_ids: set[str] = set()
-
-        # Yield tracks from embed page (up to ~100)
-        for track in track_list:
-            if not isinstance(track, dict):
-                continue
-
-            uri = track.get("uri", "")
-            track_id = uri.split(":")[-1] if uri.startswith("spotify:track:") else ""
-            if not track_id:
-                continue
-
-            embed_track_ids.add(track_id)
-            parsed_track = self._parse_track(track, track_id)
-            print(f"[Spotify_api] Yielding embed track: {track_id} - {parsed_track.title}")
-            yield parsed_track
-
-        # Check if there are more tracks via spclient
-        token = self._cached_token
-        print("[Spotify_api] Cached token for spclient:", token)
-        if not token:
-            print("[Spotify_api] No token available, stopping iteration.")
-            return
+        yield from self.iter_snapshot_tracks(self.get_playlist_snapshot(playlist_id))
+
+    def iter_snapshot_tracks(
+        self, snapshot: PlaylistSnapshot, *, progress: ProgressCallback | None = None
+    ) -> Iterator[TrackInfo]:
+        """Iterate over all tracks of an already fetched snapshot.
+
+        Yields the embed tracks first, then hydrates any tracks beyond the
+        embed limit from the spclient URI list, fetching it one page at a
+        time as hydration catches up. No playlist page is refetched.
+        ``progress(listed, total)`` is called once up front and again as each
+        further spclient page arrives.
+        """
+        yield from snapshot.tracks
 
         try:
-            spclient_url = self._SPCLIENT_URL.format(playlist_id=playlist_id)
-            headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
-            print("[Spotify_api] SPClient URL:", spclient_url)
-            resp = self._session.get(spclient_url, headers=headers, timeout=30)
-            print("[Spotify_api] SPClient response status:", resp.status_code)
-
-            if resp.status_code != 200:
-                print("[Spotify_api] SPClient fetch failed, stopping iteration.")
-                return
+            yield from self._hydrate_tracks(self._iter_remaining_track_ids(snapshot, progress))
+        except Exception as e:
+            # spclient fallback failed, just return what we have
+            logger.warning("spclient fallback failed: %s", e)
+
+    def _remaining_track_ids(self, snapshot: PlaylistSnapshot) -> list[str]:
+        """Track IDs in the snapshot's spclient payload that the embed page did not include."""
+        if not self._has_remaining_tracks(snapshot):
+            return []
+        return list(_unseen_track_ids(_spclient_item_uris(snapshot.spclient), snapshot.tracks))
+
+    def _iter_remaining_track_ids(
+        self, snapshot: PlaylistSnapshot, progress: ProgressCallback | None = None
+    ) -> Iterator[str]:
+        """Like _remaining_track_ids, paging through spclient beyond the snapshot's payload."""
+        first = _spclient_item_uris(snapshot.spclient) if snapshot.spclient else ()
+        if progress:
+            progress(max(len(snapshot.tracks), len(first)), snapshot.info.track_count)
+        if not self._has_remaining_tracks(snapshot):
+            return
 
-            spc_data = resp.json()
-            total_tracks = spc_data.get("length", 0)
-            print(f"[Spotify_api] Total tracks according to SPClient: {total_tracks}")
+        pages = self._iter_spclient_pages(snapshot.playlist_id, snapshot.spclient, progress)
+        uris = (uri for page in pages for uri in page)
+        yield from _unseen_track_ids(uris, snapshot.tracks)
 
-            if total_tracks <= len(embed_track_ids):
-                print("[Spotify_api] All tracks already yielded from embed, stopping iteration.")
-                return
+    def _has_remaining_tracks(self, snapshot: PlaylistSnapshot) -> bool:
+        spc_data = snapshot.spclient
+        return bool(spc_data) and spc_data.get("length", 0) > len(snapshot.tracks)
 
-            # Get remaining track URIs from spclient
-            contents = spc_data.get("contents", {})
-            items = contents.get("items", [])
-            print(f"[Spotify_api] Remaining tracks from SPClient: {len(items)}")
+    def iter_playlist_uris(
+        self, playlist_id: str, *, progress: ProgressCallback | None = None
+    ) -> Iterator[str]:
+        """Item URIs of a playlist in order, fetched one spclient page at a time.
 
-            for item in items:
-                uri = item.get("uri", "")
-                if not uri.startswith("spotify:track:"):
-                    continue
+        Only the current page is held in memory. ``progress(listed, total)`` is
+        called after each page. Raises SpotifyDownAPIError if a page can't be
+        fetched.
+        """
+        self._get_access_token(playlist_id)
+        first = self._require_page(playlist_id, 0)
+        if progress:
+            progress(len(_spclient_item_uris(first)), first.get("length", 0))
+        for page in self._iter_spclient_pages(playlist_id, first, progress):
+            yield from page
+
+    def _iter_spclient_pages(
+        self, playlist_id: str, first: Mapping, progress: ProgressCallback | None = None
+    ) -> Iterator[tuple[str, ...]]:
+        """Item URIs page by page, starting with the already fetched ``first`` page.
+
+        A short page ends the listing. So does one longer than requested,
+        which means the server ignored the window and sent everything.
+        """
+        page_size = self._spclient_page_size
+        total = first.get("length", 0)
+        revision = first.get("revision")
+        page = _spclient_item_uris(first)
+        listed = len(page)
+        yield page
+
+        while len(page) == page_size and listed < total:
+            data = self._require_page(playlist_id, listed)
+            if data.get("revision") != revision:
+                logger.warning("Playlist %s changed while paging through it", playlist_id)
+                revision = data.get("revision")
+            page = _spclient_item_uris(data)
+            if len(page) > page_size:
+                page = page[listed:]
+            listed += len(page)
+            del data
+            if progress:
+                progress(listed, total)
+            yield page
+
+    def _has_more_pages(self, first: Mapping) -> bool:
+        """Whether a first spclient page is full and short of the total."""
+        listed = len(_spclient_item_uris(first))
+        return listed == self._spclient_page_size and listed < first.get("length", 0)
+
+    def _require_page(self, playlist_id: str, offset: int) -> dict:
+        """One spclient page; unlike the snapshot fetch there is nothing to fall back to."""
+        data = self._fetch_spclient_playlist(playlist_id, params=self._spclient_page_params(offset))
+        if data is None:
+            raise SpotifyDownAPIError(
+                f"Could not fetch playlist contents for {playlist_id} at offset {offset}"
+            )
+        return data
 
-                track_id = uri.split(":")[-1]
-                if track_id in embed_track_ids:
-                    continue  # Already yielded
+    def diff_playlist(self, playlist_id: str, since: PlaylistState | None = None) -> PlaylistDiff:
+        """Tracks added to and removed from a playlist since ``since``.
 
-                # Fetch individual track metadata
-                try:
-                    track_info = self._fetch_track_metadata(track_id)
-                    if track_info:
-                        print(f"[Spotify_api] Yielding SPClient track: {track_id} - {track_info.title}")
-                        yield track_info
-                except Exception as e:
-                    print(f"[Spotify_api] Failed to fetch track {track_id}, yielding minimal info. Error: {e}")
-                    yield TrackInfo(
-                        id=track_id,
-                        title=f"Track {track_id}",
-                        artists="Unknown Artist",
-                        album=None,
-                        release_date=None,
-                        cover_url=None,
-                        duration_ms=None,
-                        preview_url=None,
-                        raw={"uri": uri},
-                    )
+        With a stored revision, one item-less spclient request decides whether
+        anything changed, so an unchanged playlist is neither listed nor
+        hydrated. Otherwise the URI list is fetched once and only the added
+        tracks are hydrated. Without ``since`` every track counts as added.
+        Keep the returned ``diff.state`` for the next call.
+        """
+        if since is not None and since.playlist_id != playlist_id:
+            raise ValueError(f"State is for playlist {since.playlist_id}, not {playlist_id}")
+        self._get_access_token(playlist_id)
+
+        spc_data = None
+        if since is not None and since.revision:
+            head = self._require_spclient(playlist_id, params=self._SPCLIENT_HEAD_PARAMS)
+            if head.get("revision") == since.revision:
+                logger.debug("Playlist %s unchanged at revision %s", playlist_id, since.revision)
+                return PlaylistDiff(playlist_id, since, [], [], [])
+            if len(_spclient_item_uris(head)) == head.get("length"):
+                spc_data = head  # The server sent the items anyway
+        if spc_data is None:
+            spc_data = self._require_spclient(playlist_id)
+
+        state = PlaylistState.from_spclient(playlist_id, spc_data)
+        added_uris, removed_uris = _diff_uris(since.track_uris if since else (), state.track_uris)
+        added_ids = [uri.split(":")[-1] for uri in added_uris if uri.startswith("spotify:track:")]
+        added = list(self._hydrate_tracks(added_ids))
+        logger.debug(
+            "Playlist %s: %d added, %d removed", playlist_id, len(added_uris), len(removed_uris)
+        )
+        return PlaylistDiff(playlist_id, state, added, added_uris, removed_uris)
 
-        except Exception as e:
-            print("[Spotify_api] SPClient fallback failed:", e)
-            pass  # spclient fallback failed, just return what we have
+    def _require_spclient(self, playlist_id: str, params: dict[str, str] | None = None) -> dict:
+        """Uncached spclient payload; diffs can't fall back to the embed page."""
+        spc_data = self._fetch_spclient_playlist(playlist_id, params=params, read_cache=False)
+        if spc_data is None:
+            raise SpotifyDownAPIError(f"Could not fetch playlist contents for {playlist_id}")
+        return spc_data
 
 
 
@@ -775,34 +2708,89 @@ class SpotifyEmbedAPI:
 
 
 
+    def _hydrate_tracks(self, track_ids: Iterable[str]) -> Iterator[TrackInfo]:
+        """Fetch individual track metadata concurrently, yielding in input order.
+
+        At most ``hydration_workers`` track embeds are in flight, and only a
+        small window of finished results is buffered ahead of the consumer.
+        A track whose fetch raises is replaced by a minimal stub; one whose
+        embed page is unavailable is skipped, as in the sequential path.
+        """
+        workers = self._hydration_workers
+        if workers == 1:
+            for track_id in track_ids:
+                track_info = self._hydration_result(track_id, None)
+                if track_info:
+                    yield track_info
+            return
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sunnify-hydrate")
+        pending: deque[tuple[str, Future]] = deque()
+        try:
+            for track_id in track_ids:
+                pending.append((track_id, pool.submit(self._fetch_track_metadata, track_id)))
+                if len(pending) < workers * 2:
+                    continue
+                track_info = self._hydration_result(*pending.popleft())
+                if track_info:
+                    yield track_info
+
+            while pending:
+                track_info = self._hydration_result(*pending.popleft())
+                if track_info:
+                    yield track_info
+        finally:
+            # Consumer may stop early (cancel button, break) - drop queued work
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _hydration_result(self, track_id: str, future: Future | None) -> TrackInfo | None:
+        """Resolve one hydration job, falling back to a stub on errors."""
+        try:
+            if future is None:
+                return self._fetch_track_metadata(track_id)
+            return future.result()
+        except Exception as e:
+            logger.warning("Failed to fetch track %s, yielding stub: %s", track_id, e)
+            return self._stub_track(track_id)
+
+    def _raw(self, payload: dict) -> Mapping[str, object]:
+        """Copy of the source payload for TrackInfo.raw, if this client keeps them."""
+        return dict(payload) if self._keep_raw else NO_RAW
+
+    def _stub_track(self, track_id: str) -> TrackInfo:
+        """Minimal TrackInfo for a track whose metadata could not be fetched."""
+        return TrackInfo(
+            id=track_id,
+            title=f"Track {track_id}",
+            artists="Unknown Artist",
+            album=None,
+            release_date=None,
+            cover_url=None,
+            duration_ms=None,
+            preview_url=None,
+            raw=self._raw({"uri": f"spotify:track:{track_id}"}),
+        )
+
     def _parse_track(self, track: dict, track_id: str) -> TrackInfo:
         """Parse a track dict from embed trackList."""
-        print(f"[Spotify_api] Parsing track ID: {track_id}")
-        print("[Spotify_api] Raw track dict keys:", list(track.keys()) if isinstance(track, dict) else track)
-
         title = track.get("title") or track.get("name") or "Unknown Track"
         artists = track.get("subtitle") or track.get("artists") or ""
 
         if isinstance(artists, list):
             artists = ", ".join(a.get("name", "") for a in artists if isinstance(a, dict))
 
-        print(f"[Spotify_api] Track title: {title}")
-        print(f"[Spotify_api] Track artists: {artists}")
 
         preview_url = None
         audio_preview = track.get("audioPreview", {})
         if isinstance(audio_preview, dict):
             preview_url = audio_preview.get("url")
-        print(f"[Spotify_api] Track preview URL: {preview_url}")
 
         duration_ms = track.get("duration")
-        print(f"[Spotify_api] Track duration (ms): {duration_ms}")
 
         album_name = track.get("album", {}).get("name") if isinstance(track.get("album"), dict) else None
         release_date = track.get("releaseDate")
-        print(f"[Spotify_api] Track album: {album_name}, release date: {release_date}")
 
-        track_info = TrackInfo(
+        return TrackInfo(
             id=track_id,
             title=str(title),
             artists=str(artists),
@@ -811,10 +2799,8 @@ class SpotifyEmbedAPI:
             cover_url=None,
             duration_ms=int(duration_ms) if duration_ms else None,
             preview_url=preview_url,
-            raw=dict(track),
+            raw=self._raw(track),
         )
-        print("[Spotify_api] Parsed TrackInfo object:", track_info)
-        return track_info
 
 
 
@@ -887,25 +2873,37 @@ class SpotifyEmbedAPI:
 
     def _fetch_track_metadata(self, track_id: str) -> TrackInfo | None:
         """Fetch metadata for a single track from its embed page."""
-        print(f"[Spotify_api] Fetching metadata for track ID: {track_id}")
-
-        url = self._EMBED_TRACK_URL.format(track_id=track_id)
-        print("[Spotify_api] Embed track URL:", url)
-
         try:
-            data = self._fetch_embed_data(url)
-            print("[Spotify_api] Raw embed data keys:", list(data.keys()) if isinstance(data, dict) else data)
-
-            entity = self._extract_entity(data)
-            print("[Spotify_api] Entity extracted:", entity)
-
+            return self._fetch_track(track_id)
         except SpotifyDownAPIError as e:
-            print("[Spotify_api] Spotify embed page unavailable for track:", track_id, e)
+            logger.info("Embed page unavailable for track %s: %s", track_id, e)
             return None
 
+    def _fetch_track(self, track_id: str) -> TrackInfo:
+        """Fetch and parse a track embed page, raising on failure.
+
+        Tracks the negative cache knows to be unavailable or region-blocked
+        fail straight away, and new failures of those kinds are recorded.
+        """
+        negative = self._negative
+        if negative is not None:
+            entry = negative.get(track_id, "unavailable", "region_blocked")
+            if entry is not None:
+                raise ExtractionError(f"Track {track_id} is {entry.kind}: {entry.reason}")
+        url = self._EMBED_TRACK_URL.format(track_id=track_id)
+        try:
+            entity = self._extract_entity(self._fetch_embed_data(url))
+        except ExtractionError as e:
+            kind = negative_kind(e)
+            if negative is not None and kind is not None:
+                negative.add(track_id, kind, str(e))
+            raise
+        return self._parse_track_entity(entity, track_id)
+
+    def _parse_track_entity(self, entity: dict, track_id: str) -> TrackInfo:
+        """Parse the entity of a single-track embed page."""
         # Track title
         title = entity.get("name") or entity.get("title") or "Unknown Track"
-        print("[Spotify_api] Track title:", title)
 
         # Artists
         artists_data = entity.get("artists", [])
@@ -913,14 +2911,12 @@ class SpotifyEmbedAPI:
             artists = ", ".join(a.get("name", "") for a in artists_data if isinstance(a, dict))
         else:
             artists = entity.get("subtitle", "")
-        print("[Spotify_api] Track artists:", artists)
 
         # Preview URL
         preview_url = None
         audio_preview = entity.get("audioPreview", {})
         if isinstance(audio_preview, dict):
             preview_url = audio_preview.get("url")
-        print("[Spotify_api] Track preview URL:", preview_url)
 
         # Cover URL
         cover_url = None
@@ -932,7 +2928,6 @@ class SpotifyEmbedAPI:
                     cover_url = img.get("url")
                     if img.get("maxWidth", 0) >= 300:
                         break
-        print("[Spotify_api] Track cover URL:", cover_url)
 
         # Release date
         release_date = None
@@ -941,16 +2936,13 @@ class SpotifyEmbedAPI:
             release_date = rd.get("isoString", "")[:10]
         elif isinstance(rd, str):
             release_date = rd
-        print("[Spotify_api] Track release date:", release_date)
 
         # Album name (may not be available)
         album = None
-        print("[Spotify_api] Track album:", album)
 
         duration_ms = entity.get("duration")
-        print("[Spotify_api] Track duration (ms):", duration_ms)
 
-        track_info = TrackInfo(
+        return TrackInfo(
             id=track_id,
             title=str(title),
             artists=str(artists),
@@ -959,11 +2951,8 @@ class SpotifyEmbedAPI:
             cover_url=cover_url,
             duration_ms=duration_ms,
             preview_url=preview_url,
-            raw=dict(entity),
+            raw=self._raw(entity),
         )
-        print("[Spotify_api] Final TrackInfo object:", track_info)
-
-        return track_info
 
 
 
@@ -982,21 +2971,15 @@ class SpotifyEmbedAPI:
 
     def validate_playlist(self, playlist_id: str) -> bool:
         """Quick validation using oEmbed API (no full data fetch)."""
-        print(f"[Spotify_api] Validating playlist ID: {playlist_id}")
-
         try:
             params = {"url": f"https://open.spotify.com/playlist/{playlist_id}"}
-            print("[Spotify_api] oEmbed API request params:", params)
-
-            resp = self._session.get(self._OEMBED_URL, params=params, timeout=10)
-            print("[Spotify_api] oEmbed API response status code:", resp.status_code)
-
-            valid = resp.status_code == 200
-            print(f"[Spotify_api] Playlist validation result: {valid}")
-            return valid
-
+            resp = self._get_with_retry(
+                self._OEMBED_URL, endpoint="oembed", headers={}, params=params, timeout=10
+            )
+            logger.debug("oEmbed check for %s: HTTP %s", playlist_id, resp.status_code)
+            return resp.status_code == 200
         except Exception as e:
-            print("[Spotify_api] Playlist validation failed with exception:", e)
+            logger.info("Playlist validation failed for %s: %s", playlist_id, e)
             return False
 
 
@@ -1023,16 +3006,56 @@ class SpotifyEmbedAPI:
 
     def get_track(self, track_id: str) -> TrackInfo:
         """Get metadata for a single track."""
-        print(f"[Spotify_api] Getting track metadata for track ID: {track_id}")
-
         track_info = self._fetch_track_metadata(track_id)
         if track_info is None:
-            print(f"[Spotify_api] Failed to fetch track {track_id}, raising SpotifyDownAPIError")
             raise SpotifyDownAPIError(f"Could not fetch track {track_id}")
-
-        print("[Spotify_api] Successfully fetched TrackInfo:", track_info)
         return track_info
 
+    def get_tracks(
+        self, track_ids: Iterable[str], *, max_workers: int | None = None
+    ) -> list[TrackResult]:
+        """Metadata for many tracks in one call.
+
+        IDs are deduplicated, tracks already in this client's cache are served
+        from it, and the rest are fetched concurrently (``max_workers``,
+        default ``hydration_workers``; requests still go through the shared
+        rate limiter). Results follow the input order, duplicates included.
+        A track that can't be fetched gets a result with ``error`` set rather
+        than failing the batch.
+        """
+        ids = list(track_ids)
+        results: dict[str, TrackResult] = {}
+        missing: list[str] = []
+        for track_id in dict.fromkeys(ids):
+            cached = self._track_cache.get(track_id)
+            if cached is not None:
+                results[track_id] = TrackResult(track_id, cached)
+            else:
+                missing.append(track_id)
+
+        workers = min(max_workers or self._hydration_workers, len(missing))
+        if workers <= 1:
+            fetched: Iterable[TrackResult] = map(self._track_result, missing)
+            results.update(zip(missing, fetched))
+        else:
+            with ThreadPoolExecutor(workers, thread_name_prefix="sunnify-tracks") as pool:
+                results.update(zip(missing, pool.map(self._track_result, missing)))
+        logger.debug(
+            "get_tracks: %d ids, %d unique, %d fetched", len(ids), len(results), len(missing)
+        )
+        return [results[track_id] for track_id in ids]
+
+    def _track_result(self, track_id: str) -> TrackResult:
+        """Fetch one track for get_tracks, capturing the error instead of raising."""
+        try:
+            track_info = self._fetch_track(track_id)
+        except SpotifyDownAPIError as e:
+            return TrackResult(track_id, error=e)
+        except Exception as e:
+            return TrackResult(track_id, error=SpotifyDownAPIError(f"Track {track_id}: {e}"))
+        self._track_cache.put(track_id, track_info)
+        return TrackResult(track_id, track_info)
+
 
 
 # # Legacy class kept for compatibility - redirects to embed API
@@ -1074,29 +3097,25 @@ class SpotifyDownAPI:
     """Legacy wrapper - spotifydown mirrors are dead."""
 
     def __init__(self, **kwargs) -> None:
-        print("[Spotify_api] Initialized legacy SpotifyDownAPI (non-functional)")
+        logger.debug("SpotifyDownAPI is a non-functional legacy shim")
 
     def get_playlist_metadata(self, playlist_id: str) -> PlaylistInfo:
-        print(f"[Spotify_api] Attempted to fetch playlist metadata for {playlist_id} (legacy)")
         raise SpotifyDownAPIError(
             "spotifydown mirrors are no longer functional. Use SpotifyEmbedAPI instead."
         )
 
     def iter_playlist_tracks(self, playlist_id: str) -> Iterator[TrackInfo]:
-        print(f"[Spotify_api] Attempted to iterate tracks for {playlist_id} (legacy)")
         raise SpotifyDownAPIError(
             "spotifydown mirrors are no longer functional. Use SpotifyEmbedAPI instead."
         )
 
     def get_track_download_link(self, track_id: str) -> str | None:
-        print(f"[Spotify_api] Attempted to get download link for track {track_id} (legacy)")
         raise SpotifyDownAPIError(
             "spotifydown mirrors are no longer functional. "
             "Use yt-dlp YouTube search for audio downloads."
         )
 
     def get_track_youtube_id(self, track_id: str) -> str | None:
-        print(f"[Spotify_api] Attempted to get YouTube ID for track {track_id} (legacy)")
         raise SpotifyDownAPIError(
             "spotifydown mirrors are no longer functional. "
             "Use yt-dlp YouTube search for audio downloads."
@@ -1133,16 +3152,14 @@ class SpotifyPublicAPI:
     """Legacy wrapper - Spotify's anonymous token endpoint is blocked."""
 
     def __init__(self, **kwargs) -> None:
-        print("[Spotify_api] Initialized legacy SpotifyPublicAPI (non-functional)")
+        logger.debug("SpotifyPublicAPI is a non-functional legacy shim")
 
     def get_playlist_metadata(self, playlist_id: str) -> PlaylistInfo:
-        print(f"[Spotify_api] Attempted to fetch playlist metadata for {playlist_id} (legacy)")
         raise SpotifyDownAPIError(
             "Spotify's anonymous token endpoint is blocked. Use SpotifyEmbedAPI instead."
         )
 
     def iter_playlist_tracks(self, playlist_id: str) -> Iterator[TrackInfo]:
-        print(f"[Spotify_api] Attempted to iterate tracks for {playlist_id} (legacy)")
         raise SpotifyDownAPIError(
             "Spotify's anonymous token endpoint is blocked. Use SpotifyEmbedAPI instead."
         )
@@ -1221,54 +3238,469 @@ class PlaylistClient:
         *,
         session: requests.Session | None = None,
         base_urls: Sequence[str] | None = None,  # Ignored - kept for compatibility
+        hydration_workers: int = DEFAULT_HYDRATION_WORKERS,
+        cache: ResponseCache | None = None,
+        token_manager: AccessTokenManager | None = None,
+        keep_raw: bool = False,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        track_cache_size: int = DEFAULT_TRACK_CACHE_SIZE,
+        spclient_page_size: int = DEFAULT_SPCLIENT_PAGE_SIZE,
+        pool: PoolConfig | None = None,
+        negative_cache: NegativeCache | None = None,
+        cassette: Cassette | None = None,
     ) -> None:
-        self._session = session or requests.Session()
-        print("[Spotify_api] Initialized PlaylistClient with session:", self._session)
-        self._embed_api = SpotifyEmbedAPI(session=self._session)
+        self._embed_api = SpotifyEmbedAPI(
+            session=session,
+            hydration_workers=hydration_workers,
+            cache=cache,
+            token_manager=token_manager,
+            keep_raw=keep_raw,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            track_cache_size=track_cache_size,
+            spclient_page_size=spclient_page_size,
+            pool=pool,
+            negative_cache=negative_cache,
+            cassette=cassette,
+        )
+        self._session = self._embed_api._session
+
+    @property
+    def connection_stats(self) -> ConnectionStats:
+        """Connection reuse on the session shared by all of this client's requests."""
+        return self._embed_api.connection_stats
 
     def get_playlist_metadata(self, playlist_id: str) -> PlaylistInfo:
         """Get playlist metadata."""
-        print(f"[Spotify_api] PlaylistClient: Fetching metadata for playlist {playlist_id}")
-        metadata = self._embed_api.get_playlist_metadata(playlist_id)
-        print("[Spotify_api] PlaylistClient: Retrieved metadata:", metadata)
-        return metadata
+        return self._embed_api.get_playlist_metadata(playlist_id)
+
+    def get_playlist_snapshot(self, playlist_id: str) -> PlaylistSnapshot:
+        """Get playlist metadata and embed tracks from a single page fetch."""
+        return self._embed_api.get_playlist_snapshot(playlist_id)
+
+    def iter_snapshot_tracks(
+        self, snapshot: PlaylistSnapshot, *, progress: ProgressCallback | None = None
+    ) -> Iterator[TrackInfo]:
+        """Iterate over all tracks of a snapshot without refetching the playlist."""
+        yield from self._embed_api.iter_snapshot_tracks(snapshot, progress=progress)
 
     def iter_playlist_tracks(self, playlist_id: str) -> Iterator[TrackInfo]:
         """Iterate over all playlist tracks."""
-        print(f"[Spotify_api] PlaylistClient: Iterating tracks for playlist {playlist_id}")
-        for track in self._embed_api.iter_playlist_tracks(playlist_id):
-            print(f"[Spotify_api] PlaylistClient: Yielding track {track.id} - {track.title}")
-            yield track
+        yield from self._embed_api.iter_playlist_tracks(playlist_id)
+
+    def iter_playlist_uris(
+        self, playlist_id: str, *, progress: ProgressCallback | None = None
+    ) -> Iterator[str]:
+        """Item URIs of a playlist, fetched one spclient page at a time."""
+        yield from self._embed_api.iter_playlist_uris(playlist_id, progress=progress)
+
+    def diff_playlist(self, playlist_id: str, since: PlaylistState | None = None) -> PlaylistDiff:
+        """Added and removed tracks since a previous PlaylistState."""
+        return self._embed_api.diff_playlist(playlist_id, since=since)
 
     def validate_playlist(self, playlist_id: str) -> bool:
         """Quick validation that a playlist exists."""
-        print(f"[Spotify_api] PlaylistClient: Validating playlist {playlist_id}")
-        valid = self._embed_api.validate_playlist(playlist_id)
-        print(f"[Spotify_api] PlaylistClient: Playlist validation result: {valid}")
-        return valid
+        return self._embed_api.validate_playlist(playlist_id)
 
     def get_track_download_link(self, track_id: str) -> str | None:
         """No longer available - spotifydown is dead."""
-        print(f"[Spotify_api] PlaylistClient: get_track_download_link called for {track_id}, returning None")
         return None
 
     def get_track_youtube_id(self, track_id: str) -> str | None:
         """No longer available - spotifydown is dead."""
-        print(f"[Spotify_api] PlaylistClient: get_track_youtube_id called for {track_id}, returning None")
         return None
 
     def get_track(self, track_id: str) -> TrackInfo:
         """Get metadata for a single track."""
-        print(f"[Spotify_api] PlaylistClient: Fetching track {track_id}")
-        track_info = self._embed_api.get_track(track_id)
-        print("[Spotify_api] PlaylistClient: Retrieved TrackInfo:", track_info)
+        return self._embed_api.get_track(track_id)
+
+    def get_tracks(
+        self, track_ids: Iterable[str], *, max_workers: int | None = None
+    ) -> list[TrackResult]:
+        """Metadata for many tracks, deduplicated and fetched concurrently."""
+        return self._embed_api.get_tracks(track_ids, max_workers=max_workers)
+
+
+
+
+class AsyncSpotifyEmbedAPI:
+    """asyncio counterpart of SpotifyEmbedAPI built on a pooled httpx.AsyncClient.
+
+    Page parsing is shared with the blocking client, so both return identical
+    PlaylistInfo/TrackInfo objects. Requires the optional ``httpx`` package.
+    Use as ``async with AsyncSpotifyEmbedAPI() as api: ...`` or call
+    ``aclose()`` when done.
+    """
+
+    _EMBED_PLAYLIST_URL = SpotifyEmbedAPI._EMBED_PLAYLIST_URL
+    _EMBED_TRACK_URL = SpotifyEmbedAPI._EMBED_TRACK_URL
+    _OEMBED_URL = SpotifyEmbedAPI._OEMBED_URL
+    _SPCLIENT_URL = SpotifyEmbedAPI._SPCLIENT_URL
+    _NEXT_DATA_PATTERN = SpotifyEmbedAPI._NEXT_DATA_PATTERN
+
+    # Parsing is transport-agnostic - reuse the blocking client's implementation
+    _headers = SpotifyEmbedAPI._headers
+    _check_embed_status = SpotifyEmbedAPI._check_embed_status
+    _parse_embed_page = SpotifyEmbedAPI._parse_embed_page
+    _extract_entity = SpotifyEmbedAPI._extract_entity
+    _build_snapshot = SpotifyEmbedAPI._build_snapshot
+    _remaining_track_ids = SpotifyEmbedAPI._remaining_track_ids
+    _has_remaining_tracks = SpotifyEmbedAPI._has_remaining_tracks
+    _parse_track = SpotifyEmbedAPI._parse_track
+    _parse_track_entity = SpotifyEmbedAPI._parse_track_entity
+    _stub_track = SpotifyEmbedAPI._stub_track
+    _raw = SpotifyEmbedAPI._raw
+
+    def __init__(
+        self,
+        *,
+        client: httpx.AsyncClient | None = None,
+        max_connections: int = 100,
+        hydration_workers: int = DEFAULT_HYDRATION_WORKERS,
+        token_manager: AccessTokenManager | None = None,
+        keep_raw: bool = False,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        if httpx is None:
+            raise ImportError("AsyncSpotifyEmbedAPI requires httpx: pip install httpx")
+        self._owns_client = client is None
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            )
+            client = httpx.AsyncClient(limits=limits, timeout=30, follow_redirects=True)
+        self._client = client
+        self._hydration_workers = max(1, int(hydration_workers))
+        self._tokens = token_manager or shared_token_manager()
+        self._keep_raw = keep_raw
+        self._limiter = rate_limiter or shared_rate_limiter()
+        self._retry = retry_policy or default_retry_policy()
+
+    retry_stats = SpotifyEmbedAPI.retry_stats
+
+    async def __aenter__(self) -> AsyncSpotifyEmbedAPI:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client if this instance created it."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def _limited_get(self, url: str, *, max_retries: int = 3, max_wait: float = 60.0, **kw):
+        """Async twin of rate_limited_get on the shared httpx client."""
+        host = urlsplit(url).hostname or ""
+        retries = 0
+        while True:
+            await self._limiter.acquire_async(host)
+            response = await self._client.get(url, **kw)
+            retry_after = None
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self._limiter.record(host, response.status_code, retry_after, max_penalty=max_wait)
+            wait = max(self._limiter.blocked_for(host), retry_after or 0.0)
+            if response.status_code != 429 or retries >= max_retries or wait > max_wait:
+                return response
+            deadline, cancel_event = _retry_budget.get()
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return response
+            if cancel_event is not None and cancel_event.is_set():
+                return response
+            retries += 1
+
+    async def _get_with_retry(self, url: str, **kwargs):
+        """Async twin of SpotifyEmbedAPI._get_with_retry."""
+
+        async def attempt():
+            try:
+                response = await self._limited_get(url, **kwargs)
+            except httpx.TransportError as exc:
+                raise NetworkError(f"Network error fetching {url}: {exc}") from exc
+            if response.status_code >= 500:
+                raise NetworkError(f"{url} returned HTTP {response.status_code}")
+            return response
+
+        return await self._retry.call_async(attempt)
+
+    async def _fetch_embed_data(self, url: str) -> dict:
+        """Fetch and parse __NEXT_DATA__, retrying transient errors."""
+        return await self._retry.call_async(self._fetch_embed_page, url)
+
+    async def _fetch_embed_page(self, url: str) -> dict:
+        try:
+            response = await self._limited_get(url, headers=self._headers())
+        except httpx.TransportError as exc:
+            raise NetworkError(f"Network error fetching embed page: {exc}") from exc
+        except httpx.HTTPError as exc:
+            raise SpotifyDownAPIError(f"Failed to fetch embed page: {exc}") from exc
+
+        self._check_embed_status(response.status_code, response.headers)
+        return self._parse_embed_page(response.content, url)
+
+    async def _fetch_spclient_playlist(self, playlist_id: str) -> dict | None:
+        """Async twin of SpotifyEmbedAPI._fetch_spclient_playlist."""
+        token = self._tokens.get()
+        if not token:
+            return None
+
+        try:
+            spclient_url = self._SPCLIENT_URL.format(playlist_id=playlist_id)
+            headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+            resp = await self._get_with_retry(spclient_url, headers=headers)
+            if resp.status_code != 200:
+                return None
+            return json_loads(resp.content)
+        except Exception as e:
+            logger.warning("spclient fetch failed for %s: %s", playlist_id, e)
+            return None
+
+    async def get_playlist_snapshot(self, playlist_id: str) -> PlaylistSnapshot:
+        """Fetch playlist metadata and tracks with one embed and one spclient request."""
+        url = self._EMBED_PLAYLIST_URL.format(playlist_id=playlist_id)
+        data = await self._fetch_embed_data(url)
+        entity = self._extract_entity(data)
+        spc_data = await self._fetch_spclient_playlist(playlist_id)
+        return self._build_snapshot(playlist_id, entity, spc_data)
+
+    async def get_playlist_metadata(self, playlist_id: str) -> PlaylistInfo:
+        """Get playlist metadata from the embed page."""
+        return (await self.get_playlist_snapshot(playlist_id)).info
+
+    async def iter_playlist_tracks(self, playlist_id: str) -> AsyncIterator[TrackInfo]:
+        """Iterate over playlist tracks with fallback for large playlists."""
+        snapshot = await self.get_playlist_snapshot(playlist_id)
+        async for track in self.iter_snapshot_tracks(snapshot):
+            yield track
+
+    async def iter_snapshot_tracks(self, snapshot: PlaylistSnapshot) -> AsyncIterator[TrackInfo]:
+        """Iterate over all tracks of a snapshot, hydrating the remainder concurrently."""
+        for track in snapshot.tracks:
+            yield track
+
+        try:
+            remaining = self._remaining_track_ids(snapshot)
+        except Exception as e:
+            logger.warning("spclient fallback failed: %s", e)
+            return
+
+        async for track in self._hydrate_tracks(remaining):
+            yield track
+
+    async def _hydrate_tracks(self, track_ids: Iterable[str]) -> AsyncIterator[TrackInfo]:
+        """Fetch track embeds concurrently, yielding in input order.
+
+        Mirrors SpotifyEmbedAPI._hydrate_tracks: at most ``hydration_workers``
+        fetches in flight, stubs for failed fetches, unavailable tracks skipped.
+        """
+        pending: deque[tuple[str, asyncio.Task]] = deque()
+        try:
+            for track_id in track_ids:
+                task = asyncio.ensure_future(self._fetch_track_metadata(track_id))
+                pending.append((track_id, task))
+                if len(pending) < self._hydration_workers:
+                    continue
+                track_info = await self._hydration_result(*pending.popleft())
+                if track_info:
+                    yield track_info
+
+            while pending:
+                track_info = await self._hydration_result(*pending.popleft())
+                if track_info:
+                    yield track_info
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def _hydration_result(self, track_id: str, task: asyncio.Task) -> TrackInfo | None:
+        try:
+            return await task
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Failed to fetch track %s, yielding stub: %s", track_id, e)
+            return self._stub_track(track_id)
+
+    async def _fetch_track_metadata(self, track_id: str) -> TrackInfo | None:
+        """Fetch metadata for a single track from its embed page."""
+        url = self._EMBED_TRACK_URL.format(track_id=track_id)
+        try:
+            data = await self._fetch_embed_data(url)
+            entity = self._extract_entity(data)
+        except SpotifyDownAPIError as e:
+            logger.info("Embed page unavailable for track %s: %s", track_id, e)
+            return None
+        return self._parse_track_entity(entity, track_id)
+
+    async def validate_playlist(self, playlist_id: str) -> bool:
+        """Quick validation using oEmbed API (no full data fetch)."""
+        try:
+            params = {"url": f"https://open.spotify.com/playlist/{playlist_id}"}
+            resp = await self._get_with_retry(self._OEMBED_URL, params=params, timeout=10)
+            return resp.status_code == 200
+        except Exception as e:
+            logger.info("Playlist validation failed for %s: %s", playlist_id, e)
+            return False
+
+    async def get_track(self, track_id: str) -> TrackInfo:
+        """Get metadata for a single track."""
+        track_info = await self._fetch_track_metadata(track_id)
+        if track_info is None:
+            raise SpotifyDownAPIError(f"Could not fetch track {track_id}")
         return track_info
 
 
+class AsyncPlaylistClient:
+    """asyncio counterpart of PlaylistClient."""
+
+    def __init__(
+        self,
+        *,
+        client: httpx.AsyncClient | None = None,
+        max_connections: int = 100,
+        hydration_workers: int = DEFAULT_HYDRATION_WORKERS,
+        token_manager: AccessTokenManager | None = None,
+        keep_raw: bool = False,
+    ) -> None:
+        self._embed_api = AsyncSpotifyEmbedAPI(
+            client=client,
+            max_connections=max_connections,
+            hydration_workers=hydration_workers,
+            token_manager=token_manager,
+            keep_raw=keep_raw,
+        )
+
+    async def __aenter__(self) -> AsyncPlaylistClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._embed_api.aclose()
+
+    async def get_playlist_metadata(self, playlist_id: str) -> PlaylistInfo:
+        """Get playlist metadata."""
+        return await self._embed_api.get_playlist_metadata(playlist_id)
+
+    async def get_playlist_snapshot(self, playlist_id: str) -> PlaylistSnapshot:
+        """Get playlist metadata and embed tracks from a single page fetch."""
+        return await self._embed_api.get_playlist_snapshot(playlist_id)
+
+    async def iter_snapshot_tracks(self, snapshot: PlaylistSnapshot) -> AsyncIterator[TrackInfo]:
+        """Iterate over all tracks of a snapshot without refetching the playlist."""
+        async for track in self._embed_api.iter_snapshot_tracks(snapshot):
+            yield track
+
+    async def iter_playlist_tracks(self, playlist_id: str) -> AsyncIterator[TrackInfo]:
+        """Iterate over all playlist tracks."""
+        async for track in self._embed_api.iter_playlist_tracks(playlist_id):
+            yield track
+
+    async def validate_playlist(self, playlist_id: str) -> bool:
+        """Quick validation that a playlist exists."""
+        return await self._embed_api.validate_playlist(playlist_id)
+
+    async def get_track(self, track_id: str) -> TrackInfo:
+        """Get metadata for a single track."""
+        return await self._embed_api.get_track(track_id)
 
 
 # Utility functions shared across desktop app and web backend
 
+# open.spotify.com links: optionally intl-xx localized, embed or legacy
+# /user/<name>/playlist/ paths, with any query string or fragment
+_SPOTIFY_URL_PATTERN = re.compile(
+    r"(?:https?://)?(?:open|play)\.spotify\.com/"
+    r"(?:intl-[A-Za-z]{2}(?:-[A-Za-z]{2})?/)?(?:embed/)?(?:user/[^/?#]+/)?"
+    r"(playlist|track)/([A-Za-z0-9]+)(?:[/?#].*)?"
+)
+# spotify:<kind>:<id> URIs, including spotify:user:<name>:playlist:<id>
+_SPOTIFY_URI_PATTERN = re.compile(r"spotify:(?:user:[^:]+:)?(playlist|track):([A-Za-z0-9]+)")
+# A bare Spotify ID (base62, 22 characters)
+_SPOTIFY_ID_PATTERN = re.compile(r"[A-Za-z0-9]{22}")
+
+
+class SpotifyRef(NamedTuple):
+    """A playlist or track reference in canonical form; unpacks as (kind, id)."""
+
+    kind: str
+    id: str
+
+    @property
+    def uri(self) -> str:
+        return f"spotify:{self.kind}:{self.id}"
+
+    @property
+    def url(self) -> str:
+        return f"https://open.spotify.com/{self.kind}/{self.id}"
+
+
+def parse_spotify_ref(text: str, *, default_kind: str | None = None) -> SpotifyRef | None:
+    """Parse one Spotify URL or URI; None if it isn't a playlist or track.
+
+    With ``default_kind`` a bare 22-character ID is accepted as that kind.
+    """
+    text = text.strip()
+    pattern = _SPOTIFY_URI_PATTERN if text.startswith("spotify:") else _SPOTIFY_URL_PATTERN
+    match = pattern.fullmatch(text)
+    if match:
+        return SpotifyRef(*match.groups())
+    if default_kind and _SPOTIFY_ID_PATTERN.fullmatch(text):
+        return SpotifyRef(default_kind, text)
+    return None
+
+
+@dataclass
+class SpotifyRefBatch:
+    """Result of normalize_spotify_refs: unique references plus what was rejected."""
+
+    refs: list[SpotifyRef]
+    invalid: list[str]
+    duplicates: int = 0
+
+    def ids(self, kind: str) -> list[str]:
+        return [ref.id for ref in self.refs if ref.kind == kind]
+
+    @property
+    def track_ids(self) -> list[str]:
+        """Track IDs in first-seen order, ready for get_tracks."""
+        return self.ids("track")
+
+    @property
+    def playlist_ids(self) -> list[str]:
+        return self.ids("playlist")
+
+
+def normalize_spotify_refs(
+    lines: Iterable[str], *, default_kind: str | None = None
+) -> SpotifyRefBatch:
+    """Parse, canonicalize and deduplicate references from lines of text.
+
+    Each line may hold several references separated by whitespace or commas;
+    blank lines and ``#`` comments are skipped. Works in one pass over any
+    iterable of lines, so a file object or ``sys.stdin`` can be passed as is.
+    """
+    seen: dict[SpotifyRef, None] = {}
+    invalid: list[str] = []
+    duplicates = 0
+    for line in lines:
+        for token in line.replace(",", " ").split():
+            if token.startswith("#"):
+                break  # Rest of the line is a comment
+            ref = parse_spotify_ref(token, default_kind=default_kind)
+            if ref is None:
+                invalid.append(token)
+            elif ref in seen:
+                duplicates += 1
+            else:
+                seen[ref] = None
+    return SpotifyRefBatch(list(seen), invalid, duplicates)
+
 
 # def extract_playlist_id(url: str) -> str:
 #     """Extract playlist ID from a Spotify URL.
@@ -1290,18 +3722,11 @@ class PlaylistClient:
 
 
 def extract_playlist_id(url: str) -> str:
-    """Extract playlist ID from a Spotify URL."""
-    print(f"[Spotify_api] Extracting playlist ID from URL: {url}")
-
-    pattern = r"https://open\.spotify\.com/playlist/([a-zA-Z0-9]+)"
-    match = re.match(pattern, url)
-    if not match:
-        print("[Spotify_api] URL did not match Spotify playlist pattern, raising ValueError")
+    """Extract playlist ID from a Spotify URL or URI."""
+    ref = parse_spotify_ref(url)
+    if ref is None or ref.kind != "playlist":
         raise ValueError("Invalid Spotify playlist URL.")
-
-    playlist_id = match.group(1)
-    print(f"[Spotify_api] Extracted playlist ID: {playlist_id}")
-    return playlist_id
+    return ref.id
 
 
 
@@ -1329,18 +3754,11 @@ def extract_playlist_id(url: str) -> str:
 
 
 def extract_track_id(url: str) -> str:
-    """Extract track ID from a Spotify URL."""
-    print(f"[Spotify_api] Extracting track ID from URL: {url}")
-
-    pattern = r"https://open\.spotify\.com/track/([a-zA-Z0-9]+)"
-    match = re.match(pattern, url)
-    if not match:
-        print("[Spotify_api] URL did not match Spotify track pattern, raising ValueError")
+    """Extract track ID from a Spotify URL or URI."""
+    ref = parse_spotify_ref(url)
+    if ref is None or ref.kind != "track":
         raise ValueError("Invalid Spotify track URL.")
-
-    track_id = match.group(1)
-    print(f"[Spotify_api] Extracted track ID: {track_id}")
-    return track_id
+    return ref.id
 
 
 
@@ -1374,27 +3792,11 @@ def extract_track_id(url: str) -> str:
 
 
 def detect_spotify_url_type(url: str) -> tuple[str, str]:
-    """Detect the type of Spotify URL and extract the ID."""
-    print(f"[Spotify_api] Detecting Spotify URL type for: {url}")
-
-    # Try playlist first
-    playlist_pattern = r"https://open\.spotify\.com/playlist/([a-zA-Z0-9]+)"
-    match = re.match(playlist_pattern, url)
-    if match:
-        playlist_id = match.group(1)
-        print(f"[Spotify_api] Detected playlist URL, ID: {playlist_id}")
-        return ("playlist", playlist_id)
-
-    # Try track
-    track_pattern = r"https://open\.spotify\.com/track/([a-zA-Z0-9]+)"
-    match = re.match(track_pattern, url)
-    if match:
-        track_id = match.group(1)
-        print(f"[Spotify_api] Detected track URL, ID: {track_id}")
-        return ("track", track_id)
-
-    print("[Spotify_api] URL did not match track or playlist patterns, raising ValueError")
-    raise ValueError("Invalid Spotify URL. Must be a track or playlist URL.")
+    """Detect the type of Spotify URL or URI and extract the ID."""
+    ref = parse_spotify_ref(url)
+    if ref is None:
+        raise ValueError("Invalid Spotify URL. Must be a track or playlist URL.")
+    return (ref.kind, ref.id)
 
 
 
@@ -1421,41 +3823,83 @@ def detect_spotify_url_type(url: str) -> tuple[str, str]:
 
 def sanitize_filename(name: str, allow_spaces: bool = True) -> str:
     """Sanitize a string for use as a filename."""
-    print(f"[Spotify_api] Sanitizing filename: '{name}', allow_spaces={allow_spaces}")
-
     valid_chars = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.")
     if allow_spaces:
         valid_chars.add(" ")
 
     sanitized = "".join(c for c in name if c in valid_chars)
-    print(f"[Spotify_api] After filtering invalid characters: '{sanitized}'")
-
     # Collapse multiple spaces and strip
     sanitized = " ".join(sanitized.split())
-    print(f"[Spotify_api] After collapsing spaces: '{sanitized}'")
-
-    sanitized = sanitized or "Unknown"
-    print(f"[Spotify_api] Final sanitized filename: '{sanitized}'")
-
-    return sanitized
+    return sanitized or "Unknown"
 
 
 
 
 
 __all__ = [
+    "AccessTokenManager",
+    "AsyncPlaylistClient",
+    "AsyncSpotifyEmbedAPI",
+    "CASSETTE_MODES",
+    "CachedResponse",
+    "Cassette",
+    "CassetteMissError",
+    "ConnectionStats",
+    "DEFAULT_CACHE_TTLS",
+    "DEFAULT_HYDRATION_WORKERS",
+    "DEFAULT_NEGATIVE_TTLS",
+    "DEFAULT_POOL_MAXSIZE",
+    "DEFAULT_SPCLIENT_PAGE_SIZE",
+    "DEFAULT_TRACK_CACHE_SIZE",
     "ExtractionError",
+    "JSON_BACKEND",
+    "LOG_NAMESPACE",
+    "NO_RAW",
+    "NegativeCache",
+    "NegativeEntry",
     "NetworkError",
     "PlaylistClient",
+    "PlaylistDiff",
     "PlaylistInfo",
+    "PlaylistSnapshot",
+    "PlaylistState",
+    "PoolConfig",
     "RateLimitError",
+    "RateLimiter",
+    "RETRYABLE_ERRORS",
+    "RetryPolicy",
+    "RetryStats",
+    "ResponseCache",
+    "SQLiteResponseCache",
     "SpotifyDownAPI",
     "SpotifyDownAPIError",
     "SpotifyEmbedAPI",
     "SpotifyPublicAPI",
+    "SpotifyRef",
+    "SpotifyRefBatch",
+    "TOKEN_EXPIRY_MARGIN",
+    "TOKEN_REFRESH_LEAD",
     "TrackInfo",
+    "TrackResult",
+    "TrackTable",
+    "build_session",
+    "configure_logging",
+    "connection_stats",
+    "default_cache_dir",
+    "default_retry_policy",
     "detect_spotify_url_type",
     "extract_playlist_id",
     "extract_track_id",
+    "get_with_retry",
+    "json_dumps",
+    "json_loads",
+    "negative_kind",
+    "normalize_spotify_refs",
+    "parse_spotify_ref",
+    "parse_retry_after",
+    "rate_limited_get",
     "sanitize_filename",
+    "shared_rate_limiter",
+    "shared_session",
+    "shared_token_manager",
 ]
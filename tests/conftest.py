@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-import pytest  # noqa: F401
+import json
+
+import pytest
 
 # Sample Spotify embed page HTML with __NEXT_DATA__
 SAMPLE_EMBED_HTML = """
@@ -128,6 +130,42 @@ SAMPLE_TRACK_META = {
 }
 
 
+# Playlist sizes for the parser benchmarks (scripts/benchmark_parsers.py)
+BENCHMARK_SIZES = (100, 1_000, 10_000)
+
+
+def synthetic_track_items(n_tracks: int) -> list[dict]:
+    """Embed trackList items shaped like the sample page's, with repeating artists/albums."""
+    return [
+        {
+            "uri": f"spotify:track:{i:022d}",
+            "title": f"Song {i} (feat. Artista Ñoño) [Remastered]",
+            "subtitle": f"Artist {i % 150}, Guest {i % 37}",
+            "duration": 180000 + i,
+            "audioPreview": {"url": f"https://p.scdn.co/mp3-preview/{i:040x}"},
+            "album": {"name": f"Album {i % 400}"},
+        }
+        for i in range(n_tracks)
+    ]
+
+
+def synthetic_embed_html(n_tracks: int) -> str:
+    """SAMPLE_EMBED_HTML with an ``n_tracks``-long trackList."""
+    start = SAMPLE_EMBED_HTML.index("{")
+    end = SAMPLE_EMBED_HTML.index("</script>")
+    data = json.loads(SAMPLE_EMBED_HTML[start:end])
+    data["props"]["pageProps"]["state"]["data"]["entity"]["trackList"] = synthetic_track_items(
+        n_tracks
+    )
+    return f"{SAMPLE_EMBED_HTML[:start]}{json.dumps(data)}\n{SAMPLE_EMBED_HTML[end:]}"
+
+
+def synthetic_spclient_response(n_tracks: int) -> dict:
+    """SAMPLE_SPCLIENT_RESPONSE listing ``n_tracks`` track URIs."""
+    items = [{"uri": f"spotify:track:{i:022d}"} for i in range(n_tracks)]
+    return {"length": n_tracks, "contents": {"items": items}}
+
+
 @pytest.fixture
 def sample_embed_html():
     """Return sample Spotify embed HTML."""
@@ -156,3 +194,15 @@ def sample_track_meta():
 def mock_session(mocker):
     """Create a mock requests session."""
     return mocker.MagicMock()
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    """Keep tokens and rate-limit state from one test leaking into the next."""
+    from spotifydown_api import shared_rate_limiter, shared_token_manager
+
+    shared_token_manager().clear()
+    shared_rate_limiter().reset()
+    yield
+    shared_token_manager().clear()
+    shared_rate_limiter().reset()
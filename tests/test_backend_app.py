@@ -6,10 +6,12 @@ from __future__ import annotations
 import importlib.util
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 
+from spotifydown_api import TrackInfo
+
 FLASK_AVAILABLE = importlib.util.find_spec("flask") is not None
 
 # Add backend directory for imports
@@ -57,6 +59,21 @@ class TestHealthEndpoint:
         data = response.get_json()
         assert data["status"] == "ok"
         assert data["mode"] == "metadata-only"
+        assert set(data["connections"]) == {"requests", "newConnections", "reusedConnections"}
+
+
+class TestJSONProvider:
+    """Tests for the fast JSON response provider."""
+
+    def test_unicode_track_list_round_trips(self, app):
+        """Compact output from the fast backend parses back unchanged."""
+        payload = {"tracks": [{"title": "Café ☕", "artists": "Beyoncé"}] * 3}
+        with app.app_context():
+            response = app.json.response(payload)
+
+        assert response.mimetype == "application/json"
+        assert response.get_data().endswith(b"\n")
+        assert response.get_json() == payload
 
 
 class TestRootEndpoint:
@@ -106,6 +123,24 @@ class TestScrapePlaylistEndpoint:
         data = response.get_json()
         assert data["event"] == "error"
 
+    @patch("app.get_playlist_client")
+    def test_spotify_uri_accepted(self, mock_get_client, client):
+        """spotify: URIs are accepted like open.spotify.com links."""
+        mock_client = MagicMock()
+        mock_client.get_track.return_value = TrackInfo(
+            "4iV5W9uYEdYUVa79Axb7Rh", "Song", "Artist", None, None, None, None, None, {}
+        )
+        mock_get_client.return_value = mock_client
+
+        response = client.post(
+            "/api/scrape-playlist",
+            json={"playlistUrl": "spotify:track:4iV5W9uYEdYUVa79Axb7Rh"},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        mock_client.get_track.assert_called_once_with("4iV5W9uYEdYUVa79Axb7Rh")
+
     @patch("app.get_playlist_client")
     def test_valid_playlist_url(self, mock_get_client, client):
         """Valid playlist URL should return track data."""
@@ -118,17 +153,23 @@ class TestScrapePlaylistEndpoint:
         mock_metadata.name = "Test Playlist"
         mock_metadata.owner = "Test User"
         mock_metadata.cover_url = "https://example.com/cover.jpg"
-        mock_client.get_playlist_metadata.return_value = mock_metadata
+        mock_snapshot = MagicMock()
+        mock_snapshot.info = mock_metadata
+        mock_client.get_playlist_snapshot.return_value = mock_snapshot
 
         # Mock track iteration
-        mock_track = MagicMock()
-        mock_track.spotify_id = "abc123"
-        mock_track.title = "Test Song"
-        mock_track.artists = "Test Artist"
-        mock_track.album = "Test Album"
-        mock_track.cover_url = None
-        mock_track.release_date = "2024-01-01"
-        mock_client.iter_playlist_tracks.return_value = [mock_track]
+        track = TrackInfo(
+            id="abc123",
+            title="Test Song",
+            artists="Test Artist",
+            album="Test Album",
+            release_date="2024-01-01",
+            cover_url=None,
+            duration_ms=None,
+            preview_url=None,
+            raw={},
+        )
+        mock_client.iter_snapshot_tracks.return_value = [track]
 
         response = client.post(
             "/api/scrape-playlist",
@@ -142,13 +183,47 @@ class TestScrapePlaylistEndpoint:
         assert data["data"]["playlistName"] == "Test Playlist - Test User"
         assert len(data["data"]["tracks"]) == 1
         assert data["data"]["tracks"][0]["title"] == "Test Song"
+        assert data["data"]["tracks"][0]["cover"] == "https://example.com/cover.jpg"
+        mock_client.get_playlist_snapshot.assert_called_once_with("abc123")
+        mock_client.iter_snapshot_tracks.assert_called_once_with(mock_snapshot, progress=ANY)
 
-    @patch("app.SpotifyEmbedAPI")
-    def test_valid_track_url(self, mock_api_class, client):
+    @patch("app.get_playlist_client")
+    def test_large_playlist_streamed_in_chunks(self, mock_get_client, client):
+        """Big playlists are streamed chunk by chunk as one valid JSON document."""
+        import app as backend
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_metadata = MagicMock()
+        mock_metadata.name = "Big"
+        mock_metadata.owner = None
+        mock_metadata.cover_url = ""
+        mock_client.get_playlist_snapshot.return_value = MagicMock(info=mock_metadata)
+        tracks = [
+            TrackInfo(f"id{i}", f"Song {i} ☕", "Artist", None, None, None, None, None, {})
+            for i in range(backend.STREAM_CHUNK_TRACKS * 2 + 1)
+        ]
+        mock_client.iter_snapshot_tracks.return_value = tracks
+
+        response = client.post(
+            "/api/scrape-playlist",
+            json={"playlistUrl": "https://open.spotify.com/playlist/big"},
+        )
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        data = response.get_json()
+        assert data["event"] == "complete"
+        assert data["data"]["playlistName"] == "Big - Unknown"
+        assert [t["id"] for t in data["data"]["tracks"]] == [t.id for t in tracks]
+        assert data["data"]["tracks"][-1]["title"] == tracks[-1].title
+
+    @patch("app.get_playlist_client")
+    def test_valid_track_url(self, mock_get_client, client):
         """Valid track URL should return single track data."""
-        # Create mock API instance
+        # Tracks go through the shared client (and its shared token)
         mock_api = MagicMock()
-        mock_api_class.return_value = mock_api
+        mock_get_client.return_value = mock_api
 
         # Mock track data
         mock_track = MagicMock()
@@ -171,6 +246,7 @@ class TestScrapePlaylistEndpoint:
         assert data["event"] == "complete"
         assert len(data["data"]["tracks"]) == 1
         assert data["data"]["tracks"][0]["title"] == "Single Track"
+        mock_api.get_track.assert_called_once_with("xyz789")
 
 
 class TestCORS:
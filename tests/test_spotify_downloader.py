@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 import os
+import struct
 import sys
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 
 class TestGetFfmpegPath:
     """Tests for get_ffmpeg_path function."""
@@ -109,6 +112,153 @@ class TestGetFfmpegPath:
             assert result is None
 
 
+def _opus_file(path):
+    """Smallest Ogg Opus stream mutagen will tag: header, comments, one packet."""
+    from mutagen.ogg import OggPage
+
+    pages = [OggPage(), OggPage(), OggPage()]
+    pages[0].first = pages[2].last = True
+    pages[0].packets = [b"OpusHead" + struct.pack("<BBHIhB", 1, 2, 312, 48000, 0, 0)]
+    pages[1].packets = [b"OpusTags" + struct.pack("<II", 0, 0)]
+    pages[2].packets = [b"\xfc\xff\xfe"]
+    pages[2].position = 960
+    for sequence, page in enumerate(pages):
+        page.serial, page.sequence = 1, sequence
+    path.write_bytes(b"".join(page.write() for page in pages))
+
+
+def _m4a_file(path):
+    """Smallest M4A mutagen will tag: ftyp plus a moov holding only mvhd."""
+
+    def atom(name, body):
+        return struct.pack(">I", 8 + len(body)) + name + body
+
+    mvhd = atom(b"mvhd", bytes(12) + struct.pack(">II", 1000, 0) + bytes(80))
+    path.write_bytes(atom(b"ftyp", b"M4A \0\0\0\0M4A isom") + atom(b"moov", mvhd))
+
+
+class TestOutputFormats:
+    """Tests for output profiles, transcoding and per-container tagging."""
+
+    def test_transcode_copies_native_streams(self, tmp_path):
+        """Streams whose codec the profile keeps are remuxed; the rest are re-encoded."""
+        from Spotify_Downloader import OUTPUT_PROFILES, transcode_audio
+
+        commands = []
+
+        def fake_run(command, **kwargs):
+            commands.append(command)
+            open(command[-1], "wb").close()
+
+        destination = str(tmp_path / "song.m4a")
+        with patch("Spotify_Downloader.subprocess.run", side_effect=fake_run):
+            for source, codec, profile in [
+                ("a.m4a", "mp4a.40.2", "m4a"),
+                ("a.webm", "opus", "m4a"),
+                ("a.webm", "opus", "opus"),
+                ("a.webm", "vorbis", "opus"),  # webm, but not Opus: re-encode
+                ("a.webm", None, "opus"),  # codec unknown: re-encode
+            ]:
+                transcode_audio(
+                    source, destination, "/usr/bin", OUTPUT_PROFILES[profile], codec=codec
+                )
+
+        codecs = [c[c.index("-codec:a") + 1] for c in commands]
+        muxers = [c[c.index("-f") + 1] for c in commands]
+        assert codecs == ["copy", "aac", "copy", "libopus", "libopus"]
+        assert muxers == ["ipod", "ipod", "opus", "opus", "opus"]
+        assert os.path.exists(destination)
+        assert not os.path.exists(destination + ".part")
+
+    def test_transcode_threads_and_priority(self, tmp_path):
+        """ffmpeg gets the per-job thread count and runs under nice when asked."""
+        from Spotify_Downloader import OUTPUT_PROFILES, transcode_audio
+
+        commands = []
+
+        def fake_run(command, **kwargs):
+            commands.append(command)
+            open(command[-1], "wb").close()
+
+        destination = str(tmp_path / "song.mp3")
+        with (
+            patch("Spotify_Downloader.subprocess.run", side_effect=fake_run),
+            patch("Spotify_Downloader.sys.platform", "linux"),
+            patch("Spotify_Downloader.shutil.which", return_value="/usr/bin/nice"),
+        ):
+            transcode_audio("a.webm", destination, "/usr/bin", OUTPUT_PROFILES["mp3"], threads=2)
+            transcode_audio("a.webm", destination, "/usr/bin", threads=1, niceness=10)
+
+        assert commands[0][0] == "/usr/bin/ffmpeg"
+        assert commands[0][commands[0].index("-threads") + 1] == "2"
+        assert commands[1][:3] == ["/usr/bin/nice", "-n", "10"]
+
+    def test_transcode_workers_fill_cpus(self):
+        """The transcode stage is sized to the CPUs divided by ffmpeg threads per job."""
+        from Spotify_Downloader import MusicScraper, default_transcode_workers
+
+        with (
+            patch("Spotify_Downloader.available_cpus", return_value=16),
+            patch.dict(os.environ, {}, clear=False),
+        ):
+            os.environ.pop("SUNNIFY_TRANSCODE_WORKERS", None)
+            os.environ.pop("SUNNIFY_TRANSCODE_THREADS", None)
+            assert default_transcode_workers() == 16
+            assert default_transcode_workers(4) == 4
+            assert default_transcode_workers(32) == 1
+            assert MusicScraper(transcode_threads=2).stage_workers["transcode"] == 8
+
+            os.environ["SUNNIFY_TRANSCODE_WORKERS"] = "3"
+            assert MusicScraper().stage_workers["transcode"] == 3
+
+    @pytest.mark.parametrize("extension", ["mp3", "m4a", "opus"])
+    def test_write_audio_tags(self, tmp_path, extension):
+        """Tags and cover land in the container's own tag format."""
+        from mutagen.easyid3 import EasyID3
+        from mutagen.id3 import ID3
+        from mutagen.mp4 import MP4
+        from mutagen.oggopus import OggOpus
+
+        from Spotify_Downloader import write_audio_tags
+
+        path = tmp_path / f"song.{extension}"
+        if extension == "m4a":
+            _m4a_file(path)
+        elif extension == "opus":
+            _opus_file(path)
+        else:
+            path.touch()
+
+        tags = {"title": "Song", "artists": "Artist", "album": "Album", "releaseDate": "2020"}
+        write_audio_tags(str(path), tags)
+        write_audio_tags(str(path), None, b"\xff\xd8cover")
+
+        if extension == "m4a":
+            audio = MP4(str(path))
+            assert audio.tags["\xa9nam"] == ["Song"]
+            assert audio.tags["\xa9ART"] == ["Artist"]
+            assert bytes(audio.tags["covr"][0]) == b"\xff\xd8cover"
+        elif extension == "opus":
+            audio = OggOpus(str(path))
+            assert audio["title"] == ["Song"]
+            assert audio["album"] == ["Album"]
+            assert "metadata_block_picture" in audio
+        else:
+            assert EasyID3(str(path))["title"] == ["Song"]
+            assert ID3(str(path))["APIC:Cover"].data == b"\xff\xd8cover"
+
+    def test_unknown_formats_rejected(self, tmp_path):
+        """Unsupported containers and output formats raise ValueError; the env var selects one."""
+        from Spotify_Downloader import MusicScraper, write_audio_tags
+
+        with pytest.raises(ValueError):
+            write_audio_tags(str(tmp_path / "song.wav"), {})
+        with pytest.raises(ValueError):
+            MusicScraper(output_format="flac")
+        with patch.dict(os.environ, {"SUNNIFY_OUTPUT_FORMAT": "opus"}):
+            assert MusicScraper().output_profile.extension == "opus"
+
+
 class TestMusicScraper:
     """Tests for MusicScraper class."""
 
@@ -193,6 +343,351 @@ class TestMusicScraper:
         assert scraper.counter == 1
         scraper.count_updated.emit.assert_called_once_with(1)
 
+    def test_download_retries_transient_ytdlp_errors(self, tmp_path):
+        """A transient yt-dlp failure is retried; a missing video is not."""
+        from yt_dlp.utils import DownloadError
+
+        from Spotify_Downloader import MusicScraper
+
+        scraper = MusicScraper()
+        scraper._retry.base_delay = 0
+        target = str(tmp_path / "song.mp3")
+        attempts = [DownloadError("HTTP Error 503: Service Unavailable"), target]
+
+        def fake_run(*args):
+            result = attempts.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with (
+            patch("Spotify_Downloader.get_ffmpeg_path", return_value="/usr/bin"),
+            patch.object(scraper, "_run_ytdlp", side_effect=fake_run) as run,
+        ):
+            assert scraper.download_track_audio("ytsearch1:x", target) == target
+            assert run.call_count == 2
+
+            run.side_effect = DownloadError("Video unavailable")
+            run.reset_mock()
+            with pytest.raises(DownloadError):
+                scraper.download_track_audio("ytsearch1:x", target)
+            assert run.call_count == 1
+
+    def test_negative_cache_skips_tracks_without_audio(self):
+        """Empty searches and unavailable videos are remembered and skipped; other errors are not."""
+        from yt_dlp.utils import DownloadError
+
+        from Spotify_Downloader import MusicScraper
+        from spotifydown_api import NegativeCache
+
+        scraper = MusicScraper()
+        scraper.error_signal = MagicMock()
+        scraper.negative_cache = NegativeCache(":memory:")
+
+        for error in (
+            DownloadError("HTTP Error 503: Service Unavailable"),
+            DownloadError("HTTP Error 403: Forbidden"),
+            DownloadError("Sign in to confirm you're not a bot"),
+            DownloadError("The uploader has not made this video available in your country"),
+            RuntimeError("FFmpeg not found"),
+        ):
+            scraper._remember_no_audio("t1", error)
+        assert not scraper._skip_known_dead("t1", "Song")
+
+        scraper._remember_no_audio("t1", DownloadError("Video unavailable"))
+        scraper._remember_no_audio("t2", DownloadError("No YouTube results for 'x'"))
+        assert scraper._skip_known_dead("t1", "Song")
+        assert scraper._skip_known_dead("t2", "Other")
+        # Reported when the track's turn comes, not when it is listed
+        assert scraper._failed_tracks == []
+        scraper.error_signal.emit.assert_not_called()
+
+    def test_known_dead_tracks_reported_in_playlist_order(self, tmp_path):
+        """A skipped track is reported after the slower tracks listed before it."""
+        import time
+
+        from yt_dlp.utils import DownloadError
+
+        from Spotify_Downloader import MusicScraper
+        from spotifydown_api import NegativeCache, TrackInfo
+
+        scraper = MusicScraper(download_workers=2)
+        scraper.error_signal = MagicMock()
+        scraper.negative_cache = NegativeCache(":memory:")
+        scraper._remember_no_audio("t1", DownloadError("Video unavailable"))
+        tracks = [
+            TrackInfo(f"t{i}", f"Song {i}", "A", None, None, None, None, None, {}) for i in range(2)
+        ]
+
+        def slow_search(query):
+            time.sleep(0.1)
+            raise DownloadError("Video unavailable")
+
+        with (
+            patch("Spotify_Downloader.get_ffmpeg_path", return_value="/usr/bin"),
+            patch.object(scraper, "resolve_track_audio", side_effect=slow_search),
+        ):
+            assert scraper._download_tracks(iter(tracks), str(tmp_path), None)
+
+        assert scraper._failed_tracks == ["Song 0", "Song 1"]
+        messages = [c.args[0] for c in scraper.error_signal.emit.call_args_list]
+        assert "skipped" in messages[1]
+
+    def test_ffmpeg_probed_once(self):
+        """The ffmpeg lookup runs once per scraper; a miss is retried next time."""
+        from Spotify_Downloader import MusicScraper
+
+        scraper = MusicScraper()
+        with patch("Spotify_Downloader.get_ffmpeg_path", side_effect=[None, "/usr/bin"]) as probe:
+            with pytest.raises(RuntimeError, match="FFmpeg not found"):
+                scraper._require_ffmpeg()
+            assert scraper._require_ffmpeg() == "/usr/bin"
+            assert scraper._require_ffmpeg() == "/usr/bin"
+        assert probe.call_count == 2
+
+    def test_parallel_downloads_report_in_playlist_order(self, tmp_path):
+        """Tracks download concurrently but signal and count in playlist order."""
+        import threading
+        import time
+
+        from yt_dlp.utils import DownloadError
+
+        from Spotify_Downloader import MusicScraper
+        from spotifydown_api import TrackInfo
+
+        scraper = MusicScraper(download_workers=4)
+        for name in ("song_meta", "add_song_meta", "error_signal", "count_updated"):
+            setattr(scraper, name, MagicMock())
+        tracks = [
+            TrackInfo(f"t{i}", f"Song {i}", "A", None, None, None, None, None, {}) for i in range(8)
+        ]
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fake_fetch(video_url, base):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            # Later tracks finish first
+            time.sleep(0.05 * (8 - int(video_url.rsplit("=", 1)[1])) / 8)
+            with lock:
+                active[0] -= 1
+            if video_url.endswith("=3"):
+                raise DownloadError("Video unavailable")
+            open(base + ".webm", "wb").close()
+            return base + ".webm", "opus"
+
+        def fake_transcode(source, destination, ffmpeg_dir, profile, **kwargs):
+            open(destination, "wb").close()
+            return destination
+
+        with (
+            patch("Spotify_Downloader.get_ffmpeg_path", return_value="/usr/bin"),
+            patch("Spotify_Downloader.transcode_audio", side_effect=fake_transcode),
+            patch.object(
+                scraper,
+                "resolve_track_audio",
+                side_effect=lambda q: f"https://youtu.be/?v={q.split()[1]}",
+            ),
+            patch.object(scraper, "fetch_track_audio", side_effect=fake_fetch),
+        ):
+            assert scraper._download_tracks(iter(tracks), str(tmp_path), None)
+
+        started = [c.args[0]["title"] for c in scraper.song_meta.emit.call_args_list]
+        added = [c.args[0]["title"] for c in scraper.add_song_meta.emit.call_args_list]
+        assert started == [t.title for t in tracks]
+        assert added == [t.title for t in tracks if t.title != "Song 3"]
+        assert scraper._failed_tracks == ["Song 3"]
+        assert scraper.counter == 7
+        assert peak[0] > 1
+        # Sources are removed once transcoded
+        assert sorted(os.listdir(tmp_path)) == sorted(
+            f"{t.title} - A.mp3" for t in tracks if t.title != "Song 3"
+        )
+
+    def test_cancel_stops_parallel_downloads(self, tmp_path):
+        """Setting the cancel event stops queueing and reporting tracks."""
+        import threading
+
+        from Spotify_Downloader import MusicScraper
+        from spotifydown_api import TrackInfo
+
+        cancel = threading.Event()
+        scraper = MusicScraper(cancel_event=cancel, download_workers=2)
+        scraper.add_song_meta = MagicMock()
+        tracks = (
+            TrackInfo(f"t{i}", f"Song {i}", "A", None, None, None, None, None, {})
+            for i in range(50)
+        )
+
+        def fake_resolve(query):
+            cancel.set()
+            return "https://youtu.be/x"
+
+        with (
+            patch("Spotify_Downloader.get_ffmpeg_path", return_value="/usr/bin"),
+            patch.object(scraper, "resolve_track_audio", side_effect=fake_resolve) as search,
+            patch.object(scraper, "fetch_track_audio") as fetch,
+        ):
+            assert not scraper._download_tracks(tracks, str(tmp_path), None)
+
+        assert search.call_count <= 2
+        fetch.assert_not_called()
+        scraper.add_song_meta.emit.assert_not_called()
+        assert scraper._failed_tracks == []
+
+    def test_cancel_after_fetch_leaves_no_source_files(self, tmp_path):
+        """Fetched streams that never reach transcode are removed with the run."""
+        import threading
+
+        from Spotify_Downloader import MusicScraper
+        from spotifydown_api import TrackInfo
+
+        cancel = threading.Event()
+        scraper = MusicScraper(
+            cancel_event=cancel, stage_workers={"search": 2, "fetch": 2, "transcode": 1}
+        )
+        scraper.add_song_meta = MagicMock()
+        tracks = [
+            TrackInfo(f"t{i}", f"Song {i}", "A", None, None, None, None, None, {}) for i in range(4)
+        ]
+        fetched = threading.Semaphore(0)
+
+        def fake_fetch(video_url, base):
+            open(base + ".webm", "wb").close()
+            fetched.release()
+            return base + ".webm", "opus"
+
+        def fake_transcode(source, destination, ffmpeg_dir, profile, **kwargs):
+            # Cancel mid-transcode, once every other track has been fetched
+            for _ in range(3):
+                fetched.acquire(timeout=5)
+            cancel.set()
+            raise RuntimeError("ffmpeg interrupted")
+
+        with (
+            patch("Spotify_Downloader.get_ffmpeg_path", return_value="/usr/bin"),
+            patch("Spotify_Downloader.transcode_audio", side_effect=fake_transcode),
+            patch.object(scraper, "resolve_track_audio", return_value="https://youtu.be/x"),
+            patch.object(scraper, "fetch_track_audio", side_effect=fake_fetch),
+        ):
+            assert not scraper._download_tracks(iter(tracks), str(tmp_path), None)
+
+        assert list(tmp_path.rglob("*")) == []
+
+
+class TestStagedPipeline:
+    """Tests for the StagedPipeline stage runner."""
+
+    def test_bounded_in_flight_and_ordered_results(self):
+        """A slow last stage caps the jobs read ahead; results keep input order."""
+        import threading
+        import time
+
+        from Spotify_Downloader import StagedPipeline
+
+        class Job:
+            def __init__(self, n):
+                self.n = n
+                self.done = False
+                self.error = None
+
+        read = [0]
+        seen = []
+        lock = threading.Lock()
+
+        def jobs():
+            for n in range(30):
+                read[0] += 1
+                yield Job(n)
+
+        def first(job):
+            if job.n == 5:
+                raise ValueError("boom")
+
+        def slow(job):
+            with lock:
+                lead[0] = max(lead[0], read[0] - len(seen))
+            time.sleep(0.002 * (job.n % 3))
+
+        lead = [0]
+        pipeline = StagedPipeline(
+            [("first", first, 3), ("slow", slow, 2)], queue_per_worker=1, max_in_flight=6
+        )
+        assert pipeline.run(jobs(), seen.append)
+
+        assert [job.n for job in seen] == list(range(30))
+        assert isinstance(seen[5].error, ValueError)
+        assert all(job.error is None for job in seen if job.n != 5)
+        assert lead[0] <= 6
+
+    def test_cancel_stops_workers_without_run_finishing(self):
+        """Workers exit on cancel even while run() itself is stuck (e.g. terminated)."""
+        import threading
+        import time
+
+        from Spotify_Downloader import StagedPipeline
+
+        class Job:
+            done = False
+            error = None
+
+        cancel = threading.Event()
+        release = threading.Event()
+
+        def jobs():
+            yield Job()
+            cancel.set()
+            release.wait(10)  # run() blocks here, never reaching its finally
+
+        pipeline = StagedPipeline(
+            [("cancela", lambda _job: None, 3), ("cancelb", lambda _job: None, 2)],
+            cancel_event=cancel,
+        )
+        runner = threading.Thread(target=pipeline.run, args=(jobs(), lambda _job: None))
+        runner.start()
+
+        def workers():
+            return [t for t in threading.enumerate() if t.name.startswith("sunnify-cancel")]
+
+        try:
+            deadline = time.monotonic() + 5
+            while workers() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert workers() == []
+            assert runner.is_alive()
+        finally:
+            release.set()
+            runner.join(5)
+
+
+class TestYtdlpEngine:
+    """Tests for the warm YoutubeDL engine."""
+
+    def test_instances_reused_per_thread_and_profile(self, tmp_path):
+        """One instance per thread and profile, with the output template swapped per call."""
+        import threading
+
+        from Spotify_Downloader import YtdlpEngine
+
+        engine = YtdlpEngine(str(tmp_path / "cache"))
+        first = engine.get("fetch", {"quiet": True}, outtmpl=str(tmp_path / "a.%(ext)s"))
+        again = engine.get("fetch", {"quiet": True}, outtmpl=str(tmp_path / "b.%(ext)s"))
+        assert again is first
+        assert first.params["cachedir"] == str(tmp_path / "cache")
+        assert first.prepare_filename({"id": "x", "ext": "webm"}) == str(tmp_path / "b.webm")
+        assert engine.get("search", {"quiet": True}) is not first
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(engine.get("fetch", {})))
+        thread.start()
+        thread.join()
+        assert other[0] is not first
+        assert engine.created == 3
+
+        engine.close()
+        assert engine.get("fetch", {"quiet": True}) is not first
+
 
 class TestScraperThread:
     """Tests for ScraperThread class."""
@@ -2,17 +2,68 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
+import io
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import pytest
 
 from spotifydown_api import (
+    DEFAULT_POOL_MAXSIZE,
+    LOG_NAMESPACE,
+    NO_RAW,
+    AccessTokenManager,
+    AsyncSpotifyEmbedAPI,
+    Cassette,
+    CassetteMissError,
+    ConnectionStats,
+    ExtractionError,
+    NegativeCache,
+    NetworkError,
     PlaylistClient,
     PlaylistInfo,
+    PlaylistSnapshot,
+    PlaylistState,
+    PoolConfig,
+    RateLimiter,
+    RateLimitError,
+    ResponseCache,
+    RetryPolicy,
+    SpotifyDownAPIError,
     SpotifyEmbedAPI,
+    SpotifyRef,
+    SQLiteResponseCache,
     TrackInfo,
+    TrackResult,
+    TrackTable,
+    _spclient_item_uris,
+    build_session,
+    configure_logging,
+    connection_stats,
     detect_spotify_url_type,
     extract_playlist_id,
     extract_track_id,
+    get_with_retry,
+    json_dumps,
+    json_loads,
+    negative_kind,
+    normalize_spotify_refs,
+    parse_retry_after,
+    parse_spotify_ref,
+    rate_limited_get,
     sanitize_filename,
+    shared_session,
+    shared_token_manager,
+)
+from tests.conftest import (
+    SAMPLE_EMBED_HTML,
+    synthetic_embed_html,
+    synthetic_spclient_response,
 )
 
 
@@ -135,6 +186,71 @@ class TestSanitizeFilename:
         assert result == "A" * 300
 
 
+class TestSpotifyRefParsing:
+    """Tests for the precompiled URL/URI parser and batch normalization."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "https://open.spotify.com/track/4iV5W9uYEdYUVa79Axb7Rh",
+            "https://open.spotify.com/intl-de/track/4iV5W9uYEdYUVa79Axb7Rh?si=abc&nd=1",
+            "https://open.spotify.com/intl-pt-BR/track/4iV5W9uYEdYUVa79Axb7Rh",
+            "https://open.spotify.com/embed/track/4iV5W9uYEdYUVa79Axb7Rh#frag",
+            "open.spotify.com/track/4iV5W9uYEdYUVa79Axb7Rh/",
+            "spotify:track:4iV5W9uYEdYUVa79Axb7Rh",
+            "  spotify:track:4iV5W9uYEdYUVa79Axb7Rh\n",
+        ],
+    )
+    def test_track_forms(self, text):
+        """All supported track spellings normalize to one reference."""
+        ref = parse_spotify_ref(text)
+        assert ref == SpotifyRef("track", "4iV5W9uYEdYUVa79Axb7Rh")
+        assert ref.uri == "spotify:track:4iV5W9uYEdYUVa79Axb7Rh"
+
+    def test_playlist_forms(self):
+        """Legacy user playlist paths and URIs are playlists."""
+        assert detect_spotify_url_type("spotify:user:bob:playlist:abc123") == ("playlist", "abc123")
+        url = "https://open.spotify.com/user/bob/playlist/abc123?si=1"
+        assert extract_playlist_id(url) == "abc123"
+        assert extract_track_id("spotify:track:xyz") == "xyz"
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "https://example.com/track/abc",
+            "https://open.spotify.com/album/abc123",
+            "https://open.spotify.com/track/",
+            "spotify:album:abc123",
+            "4iV5W9uYEdYUVa79Axb7Rh",
+        ],
+    )
+    def test_rejected(self, text):
+        """Other hosts, kinds and bare IDs (without a default kind) don't parse."""
+        assert parse_spotify_ref(text) is None
+
+    def test_bare_ids_with_default_kind(self):
+        """A default kind turns bare 22-character IDs into references."""
+        assert parse_spotify_ref("4iV5W9uYEdYUVa79Axb7Rh", default_kind="track").kind == "track"
+        assert parse_spotify_ref("short", default_kind="track") is None
+
+    def test_normalize_batch(self):
+        """One pass dedups across spellings, keeps order and reports rejects."""
+        lines = io.StringIO(
+            "# exported links\n"
+            "https://open.spotify.com/intl-fr/track/4iV5W9uYEdYUVa79Axb7Rh?si=1\n"
+            "spotify:playlist:37i9dQZF1DXcBWIGoYBM5M, not-a-link\n"
+            "\n"
+            "spotify:track:4iV5W9uYEdYUVa79Axb7Rh 0VjIjW4GlUZAMYd2vXMi3b  # trailing note\n"
+        )
+
+        batch = normalize_spotify_refs(lines, default_kind="track")
+
+        assert batch.track_ids == ["4iV5W9uYEdYUVa79Axb7Rh", "0VjIjW4GlUZAMYd2vXMi3b"]
+        assert batch.playlist_ids == ["37i9dQZF1DXcBWIGoYBM5M"]
+        assert batch.invalid == ["not-a-link"]
+        assert batch.duplicates == 1
+
+
 class TestSpotifyEmbedAPI:
     """Tests for SpotifyEmbedAPI class."""
 
@@ -211,3 +327,1369 @@ class TestPlaylistInfo:
         )
         assert info.name == "Test"
         assert info.track_count is None
+
+
+def _response(status_code=200, text="", json_data=None):
+    """Build a minimal stand-in for requests.Response."""
+    from unittest.mock import MagicMock
+
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.text = text
+    resp.content = json.dumps(json_data).encode() if json_data is not None else text.encode()
+    resp.headers = {}
+    resp.json.return_value = json_data
+    return resp
+
+
+class TestPlaylistSnapshot:
+    """Tests for single-fetch playlist snapshots."""
+
+    def _session(self, mocker, embed_html, track_html, spclient):
+        session = mocker.MagicMock()
+
+        def fake_get(url, **kwargs):
+            if "/embed/playlist/" in url:
+                return _response(text=embed_html)
+            if "/embed/track/" in url:
+                return _response(text=track_html)
+            if "spclient" in url:
+                return _response(json_data=spclient)
+            return _response(status_code=404)
+
+        session.get.side_effect = fake_get
+        return session
+
+    def test_snapshot_fetches_each_endpoint_once(
+        self, mocker, sample_embed_html, sample_track_embed_html, sample_spclient_response
+    ):
+        """Metadata and tracks come from one embed and one spclient request."""
+        session = self._session(
+            mocker, sample_embed_html, sample_track_embed_html, sample_spclient_response
+        )
+        api = SpotifyEmbedAPI(session=session)
+
+        snapshot = api.get_playlist_snapshot("pl1")
+
+        assert snapshot.info.name == "Test Playlist"
+        assert snapshot.info.track_count == 150
+        assert [t.id for t in snapshot.tracks] == ["abc123", "def456"]
+        urls = [call.args[0] for call in session.get.call_args_list]
+        assert sum("/embed/playlist/" in u for u in urls) == 1
+        assert sum("spclient" in u for u in urls) == 1
+
+    def test_iter_snapshot_tracks_hydrates_remainder_only(
+        self, mocker, sample_embed_html, sample_track_embed_html, sample_spclient_response
+    ):
+        """Iterating a snapshot never refetches the playlist page."""
+        session = self._session(
+            mocker, sample_embed_html, sample_track_embed_html, sample_spclient_response
+        )
+        client = PlaylistClient(session=session)
+
+        snapshot = client.get_playlist_snapshot("pl1")
+        tracks = list(client.iter_snapshot_tracks(snapshot))
+
+        assert [t.id for t in tracks] == ["abc123", "def456", "ghi789", "jkl012"]
+        urls = [call.args[0] for call in session.get.call_args_list]
+        assert sum("/embed/playlist/" in u for u in urls) == 1
+        assert sum("/embed/track/" in u for u in urls) == 2
+
+    def test_metadata_without_token_skips_spclient(self, mocker):
+        """Without a session token the embed count is used."""
+        html = SAMPLE_EMBED_HTML.replace('"accessToken": "test_token_12345",', "")
+        session = self._session(mocker, html, "", None)
+        api = SpotifyEmbedAPI(session=session)
+
+        info = api.get_playlist_metadata("pl1")
+
+        assert info.track_count == 2
+        assert session.get.call_count == 1
+
+
+class TestPlaylistDiff:
+    """Tests for revision-based incremental playlist diffs."""
+
+    def _api(self, mocker, sample_embed_html, sample_track_embed_html, payloads):
+        """Client whose spclient requests return ``payloads`` in order."""
+        session = mocker.MagicMock()
+        spclient = iter(payloads)
+
+        def fake_get(url, **kwargs):
+            if "/embed/playlist/" in url:
+                return _response(text=sample_embed_html)
+            if "/embed/track/" in url:
+                return _response(text=sample_track_embed_html)
+            return _response(json_data=next(spclient))
+
+        session.get.side_effect = fake_get
+        return SpotifyEmbedAPI(session=session, hydration_workers=1), session
+
+    def _payload(self, revision, ids):
+        items = [{"uri": f"spotify:track:{i}"} for i in ids]
+        return {"revision": revision, "length": len(items), "contents": {"items": items}}
+
+    def _track_fetches(self, session):
+        return [c.args[0] for c in session.get.call_args_list if "/embed/track/" in c.args[0]]
+
+    def test_first_diff_adds_everything(self, mocker, sample_embed_html, sample_track_embed_html):
+        """Without a baseline every track is added and the state is recorded."""
+        api, _ = self._api(
+            mocker, sample_embed_html, sample_track_embed_html, [self._payload("r1", "ab")]
+        )
+
+        diff = api.diff_playlist("pl1")
+
+        assert diff.added_uris == ["spotify:track:a", "spotify:track:b"]
+        assert len(diff.added) == 2 and diff.removed_uris == []
+        assert diff.state == PlaylistState("pl1", "r1", ("spotify:track:a", "spotify:track:b"))
+
+    def test_unchanged_revision_skips_listing_and_hydration(
+        self, mocker, sample_embed_html, sample_track_embed_html
+    ):
+        """A matching revision costs one item-less spclient request."""
+        head = {"revision": "r1", "length": 3000, "contents": {"items": []}}
+        api, session = self._api(mocker, sample_embed_html, sample_track_embed_html, [head])
+        since = PlaylistState("pl1", "r1", tuple(f"spotify:track:{i}" for i in range(3000)))
+
+        diff = api.diff_playlist("pl1", since=since)
+
+        assert not diff.changed and diff.state is since
+        spclient_calls = [c for c in session.get.call_args_list if "spclient" in c.args[0]]
+        assert len(spclient_calls) == 1
+        assert spclient_calls[0].kwargs["params"]["length"] == "0"
+        assert self._track_fetches(session) == []
+
+    def test_changed_revision_hydrates_only_added(
+        self, mocker, sample_embed_html, sample_track_embed_html
+    ):
+        """Only tracks new since the stored state are fetched."""
+        head = {"revision": "r2", "length": 3, "contents": {"items": []}}
+        api, session = self._api(
+            mocker,
+            sample_embed_html,
+            sample_track_embed_html,
+            [head, self._payload("r2", ["a", "c", "a"])],
+        )
+        since = PlaylistState.from_dict(
+            {
+                "playlistId": "pl1",
+                "revision": "r1",
+                "trackUris": ["spotify:track:a", "spotify:track:b"],
+            }
+        )
+
+        diff = api.diff_playlist("pl1", since=since)
+
+        assert diff.added_uris == ["spotify:track:c", "spotify:track:a"]
+        assert diff.removed_uris == ["spotify:track:b"]
+        assert diff.state.revision == "r2"
+        assert PlaylistState.from_dict(diff.state.to_dict()) == diff.state
+        assert [u.rsplit("/", 1)[-1] for u in self._track_fetches(session)] == ["c", "a"]
+
+    def test_snapshot_state_and_mismatched_id(self, sample_spclient_response):
+        """Snapshots expose a baseline; states are bound to their playlist."""
+        info = PlaylistInfo("n", None, None, None, 150)
+        snapshot = PlaylistSnapshot("pl1", info, [], sample_spclient_response)
+
+        assert len(snapshot.state.track_uris) == 4
+        assert PlaylistSnapshot("pl1", info, []).state is None
+        with pytest.raises(ValueError):
+            SpotifyEmbedAPI().diff_playlist("other", since=snapshot.state)
+
+
+class TestGetTracks:
+    """Tests for the batched get_tracks API."""
+
+    def _session(self, mocker, sample_track_embed_html, missing=()):
+        session = mocker.MagicMock()
+
+        def fake_get(url, **kwargs):
+            if url.rsplit("/", 1)[-1] in missing:
+                return _response(status_code=404)
+            return _response(text=sample_track_embed_html)
+
+        session.get.side_effect = fake_get
+        return session
+
+    def test_dedups_and_keeps_input_order(self, mocker, sample_track_embed_html):
+        """Each unique ID is fetched once; results mirror the input, duplicates included."""
+        session = self._session(mocker, sample_track_embed_html)
+        api = SpotifyEmbedAPI(session=session, hydration_workers=4)
+
+        results = api.get_tracks(["a", "b", "a", "c", "b"])
+
+        assert [r.track_id for r in results] == ["a", "b", "a", "c", "b"]
+        assert all(isinstance(r, TrackResult) and r.ok for r in results)
+        assert results[0].track is results[2].track
+        assert session.get.call_count == 3
+
+    def test_failures_are_reported_per_id(self, mocker, sample_track_embed_html):
+        """One missing track doesn't fail the rest of the batch."""
+        session = self._session(mocker, sample_track_embed_html, missing={"bad"})
+        api = SpotifyEmbedAPI(session=session, hydration_workers=2)
+
+        good, bad = api.get_tracks(["good", "bad"])
+
+        assert good.ok and good.track.title == "Individual Track"
+        assert not bad.ok and bad.track is None
+        assert isinstance(bad.error, SpotifyDownAPIError)
+
+    def test_repeat_calls_served_from_memory(self, mocker, sample_track_embed_html):
+        """Tracks fetched once aren't requested again by later batches."""
+        session = self._session(mocker, sample_track_embed_html)
+        api = SpotifyEmbedAPI(session=session)
+
+        api.get_tracks(["a", "b"])
+        results = api.get_tracks(["b", "a"])
+
+        assert [r.track_id for r in results] == ["b", "a"]
+        assert session.get.call_count == 2
+
+    def test_cache_is_bounded(self, mocker, sample_track_embed_html):
+        """track_cache_size caps how many tracks are remembered."""
+        session = self._session(mocker, sample_track_embed_html)
+        api = SpotifyEmbedAPI(session=session, track_cache_size=1)
+
+        api.get_tracks(["a", "b"])
+        api.get_tracks(["a"])
+
+        assert session.get.call_count == 3
+
+    def test_playlist_client_passthrough(self, mocker, sample_track_embed_html):
+        """PlaylistClient exposes get_tracks."""
+        session = self._session(mocker, sample_track_embed_html)
+        client = PlaylistClient(session=session)
+
+        assert [r.ok for r in client.get_tracks(["x"], max_workers=1)] == [True]
+
+
+class TestPagedSpclient:
+    """Tests for page-by-page spclient enumeration."""
+
+    def _api(self, mocker, sample_embed_html, sample_track_embed_html, total, page_size):
+        """Client whose spclient honours from/length over ``total`` track URIs."""
+        session = mocker.MagicMock()
+        uris = [f"spotify:track:t{i}" for i in range(total)]
+
+        def fake_get(url, **kwargs):
+            if "/embed/playlist/" in url:
+                return _response(text=sample_embed_html)
+            if "/embed/track/" in url:
+                return _response(text=sample_track_embed_html)
+            params = kwargs.get("params") or {}
+            start = int(params.get("from", 0))
+            window = uris[start : start + int(params.get("length", total))]
+            items = [{"uri": uri} for uri in window]
+            return _response(
+                json_data={"revision": "r1", "length": total, "contents": {"items": items}}
+            )
+
+        session.get.side_effect = fake_get
+        api = SpotifyEmbedAPI(session=session, hydration_workers=1, spclient_page_size=page_size)
+        return api, session
+
+    def _offsets(self, session):
+        calls = [c for c in session.get.call_args_list if "spclient" in c.args[0]]
+        return [c.kwargs["params"]["from"] for c in calls]
+
+    def test_iter_playlist_uris_pages_and_reports_progress(
+        self, mocker, sample_embed_html, sample_track_embed_html
+    ):
+        """URIs arrive in order, one window per request, with progress per page."""
+        api, session = self._api(mocker, sample_embed_html, sample_track_embed_html, 7, 3)
+        api._tokens.update("tok", time.time() + 3600)
+        seen = []
+
+        uris = list(api.iter_playlist_uris("pl1", progress=lambda *p: seen.append(p)))
+
+        assert uris == [f"spotify:track:t{i}" for i in range(7)]
+        assert self._offsets(session) == ["0", "3", "6"]
+        assert seen == [(3, 7), (6, 7), (7, 7)]
+
+    def test_pages_fetched_lazily(self, mocker, sample_embed_html, sample_track_embed_html):
+        """Only the pages the consumer has reached are requested."""
+        api, session = self._api(mocker, sample_embed_html, sample_track_embed_html, 10, 2)
+        api._tokens.update("tok", time.time() + 3600)
+
+        uris = api.iter_playlist_uris("pl1")
+        next(uris)
+        next(uris)
+
+        assert self._offsets(session) == ["0"]
+
+    def test_snapshot_tracks_page_through_remainder(
+        self, mocker, sample_embed_html, sample_track_embed_html
+    ):
+        """The snapshot holds one page; iterating fetches the rest as it goes."""
+        api, session = self._api(mocker, sample_embed_html, sample_track_embed_html, 5, 2)
+        api._tokens.update("tok", time.time() + 3600)
+        seen = []
+
+        snapshot = api.get_playlist_snapshot("pl1")
+        tracks = list(api.iter_snapshot_tracks(snapshot, progress=lambda *p: seen.append(p)))
+
+        assert len(snapshot.spclient["contents"]["items"]) == 2
+        assert snapshot.state is None
+        assert [t.id for t in tracks[2:]] == ["t0", "t1", "t2", "t3", "t4"]
+        assert self._offsets(session) == ["0", "2", "4"]
+        assert seen == [(2, 5), (4, 5), (5, 5)]
+
+    def test_window_ignored_by_server(self, mocker, sample_spclient_response):
+        """A page longer than requested is taken as the whole listing."""
+        session = mocker.MagicMock()
+        session.get.return_value = _response(json_data=sample_spclient_response)
+        api = SpotifyEmbedAPI(session=session, spclient_page_size=2)
+        api._tokens.update("tok", time.time() + 3600)
+
+        assert len(list(api.iter_playlist_uris("pl1"))) == 4
+        assert session.get.call_count == 1
+
+
+class TestConnectionPooling:
+    """Tests for tuned sessions and connection reuse statistics."""
+
+    @pytest.fixture
+    def server_url(self):
+        """Local keep-alive HTTP server."""
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}/"
+        server.shutdown()
+        server.server_close()
+
+    def test_keep_alive_reuses_connection(self, server_url):
+        """Sequential requests to one host share a single connection."""
+        session = build_session()
+        for _ in range(3):
+            assert session.get(server_url, timeout=5).content == b"ok"
+
+        stats = connection_stats(session)
+        assert (stats.requests, stats.new_connections, stats.reused_connections) == (3, 1, 2)
+
+    def test_keep_alive_disabled(self, server_url):
+        """Without keep-alive every request opens a new connection."""
+        session = build_session(PoolConfig(keep_alive=False))
+        for _ in range(3):
+            session.get(server_url, timeout=5)
+
+        stats = connection_stats(session)
+        assert stats.new_connections == 3
+        assert stats.reuse_ratio == 0.0
+
+    def test_pool_config_applied(self):
+        """Pool sizes reach the mounted adapters."""
+        session = build_session(PoolConfig(pool_connections=4, pool_maxsize=32, pool_block=True))
+        adapter = session.get_adapter("https://open.spotify.com/")
+
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 32
+        assert adapter._pool_block is True
+
+    def test_clients_share_default_session(self):
+        """Clients without a session or pool config share one tuned session."""
+        assert SpotifyEmbedAPI()._session is shared_session()
+        assert PlaylistClient()._session is shared_session()
+        assert SpotifyEmbedAPI(pool=PoolConfig())._session is not shared_session()
+
+        big = SpotifyEmbedAPI(hydration_workers=DEFAULT_POOL_MAXSIZE + 8)
+        assert big._session.get_adapter("https://x/")._pool_maxsize == DEFAULT_POOL_MAXSIZE + 8
+
+    def test_stats_for_untuned_session(self, mocker):
+        """Sessions not made by build_session report zeros."""
+        api = SpotifyEmbedAPI(session=mocker.MagicMock())
+
+        assert api.connection_stats == ConnectionStats()
+
+
+class TestConcurrentHydration:
+    """Tests for the bounded track hydration pool."""
+
+    def _track(self, track_id):
+        return TrackInfo(
+            id=track_id,
+            title=f"Title {track_id}",
+            artists="Artist",
+            album=None,
+            release_date=None,
+            cover_url=None,
+            duration_ms=None,
+            preview_url=None,
+            raw={},
+        )
+
+    def test_results_yielded_in_input_order(self, mocker):
+        """Slow early tracks must not reorder the output."""
+        import time
+
+        api = SpotifyEmbedAPI(hydration_workers=4)
+
+        def fake_fetch(track_id):
+            time.sleep(0.02 if track_id in ("t0", "t1") else 0)
+            return self._track(track_id)
+
+        mocker.patch.object(api, "_fetch_track_metadata", side_effect=fake_fetch)
+        ids = [f"t{i}" for i in range(12)]
+
+        assert [t.id for t in api._hydrate_tracks(ids)] == ids
+
+    def test_concurrency_limit_respected(self, mocker):
+        """No more than hydration_workers fetches run at once."""
+        import threading
+        import time
+
+        api = SpotifyEmbedAPI(hydration_workers=3)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def fake_fetch(track_id):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.01)
+            with lock:
+                state["active"] -= 1
+            return self._track(track_id)
+
+        mocker.patch.object(api, "_fetch_track_metadata", side_effect=fake_fetch)
+        list(api._hydrate_tracks([f"t{i}" for i in range(15)]))
+
+        assert 1 < state["peak"] <= 3
+
+    def test_failures_become_stubs_and_unavailable_are_skipped(self, mocker):
+        """Errors yield a stub; unavailable embeds (None) are skipped."""
+        api = SpotifyEmbedAPI(hydration_workers=2)
+
+        def fake_fetch(track_id):
+            if track_id == "boom":
+                raise RuntimeError("boom")
+            if track_id == "gone":
+                return None
+            return self._track(track_id)
+
+        mocker.patch.object(api, "_fetch_track_metadata", side_effect=fake_fetch)
+        tracks = list(api._hydrate_tracks(["a", "boom", "gone", "b"]))
+
+        assert [t.id for t in tracks] == ["a", "boom", "b"]
+        assert tracks[1].title == "Track boom"
+        assert tracks[1].artists == "Unknown Artist"
+
+    def test_single_worker_runs_sequentially(self, mocker):
+        """hydration_workers=1 keeps the old one-at-a-time behaviour."""
+        api = SpotifyEmbedAPI(hydration_workers=1)
+        mocker.patch.object(api, "_fetch_track_metadata", side_effect=self._track)
+
+        assert [t.id for t in api._hydrate_tracks(["x", "y"])] == ["x", "y"]
+
+
+HTTPX_AVAILABLE = importlib.util.find_spec("httpx") is not None
+
+
+@pytest.mark.skipif(not HTTPX_AVAILABLE, reason="httpx not installed (async client is optional)")
+class TestAsyncSpotifyEmbedAPI:
+    """Tests for the asyncio embed client."""
+
+    def _api(self, embed_html, track_html, spclient, calls):
+        import httpx
+
+        def handler(request):
+            url = str(request.url)
+            calls.append(url)
+            if "/embed/playlist/" in url:
+                return httpx.Response(200, text=embed_html)
+            if "/embed/track/" in url:
+                return httpx.Response(200, text=track_html)
+            if "spclient" in url:
+                return httpx.Response(200, json=spclient)
+            if "oembed" in url:
+                return httpx.Response(200, json={})
+            return httpx.Response(404)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return AsyncSpotifyEmbedAPI(client=client, hydration_workers=2)
+
+    def test_iter_playlist_tracks_matches_sync_client(
+        self, sample_embed_html, sample_track_embed_html, sample_spclient_response
+    ):
+        """Async iteration yields the same ordered tracks as the sync client."""
+        calls: list[str] = []
+        api = self._api(sample_embed_html, sample_track_embed_html, sample_spclient_response, calls)
+
+        async def collect():
+            return [track async for track in api.iter_playlist_tracks("pl1")]
+
+        tracks = asyncio.run(collect())
+
+        assert [t.id for t in tracks] == ["abc123", "def456", "ghi789", "jkl012"]
+        assert tracks[2].title == "Individual Track"
+        assert sum("/embed/playlist/" in u for u in calls) == 1
+
+    def test_get_track_and_validate(self, sample_embed_html, sample_track_embed_html):
+        """get_track parses the track embed; validate_playlist hits oEmbed."""
+        calls: list[str] = []
+        api = self._api(sample_embed_html, sample_track_embed_html, None, calls)
+
+        async def run():
+            return await api.get_track("xyz"), await api.validate_playlist("pl1")
+
+        track, valid = asyncio.run(run())
+
+        assert track.title == "Individual Track"
+        assert track.release_date == "2024-01-15"
+        assert valid is True
+
+    def test_missing_track_raises(self):
+        """An unavailable track embed raises SpotifyDownAPIError."""
+        calls: list[str] = []
+        api = self._api("", "<html></html>", None, calls)
+
+        with pytest.raises(SpotifyDownAPIError, match="Could not fetch track"):
+            asyncio.run(api.get_track("nope"))
+
+
+class TestSQLiteResponseCache:
+    """Tests for the persistent embed/spclient response cache."""
+
+    def test_roundtrip_is_compressed(self, tmp_path, sample_embed_html):
+        """Bodies survive a roundtrip and are stored compressed."""
+        cache = SQLiteResponseCache(str(tmp_path / "c.db"))
+        body = (sample_embed_html * 20).encode()
+
+        cache.set("k", "embed_track", body, etag='"v1"')
+        entry = cache.get("k")
+
+        assert entry.body == body
+        assert entry.etag == '"v1"'
+        assert entry.is_fresh()
+        stored = cache._conn.execute("SELECT size FROM responses").fetchone()[0]
+        assert stored < len(body) / 5
+
+    def test_per_endpoint_ttl(self, tmp_path):
+        """Entries expire according to their endpoint TTL."""
+        cache = SQLiteResponseCache(str(tmp_path / "c.db"), ttls={"spclient": 0})
+        cache.set("a", "spclient", b"{}")
+        cache.set("b", "embed_track", b"{}")
+
+        assert not cache.get("a").is_fresh()
+        assert cache.get("b").is_fresh()
+
+    def test_size_based_eviction_drops_least_recent(self, tmp_path):
+        """Exceeding max_bytes evicts least recently used entries first."""
+        import os
+
+        cache = SQLiteResponseCache(str(tmp_path / "c.db"), max_bytes=3000)
+        for key in ("old", "mid", "new"):
+            cache.set(key, "embed_track", os.urandom(1200))
+            cache._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                ({"old": 1, "mid": 2, "new": 3}[key], key),
+            )
+
+        assert cache.get("old") is None
+        assert cache.get("new") is not None
+
+    def test_eviction_counts_other_processes_entries(self, tmp_path):
+        """Two caches on one file evict against their combined size."""
+        import os
+
+        path = str(tmp_path / "c.db")
+        first = SQLiteResponseCache(path, max_bytes=3000)
+        second = SQLiteResponseCache(path, max_bytes=3000)
+        for i in range(6):
+            (first, second)[i % 2].set(f"k{i}", "embed_track", os.urandom(1200))
+
+        total = first._conn.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+        assert total <= 3000
+        assert first.get("k5") is not None
+
+    def test_incomplete_backend_fails_at_construction(self):
+        """A ResponseCache subclass missing get/set/refresh can't be instantiated."""
+
+        class GetOnly(ResponseCache):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnly()
+
+    def test_persists_across_instances(self, tmp_path):
+        """A second cache on the same file sees earlier entries."""
+        path = str(tmp_path / "c.db")
+        SQLiteResponseCache(path).set("k", "embed_track", b"hello")
+
+        assert SQLiteResponseCache(path).get("k").body == b"hello"
+
+
+class TestNegativeCache:
+    """Tests for the persistent record of dead tracks."""
+
+    def test_entries_expire_per_kind(self, tmp_path):
+        """Entries are keyed by kind, persist across instances and expire."""
+        path = str(tmp_path / "neg.db")
+        cache = NegativeCache(path, ttls={"no_audio": 0})
+        cache.add("t1", "unavailable", "HTTP 404")
+        cache.add("t1", "unavailable", "HTTP 404")
+        cache.add("t2", "no_audio", "nothing found")
+
+        entry = NegativeCache(path).get("t1", "unavailable", "region_blocked")
+        assert (entry.kind, entry.failures) == ("unavailable", 2)
+        assert cache.get("t1", "no_audio") is None
+        assert cache.get("t2") is None  # Expired straight away
+        assert cache.purge_expired() == 1
+
+        cache.discard("t1")
+        assert cache.get("t1") is None
+
+    def test_dead_track_not_refetched(self, mocker):
+        """A 404 track embed is remembered and fails without a request next time."""
+        session = mocker.MagicMock()
+        session.get.return_value = _response(status_code=404)
+        negative = NegativeCache(":memory:")
+        api = SpotifyEmbedAPI(session=session, negative_cache=negative)
+
+        for _ in range(2):
+            with pytest.raises(SpotifyDownAPIError):
+                api.get_track("gone")
+
+        assert session.get.call_count == 1
+        assert negative.get("gone").kind == "unavailable"
+
+    def test_transient_failures_not_remembered(self, mocker):
+        """Server errors, rate limits and 403 blocks are not treated as dead tracks."""
+        session = mocker.MagicMock()
+        session.get.return_value = _response(status_code=503)
+        negative = NegativeCache(":memory:")
+        api = SpotifyEmbedAPI(
+            session=session,
+            negative_cache=negative,
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+        with pytest.raises(SpotifyDownAPIError):
+            api.get_track("flaky")
+
+        assert negative.get("flaky") is None
+        assert negative_kind(ExtractionError("HTTP 451", 451)) == "region_blocked"
+        assert negative_kind(ExtractionError("Access denied (HTTP 403)", 403)) is None
+        assert negative_kind(NetworkError("timeout")) is None
+
+
+class TestRequestCoalescing:
+    """Tests for single-flight sharing of identical in-flight fetches."""
+
+    @staticmethod
+    def _concurrently(func, n_callers=8):
+        barrier = threading.Barrier(n_callers)
+
+        def call():
+            barrier.wait()
+            try:
+                return func()
+            except Exception as exc:
+                return exc
+
+        with ThreadPoolExecutor(max_workers=n_callers) as pool:
+            return list(pool.map(lambda _: call(), range(n_callers)))
+
+    @staticmethod
+    def _slow_session(mocker, response):
+        def get(*args, **kwargs):
+            time.sleep(0.2)
+            return response
+
+        session = mocker.MagicMock()
+        session.get.side_effect = get
+        return session
+
+    def test_identical_fetches_share_one_request(self, mocker, sample_track_embed_html):
+        """Concurrent fetches of one track embed make one request and one parse."""
+        session = self._slow_session(mocker, _response(text=sample_track_embed_html))
+        api = SpotifyEmbedAPI(session=session)
+        parse = mocker.spy(api, "_parse_embed_page")
+        url = "https://open.spotify.com/embed/track/t1"
+
+        results = self._concurrently(lambda: api._fetch_embed_data(url))
+
+        assert session.get.call_count == 1
+        assert parse.call_count == 1
+        assert all(result is results[0] for result in results)
+        assert api.coalesced_fetches == 7
+
+        api._fetch_embed_data(url)  # Nothing is remembered once the fetch finishes
+        assert session.get.call_count == 2
+
+    def test_errors_shared_and_keys_distinct(self, mocker):
+        """Waiting callers get the leader's error; different pages fetch separately."""
+        session = self._slow_session(mocker, _response(status_code=404))
+        api = SpotifyEmbedAPI(session=session)
+        urls = [f"https://open.spotify.com/embed/track/t{i % 2}" for i in range(8)]
+        calls = iter(urls)
+        lock = threading.Lock()
+
+        def fetch():
+            with lock:
+                url = next(calls)
+            return api._fetch_embed_data(url)
+
+        results = self._concurrently(fetch)
+
+        assert session.get.call_count == 2
+        assert all(isinstance(result, ExtractionError) for result in results)
+
+    def test_spclient_pages_coalesced(self, mocker):
+        """Identical spclient page requests share one call."""
+        session = self._slow_session(mocker, _response(json_data={"length": 0, "contents": {}}))
+        api = SpotifyEmbedAPI(session=session)
+        api._tokens.update("tok", time.time() + 3600)
+        params = api._spclient_page_params(0)
+
+        results = self._concurrently(lambda: api._fetch_spclient_playlist("pl1", params=params))
+
+        assert session.get.call_count == 1
+        assert all(result == {"length": 0, "contents": {}} for result in results)
+
+
+class TestCassette:
+    """Tests for record/replay sessions."""
+
+    @pytest.fixture
+    def live(self, mocker, sample_embed_html, sample_track_embed_html, sample_spclient_response):
+        """Stand in for the network below the cassette adapter."""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        def send(adapter, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response.url = request.url
+            if "/embed/playlist/" in request.url:
+                response._content = sample_embed_html.encode()
+            elif "/embed/track/" in request.url:
+                response._content = sample_track_embed_html.encode()
+            else:
+                response._content = json.dumps(sample_spclient_response).encode()
+                response.headers["Content-Type"] = "application/json"
+            return response
+
+        return mocker.patch.object(HTTPAdapter, "send", autospec=True, side_effect=send)
+
+    def test_replay_matches_recording_offline(self, live, tmp_path):
+        """A replayed client sees the recorded playlist without any network I/O."""
+        path = str(tmp_path / "pl1.jsonl.gz")
+        with Cassette(path, "record") as cassette:
+            recorded = PlaylistClient(cassette=cassette)
+            snapshot = recorded.get_playlist_snapshot("pl1")
+            expected = list(recorded.iter_snapshot_tracks(snapshot))
+        assert live.call_count == len(cassette) == 4
+        live.reset_mock()
+        shared_token_manager().clear()
+
+        replay = Cassette(path)
+        client = PlaylistClient(cassette=replay)
+        snapshot = client.get_playlist_snapshot("pl1")
+        tracks = list(client.iter_snapshot_tracks(snapshot))
+
+        assert live.call_count == 0
+        assert [t.id for t in tracks] == [t.id for t in expected]
+        assert tracks[-1].title == expected[-1].title
+        assert client.connection_stats.requests == 4
+
+    def test_unrecorded_request_fails_fast(self, tmp_path):
+        """Requests missing from the cassette raise instead of retrying."""
+        path = str(tmp_path / "empty.jsonl.gz")
+        Cassette(path, "record").save()
+        replay = Cassette(path)
+
+        with pytest.raises(CassetteMissError):
+            SpotifyEmbedAPI(cassette=replay)._fetch_embed_data(
+                "https://open.spotify.com/embed/track/t1"
+            )
+        assert replay.misses == 1
+
+    def test_replay_latency_and_expired_tokens(self, live, tmp_path, sample_track_embed_html):
+        """Latency is simulated and recorded tokens stay usable after expiry."""
+        path = str(tmp_path / "t1.jsonl.gz")
+        with Cassette(path, "record") as cassette:
+            SpotifyEmbedAPI(cassette=cassette).get_track("t1")
+
+        replay = Cassette(path, latency=0.05)
+        started = time.perf_counter()
+        SpotifyEmbedAPI(cassette=replay).get_track("t1")
+        assert time.perf_counter() - started >= 0.05
+
+        replay.token_manager.clear()
+        replay.token_manager.update("old", time.time() - 3600)
+        assert replay.token_manager.get() == "old"
+
+
+class TestCachedEmbedFetches:
+    """Tests for SpotifyEmbedAPI's use of the response cache."""
+
+    def test_fresh_entry_skips_network(self, mocker, tmp_path, sample_track_embed_html):
+        """A second fetch of the same track embed is served from cache."""
+        session = mocker.MagicMock()
+        session.get.return_value = _response(text=sample_track_embed_html)
+        cache = SQLiteResponseCache(str(tmp_path / "c.db"))
+        api = SpotifyEmbedAPI(session=session, cache=cache)
+
+        first = api.get_track("t1")
+        second = SpotifyEmbedAPI(session=session, cache=cache).get_track("t1")
+
+        assert first.title == second.title == "Individual Track"
+        assert session.get.call_count == 1
+
+    def test_stale_entry_revalidates_with_etag(self, mocker, tmp_path, sample_track_embed_html):
+        """Stale entries send If-None-Match and reuse the body on 304."""
+        session = mocker.MagicMock()
+        fresh = _response(text=sample_track_embed_html)
+        fresh.headers = {"ETag": '"abc"'}
+        session.get.side_effect = [fresh, _response(status_code=304)]
+        cache = SQLiteResponseCache(str(tmp_path / "c.db"), ttls={"embed_track": 0})
+        api = SpotifyEmbedAPI(session=session, cache=cache)
+
+        api.get_track("t1")
+        track = api.get_track("t1")
+
+        assert track.title == "Individual Track"
+        assert session.get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"abc"'
+
+
+class TestAccessTokenManager:
+    """Tests for the shared anonymous token manager."""
+
+    def test_new_instance_reuses_shared_token(self, mocker, sample_embed_html):
+        """A fresh client gets the token without downloading an embed page."""
+        session = mocker.MagicMock()
+        session.get.return_value = _response(text=sample_embed_html)
+        SpotifyEmbedAPI(session=session).get_playlist_snapshot("pl1")
+        session.get.reset_mock()
+        session.get.return_value = _response(json_data={"length": 0, "contents": {}})
+
+        SpotifyEmbedAPI(session=session)._fetch_spclient_playlist("pl1")
+
+        assert session.get.call_count == 1
+        url = session.get.call_args.args[0]
+        assert "spclient" in url
+        assert session.get.call_args.kwargs["headers"]["Authorization"] == (
+            "Bearer test_token_12345"
+        )
+
+    def test_token_persisted_across_managers(self, tmp_path):
+        """A second manager (e.g. another process) reads the persisted token."""
+        path = str(tmp_path / "token.json")
+        AccessTokenManager(path).update("tok", time.time() + 3600, "https://x/embed")
+
+        assert AccessTokenManager(path).get() == "tok"
+
+    def test_older_token_ignored(self):
+        """A token from a stale cached page never replaces a newer one."""
+        manager = AccessTokenManager()
+        manager.update("new", time.time() + 3600)
+        manager.update("old", time.time() + 600)
+
+        assert manager.get() == "new"
+
+    def test_token_near_expiry_not_returned(self):
+        """Tokens inside the expiry margin are treated as expired."""
+        manager = AccessTokenManager()
+        manager.update("tok", time.time() + 30)
+
+        assert manager.get() is None
+
+    def test_proactive_refresh_before_expiry(self, mocker, sample_embed_html):
+        """The refresh timer refetches the embed page before the token expires."""
+        session = mocker.MagicMock()
+        session.get.return_value = _response(text=sample_embed_html)
+        manager = AccessTokenManager(auto_refresh=True, refresh_lead=3599.9, session=session)
+        manager.update("old", time.time() + 3600, "https://open.spotify.com/embed/playlist/pl1")
+
+        deadline = time.time() + 5
+        while manager.get() != "test_token_12345" and time.time() < deadline:
+            time.sleep(0.02)
+        manager.close()
+
+        assert manager.get() == "test_token_12345"
+        assert session.get.call_args.args[0] == "https://open.spotify.com/embed/playlist/pl1"
+
+
+class TestEmbedPageExtraction:
+    """Tests for the byte-level __NEXT_DATA__ extractor."""
+
+    def _full_parse(self, html):
+        match = SpotifyEmbedAPI._NEXT_DATA_PATTERN.search(html)
+        return json.loads(match.group(1))["props"]["pageProps"]["state"]
+
+    def test_bytes_path_matches_full_parse(self, sample_embed_html):
+        """Entity and session subtrees equal those of a full json.loads."""
+        api = SpotifyEmbedAPI()
+        state = api._parse_embed_page(sample_embed_html.encode())["props"]["pageProps"]["state"]
+
+        expected = self._full_parse(sample_embed_html)
+        assert state["data"]["entity"] == expected["data"]["entity"]
+        assert state["settings"]["session"] == expected["settings"]["session"]
+
+    def test_implausible_entity_falls_back_to_full_parse(self, sample_embed_html):
+        """An earlier, unrelated "entity" key doesn't fool the extractor."""
+        html = sample_embed_html.replace(
+            '"pageProps": {', '"pageProps": {"meta": {"entity": 1},', 1
+        )
+        api = SpotifyEmbedAPI()
+
+        data = api._parse_embed_page(html.encode())
+
+        assert data["props"]["pageProps"]["meta"] == {"entity": 1}
+        assert api._extract_entity(data)["name"] == "Test Playlist"
+
+    def test_plausible_decoy_subtrees_fall_back_to_full_parse(self, sample_embed_html):
+        """Same-named, well-formed objects elsewhere are never taken for the real ones."""
+        html = sample_embed_html.replace(
+            '"pageProps": {',
+            '"pageProps": {"meta": {"entity": {"name": "Decoy"}, "session": {}},',
+            1,
+        )
+        api = SpotifyEmbedAPI()
+
+        state = api._parse_embed_page(html.encode())["props"]["pageProps"]["state"]
+
+        expected = self._full_parse(sample_embed_html)
+        assert state["data"]["entity"]["name"] == "Test Playlist"
+        assert state["settings"]["session"] == expected["settings"]["session"]
+
+    def test_unambiguous_page_skips_full_parse(self, mocker, sample_embed_html):
+        """The usual page is read from its two subtrees alone."""
+        api = SpotifyEmbedAPI()
+        mocker.patch("spotifydown_api.json_loads", side_effect=AssertionError("full parse"))
+        data = api._parse_embed_page(sample_embed_html.encode())
+
+        assert api._extract_entity(data)["name"] == "Test Playlist"
+
+    def test_synthetic_pages_parse(self):
+        """The benchmark generators produce pages the client parses in full."""
+        api = SpotifyEmbedAPI()
+        data = api._parse_embed_page(synthetic_embed_html(1000).encode())
+        items = api._extract_entity(data)["trackList"]
+
+        assert len(items) == 1000
+        assert api._parse_track(items[-1], "x").album == "Album 199"
+        assert len(_spclient_item_uris(synthetic_spclient_response(1000))) == 1000
+
+    def test_missing_script_raises(self):
+        """Pages without __NEXT_DATA__ raise ExtractionError."""
+        with pytest.raises(ExtractionError):
+            SpotifyEmbedAPI()._parse_embed_page(b"<html><body>nope</body></html>")
+
+
+class TestJSONBackend:
+    """Tests for the optional fast JSON backend."""
+
+    def test_round_trip(self):
+        """json_dumps output is compact UTF-8 that json_loads reads back."""
+        payload = {"title": "Café", "ids": [1, 2, 3], "nested": {"ok": True}}
+        body = json_dumps(payload)
+
+        assert isinstance(body, bytes)
+        assert b" " not in body.replace("Café".encode(), b"")
+        assert json_loads(body) == payload
+        assert json.loads(body) == payload
+
+    def test_invalid_json_raises_stdlib_error(self):
+        """Both backends raise json.JSONDecodeError."""
+        with pytest.raises(json.JSONDecodeError):
+            json_loads(b"{not json")
+
+
+class TestCompactTracks:
+    """Tests for slotted TrackInfo, opt-in raw payloads and TrackTable."""
+
+    def _track(self, i, artists="Artist", album="Album"):
+        return TrackInfo(
+            id=f"id{i}",
+            title=f"Title {i}",
+            artists=artists,
+            album=album,
+            release_date=None,
+            cover_url="https://example.com/cover.jpg",
+            duration_ms=1000 * i if i else None,
+            preview_url=None,
+            raw=NO_RAW,
+        )
+
+    def test_track_info_has_no_instance_dict(self):
+        """TrackInfo is slotted."""
+        assert not hasattr(self._track(1), "__dict__")
+
+    def test_raw_payload_is_opt_in(self, mocker, sample_track_embed_html):
+        """Clients drop the source payload unless keep_raw is set."""
+        session = mocker.MagicMock()
+        session.get.return_value = _response(text=sample_track_embed_html)
+
+        lean = SpotifyEmbedAPI(session=session).get_track("t1")
+        full = SpotifyEmbedAPI(session=session, keep_raw=True).get_track("t1")
+
+        assert lean.raw == {}
+        assert full.raw["name"] == "Individual Track"
+
+    def test_track_table_round_trips(self):
+        """Tracks read back from the table equal the originals (minus raw)."""
+        tracks = [self._track(i) for i in range(3)]
+        table = TrackTable(tracks)
+
+        assert len(table) == 3
+        assert list(table) == tracks
+        assert table[-1] == tracks[2]
+        assert table[0].duration_ms is None
+        with pytest.raises(IndexError):
+            table[3]
+
+    def test_track_table_pools_repeated_strings(self):
+        """Repeated artists/album values are stored once."""
+        table = TrackTable(self._track(i, artists=f"Artist {i}" * 3) for i in range(4))
+        table.extend(self._track(i, artists="Artist 0" * 3) for i in range(4, 8))
+
+        rows = list(table.iter_rows())
+        assert rows[0][2] is rows[7][2]
+        assert len(table._pool) == 1 + 4 + 1 + 1  # None, artists, album, cover
+
+
+class TestRateLimiter:
+    """Tests for the per-host token-bucket rate limiter."""
+
+    def test_parse_retry_after(self):
+        """Both delta-seconds and HTTP-date forms are understood."""
+        from email.utils import formatdate
+
+        assert parse_retry_after("7") == 7.0
+        assert 25 < parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+    def test_reservations_are_paced_per_host(self):
+        """Past the burst, callers queue at 1/rate intervals; hosts are independent."""
+        limiter = RateLimiter(rate=10, burst=1)
+
+        assert limiter.reserve("a") == 0
+        assert limiter.reserve("a") == pytest.approx(0.1, abs=0.01)
+        assert limiter.reserve("a") == pytest.approx(0.2, abs=0.01)
+        assert limiter.reserve("b") == 0
+
+    def test_429_halves_rate_and_blocks_for_retry_after(self):
+        """A 429 cuts the rate and blocks the host; successes creep it back."""
+        limiter = RateLimiter(rate=8)
+        limiter.record("h", 429, retry_after=5)
+
+        assert limiter.rate("h") == 4
+        assert 4.9 < limiter.blocked_for("h") <= 5
+        assert limiter.reserve("h") > 4.9
+
+        limiter.record("h", 200)
+        assert 4 < limiter.rate("h") < 8
+
+    def test_long_retry_after_penalty_capped(self):
+        """A Retry-After past max_penalty only blocks the host for max_penalty."""
+        limiter = RateLimiter()
+        limiter.record("h", 429, retry_after=3600, max_penalty=10)
+
+        assert limiter.blocked_for("h") <= 10
+
+    def test_acquire_raises_instead_of_overrunning_budget(self):
+        """acquire won't sleep past the deadline or once cancelled, and hands its token back."""
+        limiter = RateLimiter(rate=10, burst=1)
+        limiter.record("h", 429, retry_after=30)
+        cancel = threading.Event()
+        cancel.set()
+
+        started = time.monotonic()
+        with pytest.raises(RateLimitError) as excinfo:
+            limiter.acquire("h", deadline=time.monotonic() + 1)
+        with pytest.raises(RateLimitError):
+            limiter.acquire("h", cancel_event=cancel)
+
+        assert time.monotonic() - started < 1
+        assert excinfo.value.retry_after > 29
+        assert limiter.reserve("q") == 0
+        with pytest.raises(RateLimitError):
+            limiter.acquire("q", cancel_event=cancel)
+        assert limiter.reserve("q") == pytest.approx(0.1, abs=0.01)
+
+    def test_acquire_async_honours_policy_cancel_event(self):
+        """The async acquire gives up on a blocked host once the policy is cancelled."""
+        limiter = RateLimiter()
+        limiter.record("h", 429, retry_after=30)
+        cancel = threading.Event()
+        policy = RetryPolicy(max_attempts=1, cancel_event=cancel)
+        timer = threading.Timer(0.1, cancel.set)
+        timer.start()
+
+        started = time.monotonic()
+        try:
+            with pytest.raises(RateLimitError):
+                asyncio.run(policy.call_async(limiter.acquire_async, "h"))
+        finally:
+            timer.cancel()
+
+        assert time.monotonic() - started < 5
+
+    def test_acquire_honours_policy_budget_after_long_retry_after(self, mocker):
+        """A host blocked by a long Retry-After doesn't stall a later deadline-bound call."""
+        limited = _response(status_code=429)
+        limited.headers = {"Retry-After": "3600"}
+        session = mocker.MagicMock()
+        session.get.return_value = limited
+        limiter = RateLimiter()
+        rate_limited_get("https://x.test/a", session=session, limiter=limiter)
+        policy = RetryPolicy(max_attempts=1, deadline=5)
+
+        started = time.monotonic()
+        with pytest.raises(RateLimitError):
+            get_with_retry("https://x.test/b", policy=policy, session=session, limiter=limiter)
+
+        assert time.monotonic() - started < 1
+        assert session.get.call_count == 1
+
+    def test_get_retries_429_after_retry_after(self, mocker):
+        """rate_limited_get retries a 429 instead of failing the request."""
+        limited = _response(status_code=429)
+        limited.headers = {"Retry-After": "0"}
+        session = mocker.MagicMock()
+        session.get.side_effect = [limited, _response(text="ok")]
+
+        response = rate_limited_get("https://x.test/a", session=session, limiter=RateLimiter())
+
+        assert response.status_code == 200
+        assert session.get.call_count == 2
+
+    def test_429_wait_bounded_by_policy_deadline(self, mocker):
+        """A Retry-After past the RetryPolicy deadline returns the 429 instead of sleeping."""
+        limited = _response(status_code=429)
+        limited.headers = {"Retry-After": "30"}
+        session = mocker.MagicMock()
+        session.get.return_value = limited
+        policy = RetryPolicy(max_attempts=1, deadline=1.0)
+
+        started = time.monotonic()
+        response = get_with_retry(
+            "https://x.test/a", policy=policy, session=session, limiter=RateLimiter()
+        )
+
+        assert response.status_code == 429
+        assert session.get.call_count == 1
+        assert time.monotonic() - started < 1.0
+
+    def test_429_wait_cut_short_by_cancel_event(self, mocker):
+        """Setting the policy's cancel event ends a 429 wait early."""
+        limited = _response(status_code=429)
+        limited.headers = {"Retry-After": "30"}
+        session = mocker.MagicMock()
+        session.get.return_value = limited
+        cancel = threading.Event()
+        policy = RetryPolicy(max_attempts=1, cancel_event=cancel)
+        timer = threading.Timer(0.1, cancel.set)
+        timer.start()
+
+        started = time.monotonic()
+        try:
+            response = get_with_retry(
+                "https://x.test/a", policy=policy, session=session, limiter=RateLimiter()
+            )
+        finally:
+            timer.cancel()
+
+        assert response.status_code == 429
+        assert session.get.call_count == 1
+        assert time.monotonic() - started < 5.0
+
+    def test_long_retry_after_surfaces_on_error(self, mocker):
+        """Waits beyond max_wait give up and expose retry_after on the error."""
+        limited = _response(status_code=429)
+        limited.headers = {"Retry-After": "3600"}
+        session = mocker.MagicMock()
+        session.get.return_value = limited
+        api = SpotifyEmbedAPI(session=session, rate_limiter=RateLimiter())
+
+        with pytest.raises(RateLimitError) as excinfo:
+            api._fetch_embed_data("https://open.spotify.com/embed/track/t1")
+
+        assert excinfo.value.retry_after == 3600
+        assert session.get.call_count == 1
+
+
+class TestRetryPolicy:
+    """Tests for the retry policy engine."""
+
+    def _flaky(self, failures, exc=None):
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise exc or NetworkError("boom")
+            return "ok"
+
+        return func, calls
+
+    def test_retries_then_succeeds_and_counts(self):
+        """Transient errors are retried and counted."""
+        policy = RetryPolicy(max_attempts=3, base_delay=0)
+        func, calls = self._flaky(2)
+
+        assert policy.call(func) == "ok"
+        stats = policy.stats.snapshot()
+        assert len(calls) == 3
+        assert stats["calls"] == 1
+        assert stats["retries"] == 2
+        assert stats["failures"] == 0
+
+    def test_non_retryable_error_raises_immediately(self):
+        """Extraction errors are not transient."""
+        policy = RetryPolicy(max_attempts=5, base_delay=0)
+        func, calls = self._flaky(1, ExtractionError("bad page"))
+
+        with pytest.raises(ExtractionError):
+            policy.call(func)
+        assert len(calls) == 1
+        assert policy.stats.failures == 1
+
+    def test_classify_can_veto_retry(self):
+        """classify() narrows which instances of retry_on are retried."""
+        policy = RetryPolicy(max_attempts=5, base_delay=0, classify=lambda e: "again" in str(e))
+        func, calls = self._flaky(1, NetworkError("fatal"))
+
+        with pytest.raises(NetworkError):
+            policy.call(func)
+        assert len(calls) == 1
+
+    def test_deadline_stops_retries(self):
+        """A retry whose backoff would overrun the deadline isn't attempted."""
+        policy = RetryPolicy(max_attempts=5, deadline=0.5)
+        func, calls = self._flaky(5, RateLimitError("slow down", retry_after=10))
+
+        with pytest.raises(RateLimitError):
+            policy.call(func)
+        assert len(calls) == 1
+        assert policy.stats.deadline_exceeded == 1
+
+    def test_jittered_backoff_bounds(self):
+        """Full jitter stays within [0, min(max_delay, base * 2**n)]."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=3.0)
+
+        delays = [policy.backoff(n) for n in range(4) for _ in range(50)]
+        assert all(0 <= d <= 3.0 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_cancel_event_aborts_backoff(self):
+        """A set cancel event ends the backoff and re-raises."""
+        import threading
+
+        event = threading.Event()
+        event.set()
+        policy = RetryPolicy(max_attempts=5, base_delay=5, cancel_event=event)
+        func, calls = self._flaky(5)
+
+        with pytest.raises(NetworkError):
+            policy.call(func)
+        assert len(calls) == 1
+
+    def test_async_policy(self):
+        """call_async retries coroutines."""
+        policy = RetryPolicy(max_attempts=3, base_delay=0)
+        attempts = []
+
+        async def func():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise NetworkError("boom")
+            return "ok"
+
+        assert asyncio.run(policy.call_async(func)) == "ok"
+        assert len(attempts) == 2
+
+    def test_embed_5xx_retried_and_404_not(self, mocker, sample_track_embed_html):
+        """Server errors are retried; a missing page fails fast."""
+        session = mocker.MagicMock()
+        session.get.side_effect = [
+            _response(status_code=503),
+            _response(text=sample_track_embed_html),
+        ]
+        api = SpotifyEmbedAPI(session=session, retry_policy=RetryPolicy(base_delay=0))
+
+        assert api.get_track("t1").title == "Individual Track"
+        assert api.retry_stats.retries == 1
+
+        session.get.side_effect = None
+        session.get.return_value = _response(status_code=404)
+        with pytest.raises(ExtractionError):
+            api._fetch_embed_data("https://open.spotify.com/embed/track/gone")
+        assert api.retry_stats.retries == 1
+
+
+class TestLogging:
+    """Tests for the sunnify logging namespace and configure_logging."""
+
+    @pytest.fixture(autouse=True)
+    def restore_loggers(self):
+        names = (LOG_NAMESPACE, f"{LOG_NAMESPACE}.api", f"{LOG_NAMESPACE}.downloader")
+        saved = {
+            name: (logging.getLogger(name).level, list(logging.getLogger(name).handlers))
+            for name in names
+        }
+        yield
+        for name, (level, handlers) in saved.items():
+            logger = logging.getLogger(name)
+            logger.setLevel(level)
+            logger.handlers[:] = handlers
+
+    def test_silent_by_default(self, mocker, capsys, sample_track_embed_html):
+        """Fetching and parsing tracks writes nothing to stdout or stderr."""
+        session = mocker.MagicMock()
+        session.get.return_value = _response(text=sample_track_embed_html)
+
+        SpotifyEmbedAPI(session=session).get_track("t1")
+        sanitize_filename("Song: Title")
+
+        assert capsys.readouterr() == ("", "")
+
+    def test_warnings_reach_handlers(self, caplog):
+        """Failed hydrations are reported through the api logger."""
+        api = SpotifyEmbedAPI()
+        future = Future()
+        future.set_exception(NetworkError("down"))
+
+        with caplog.at_level(logging.WARNING, logger=f"{LOG_NAMESPACE}.api"):
+            stub = api._hydration_result("t9", future)
+
+        assert stub.title == "Track t9"
+        assert "t9" in caplog.text and "down" in caplog.text
+
+    def test_configure_logging_levels_and_single_handler(self, monkeypatch):
+        """Per-module levels come from arguments and the environment."""
+        monkeypatch.setenv("SUNNIFY_LOG_LEVELS", "downloader=info, bogus")
+        stream = io.StringIO()
+
+        configure_logging("warning", levels={"api": "DEBUG"}, stream=stream)
+        root = configure_logging("warning", levels={"api": logging.DEBUG}, stream=stream)
+
+        assert root.level == logging.WARNING
+        assert logging.getLogger(f"{LOG_NAMESPACE}.api").level == logging.DEBUG
+        assert logging.getLogger(f"{LOG_NAMESPACE}.downloader").level == logging.INFO
+        assert sum(getattr(h, "_sunnify", False) for h in root.handlers) == 1
+
+        logging.getLogger(f"{LOG_NAMESPACE}.api").debug("token %s", "refreshed")
+        logging.getLogger(f"{LOG_NAMESPACE}.downloader").debug("hidden")
+        assert "token refreshed" in stream.getvalue()
+        assert "hidden" not in stream.getvalue()
@@ -9,11 +9,14 @@ For actual MP3 downloads, use the desktop app.
 from __future__ import annotations
 
 import gc
+import logging
 import os
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
 # Add parent directory to path for spotifydown_api import
@@ -22,13 +25,47 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from spotifydown_api import (  # noqa: E402
+    LOG_NAMESPACE,
+    AccessTokenManager,
+    ConnectionStats,
     PlaylistClient,
     SpotifyDownAPIError,
-    SpotifyEmbedAPI,
+    SQLiteResponseCache,
+    TrackTable,
+    configure_logging,
     detect_spotify_url_type,
+    json_dumps,
+    json_loads,
 )
 
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Serve jsonify() through spotifydown_api's JSON backend (orjson if installed).
+
+    Large track lists dominate response time; pretty-printed debug output and
+    types the fast backend can't encode go through Flask's default provider.
+    """
+
+    def loads(self, s, **kwargs):
+        return json_loads(s) if not kwargs else super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = json_dumps(obj)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+# Warnings and errors to stderr; SUNNIFY_LOG_LEVEL / SUNNIFY_LOG_LEVELS raise verbosity
+configure_logging()
+logger = logging.getLogger(f"{LOG_NAMESPACE}.backend")
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
 # Reusable client (saves memory on repeated requests)
@@ -39,10 +76,59 @@ def get_playlist_client() -> PlaylistClient:
     """Get or create a playlist client (singleton pattern for memory efficiency)."""
     global _playlist_client
     if _playlist_client is None:
-        _playlist_client = PlaylistClient()
+        # Optional on-disk response cache (free-tier disks are ephemeral, so opt-in)
+        cache_path = os.environ.get("SUNNIFY_CACHE_PATH")
+        cache = SQLiteResponseCache(cache_path) if cache_path else None
+        # Workers started with the same SUNNIFY_TOKEN_PATH share one anonymous
+        # token, refreshed in the background before it expires
+        token_manager = AccessTokenManager(os.environ.get("SUNNIFY_TOKEN_PATH"), auto_refresh=True)
+        _playlist_client = PlaylistClient(cache=cache, token_manager=token_manager)
     return _playlist_client
 
 
+# Tracks serialized per chunk of a streamed playlist response
+STREAM_CHUNK_TRACKS = 200
+
+
+def track_rows(table: TrackTable, playlist_cover: str = "") -> Iterator[dict]:
+    """Response dicts for a playlist's tracks, built one at a time from the table."""
+    for track_id, title, artists, album, release_date, cover_url, _, _ in table.iter_rows():
+        yield {
+            "id": track_id,
+            "title": title,
+            "artists": artists,
+            "album": album or "",
+            # Use track cover if available, otherwise fall back to playlist cover
+            "cover": cover_url or playlist_cover,
+            "releaseDate": release_date or "",
+            "downloadLink": "",  # No server-side downloads
+        }
+
+
+def playlist_response_chunks(
+    playlist_name: str, table: TrackTable, playlist_cover: str = ""
+) -> Iterator[bytes]:
+    """The playlist's "complete" response body, serialized a few tracks at a time.
+
+    Produces the same JSON as jsonify() on the full payload, but only the
+    compact table plus one chunk of response dicts is held at once, instead
+    of every track's dict and the whole encoded body.
+    """
+    yield (
+        b'{"event":"complete","data":{"playlistName":' + json_dumps(playlist_name) + b',"tracks":['
+    )
+    separator = b""
+    chunk: list[bytes] = []
+    for row in track_rows(table, playlist_cover):
+        chunk.append(json_dumps(row))
+        if len(chunk) == STREAM_CHUNK_TRACKS:
+            yield separator + b",".join(chunk)
+            separator, chunk = b",", []
+    if chunk:
+        yield separator + b",".join(chunk)
+    yield b"]}}\n"
+
+
 @app.route("/api/scrape-playlist", methods=["POST"])
 def scrape_playlist():
     """Fetch Spotify playlist/track metadata (no downloads).
@@ -65,8 +151,11 @@ def scrape_playlist():
         if not spotify_url:
             return jsonify({"event": "error", "data": {"message": "No URL provided"}}), 400
 
-        # Detect URL type
-        url_type, item_id = detect_spotify_url_type(spotify_url)
+        # Detect URL type (open.spotify.com links or spotify: URIs)
+        try:
+            url_type, item_id = detect_spotify_url_type(spotify_url)
+        except ValueError:
+            url_type, item_id = "unknown", ""
 
         if url_type == "unknown" or not item_id:
             return (
@@ -79,8 +168,7 @@ def scrape_playlist():
 
         if url_type == "track":
             # Single track
-            api = SpotifyEmbedAPI()
-            track = api.get_track(item_id)
+            track = client.get_track(item_id)
             tracks.append(
                 {
                     "id": track.spotify_id,
@@ -96,30 +184,31 @@ def scrape_playlist():
 
         else:
             # Playlist
-            metadata = client.get_playlist_metadata(item_id)
+            # One embed + one spclient fetch covers both metadata and tracks
+            snapshot = client.get_playlist_snapshot(item_id)
+            metadata = snapshot.info
             playlist_name = f"{metadata.name} - {metadata.owner or 'Unknown'}"
             playlist_cover = metadata.cover_url or ""
 
-            # Fetch tracks with memory-efficient iteration
-            for track in client.iter_playlist_tracks(item_id):
-                # Use track cover if available, otherwise fall back to playlist cover
-                cover = track.cover_url or playlist_cover
-                tracks.append(
-                    {
-                        "id": track.spotify_id,
-                        "title": track.title,
-                        "artists": track.artists,
-                        "album": track.album or "",
-                        "cover": cover,
-                        "releaseDate": track.release_date or "",
-                        "downloadLink": "",  # No server-side downloads
-                    }
-                )
+            # Collect into a compact columnar table while hydration runs, so
+            # errors still get an error response; the body is then streamed
+            # from the table without materializing every track's dict
+            def progress(listed: int, total: int) -> None:
+                logger.info("Playlist %s: listed %d of %d tracks", item_id, listed, total)
+
+            table = TrackTable()
+            for track in client.iter_snapshot_tracks(snapshot, progress=progress):
+                table.append(track)
 
                 # Memory management for large playlists
-                if len(tracks) % 50 == 0:
+                if len(table) % 50 == 0:
                     gc.collect()
 
+            return app.response_class(
+                playlist_response_chunks(playlist_name, table, playlist_cover),
+                mimetype="application/json",
+            )
+
         # Final cleanup
         gc.collect()
 
@@ -142,7 +231,18 @@ def scrape_playlist():
 @app.route("/api/health")
 def health_check():
     """Health check endpoint for monitoring."""
-    return jsonify({"status": "ok", "mode": "metadata-only"})
+    stats = _playlist_client.connection_stats if _playlist_client else ConnectionStats()
+    return jsonify(
+        {
+            "status": "ok",
+            "mode": "metadata-only",
+            "connections": {
+                "requests": stats.requests,
+                "newConnections": stats.new_connections,
+                "reusedConnections": stats.reused_connections,
+            },
+        }
+    )
 
 
 @app.route("/")